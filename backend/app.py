@@ -1,19 +1,50 @@
+import time
+_import_started = time.perf_counter()
+
 import os
 import re
-import traceback
-from flask import Flask, request, jsonify
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from itertools import chain
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 
+from config import Config
+from utils.logging_setup import configure_logging
+
+configure_logging(Config.LOG_LEVEL, Config.LOG_FORMAT)
+logger = logging.getLogger(__name__)
+logger.info(f"Config loaded: PORT={Config.PORT}, FRONTEND_URL={Config.FRONTEND_URL}, GEMINI_API_KEYS={len(Config.GEMINI_API_KEYS)} key(s) found")
+
 # Import project utilities
-from utils.ai_simplifier import AISimplifier
-from utils.database import save_document_history, get_user_history, get_mongodb_client
-from utils.cloud_storage import upload_document_to_cloud
+from utils.ai_simplifier import AISimplifier, SIMPLIFY_MODES
+from utils.database import (save_document_history, save_document_history_many, get_user_history_page,
+                            get_history_item, get_history_item_meta, search_user_history, get_mongodb_client, ensure_history_indexes, history_writer,
+                            document_id_for)
+from utils.cloud_storage import UploadArchiver
+from utils.document_processor import UnsupportedDocument, SUPPORTED_EXTENSIONS, document_kind
+from utils.ingestion import UploadRequest, DocumentTooLarge, read_upload, iter_batch_documents, is_zip_upload
+from utils.job_queue import JobManager, JobQueueFull
+from utils.admission import AdmissionController, AdmissionRejected
+from utils.circuit_breaker import circuit_breaker_stats
+from utils.http_cache import set_validators, finalize_response, key_etag, not_modified
+from utils.metrics import REGISTRY, CONTENT_TYPE as METRICS_CONTENT_TYPE, HTTP_REQUEST_LATENCY, gauge, time_stage
+from utils.fallback_summarizer import summarize
+from utils.startup import StartupChecks
 
 # ==========================================================
 # ⚙️ Flask App Initialization
 # ==========================================================
 app = Flask(__name__)
 
+# Uploads are read as streams: parts larger than the spool threshold go to a
+# temp file, and requests over MAX_REQUEST_BYTES are rejected with 413 up front.
+UploadRequest.spool_threshold = Config.UPLOAD_SPOOL_THRESHOLD_BYTES
+app.request_class = UploadRequest
+app.config['MAX_CONTENT_LENGTH'] = Config.MAX_REQUEST_BYTES
+
 # ==========================================================
 # 🌐 UNIVERSAL CORS CONFIG (Production-Ready)
 # ==========================================================
@@ -26,23 +57,69 @@ CORS(app, origins="*", supports_credentials=True)
 # ==========================================================
 try:
     ai_simplifier = AISimplifier()
-    print("✅ Gemini Simplifier initialized successfully.")
+    logger.info("✅ Gemini Simplifier initialized successfully.")
 except Exception as e:
-    print(f"❌ FATAL: Could not initialize AISimplifier: {e}")
+    logger.error(f"❌ FATAL: Could not initialize AISimplifier: {e}")
     ai_simplifier = None
 
 # ==========================================================
-# 🧩 Initialize MongoDB Connection (on startup)
+# 🧩 Startup Checks (background; reported by /api/health)
 # ==========================================================
-try:
+# The MongoDB ping can take up to serverSelectionTimeoutMS and the Gemini SDK
+# takes most of a second to import, so neither delays the first request.
+
+def _check_mongodb():
+    if not os.getenv('MONGODB_URI'):
+        raise RuntimeError("MONGODB_URI not set; history is disabled.")
     client = get_mongodb_client()
-    if client:
-        print("✅ MongoDB connection initialized successfully.")
-        client.close()
-    else:
-        print("❌ MongoDB client could not be created.")
-except Exception as e:
-    print(f"⚠️ Error initializing MongoDB: {e}")
+    if not client:
+        raise RuntimeError("MongoDB client could not be created.")
+    logger.info("✅ MongoDB connection initialized successfully.")
+    ensure_history_indexes(client)
+
+
+def _check_gemini_sdk():
+    if not ai_simplifier or not ai_simplifier.available:
+        raise RuntimeError("AI Simplifier not available.")
+    ai_simplifier.warm_up()
+    return f"{len(ai_simplifier.key_pool)} key client(s) ready"
+
+
+startup_checks = StartupChecks()
+startup_checks.add("mongodb", _check_mongodb)
+startup_checks.add("gemini_sdk", _check_gemini_sdk)
+startup_checks.add("fallback_summarizer", lambda: summarize("Warm-up. This loads the local summarizer.") and None)
+startup_checks.start()
+
+# ==========================================================
+# 🚪 Admission Control (sized from the key pool's live capacity)
+# ==========================================================
+admission = None
+if Config.ADMISSION_CONTROL and ai_simplifier and ai_simplifier.key_pool:
+    admission = AdmissionController(
+        ai_simplifier.key_pool.capacity,
+        min_concurrency=Config.ADMISSION_MIN_CONCURRENCY,
+        max_concurrency=Config.ADMISSION_MAX_CONCURRENCY,
+        max_queue_wait=Config.ADMISSION_MAX_QUEUE_WAIT_SECONDS,
+        latency_estimate=Config.ADMISSION_LATENCY_ESTIMATE_SECONDS,
+    )
+
+
+def _admission_slot():
+    """
+    Admission slot for one simplification. Passed to the simplifier as admit=,
+    which takes it only on a cache miss, so cached and coalesced requests are
+    never queued or turned away. Raises AdmissionRejected.
+    """
+    return admission.slot() if admission is not None else nullcontext()
+
+
+def _rejected_response(e):
+    """429 for a request admission control turned away; shared with asgi.py."""
+    logger.warning(f"🚪 Request rejected: {e} (Retry-After {e.retry_after}s)")
+    return jsonify({"success": False, "error": str(e), "retry_after": e.retry_after}), 429, {
+        "Retry-After": str(e.retry_after)
+    }
 
 # ==========================================================
 # 🧠 API ROUTES
@@ -64,7 +141,9 @@ def health_check():
     return jsonify({
         "status": "ok" if is_ready else "error",
         "message": "Service is running." if is_ready else "AI Simplifier not available.",
-        "simplifier_ready": is_ready
+        "simplifier_ready": is_ready,
+        "startup": {"import_ms": IMPORT_MS, **startup_checks.report()},
+        "circuits": circuit_breaker_stats(),
     }), 200 if is_ready else 503
 
 
@@ -73,85 +152,522 @@ def health_check():
 # ==========================================================
 @app.route('/api/simplify', methods=['POST'])
 def simplify_document_route():
-    print("\n========================")
-    print("📥 /api/simplify CALLED")
-    print("========================")
-    print("Headers:", dict(request.headers))
-    print("request.files.keys():", list(request.files.keys()))
-    print("request.form.keys():", list(request.form.keys()))
+    logger.debug("📥 /api/simplify files=%s form=%s", list(request.files.keys()), list(request.form.keys()))
 
     if not ai_simplifier or not getattr(ai_simplifier, "available", False):
-        print("❌ AI Simplifier not ready")
+        logger.error("❌ AI Simplifier not ready")
         return jsonify({"success": False, "error": "AI Simplifier not available"}), 503
 
+    document_text, filename, mode, error = _read_simplify_input()
+    if error:
+        return error
+
+    # 🧠 Simplify + 💾 Save to MongoDB (write-behind, does not wait on the database)
+    try:
+        user_session = request.remote_addr or "unknown_user"
+        result = _simplify_and_save(document_text, mode, filename, user_session, admit=_admission_slot)
+        _archive_original(_take_original(), result, document_text, filename, user_session)
+    except AdmissionRejected as e:
+        return _rejected_response(e)
+    except Exception as e:
+        logger.exception(f"❌ Simplification failed: {e}")
+        return jsonify({"success": False, "error": f"Error during simplification: {str(e)}"}), 500
+
+    # 🎯 Return to frontend
+    return _simplify_json(result)
+
+
+def _simplify_json(result):
+    """The /api/simplify response with its ETag; shared with the asyncio server (asgi.py)."""
+    # Results hold the user's documents: never stored by caches, but tagged so clients can compare them
+    return set_validators(jsonify(_simplify_response(result)), "no-store")
+
+
+def _simplify_response(result):
+    """JSON body of /api/simplify; shared with the asyncio server (asgi.py)."""
+    return {
+        "success": True,
+        "simplified_text": result["simplified_text"],
+        "cached": result["source"] == "cache",
+        "source": result["source"],
+        "entities": result["entities"],
+        "usage": result["usage"],
+        "model": result["model"]
+    }
+
+
+# ==========================================================
+# 📡 Streaming Simplify Route (Server-Sent Events)
+# ==========================================================
+@app.route('/api/simplify/stream', methods=['POST'])
+def simplify_stream_route():
+    """
+    Stream the simplified text as Server-Sent Events while Gemini generates it.
+    Events: chunk, reset, fallback, done and error; every data payload is JSON.
+    """
+    if not ai_simplifier or not getattr(ai_simplifier, "available", False):
+        return jsonify({"success": False, "error": "AI Simplifier not available"}), 503
+
+    document_text, filename, mode, error = _read_simplify_input()
+    if error:
+        return error
+
+    user_session = request.remote_addr or "unknown_user"
+    events = ai_simplifier.stream_simplify(document_text, mode=mode, admit=_admission_slot)
+    try:
+        # Run up to the first event here, so a request turned away by admission control still gets a 429
+        first = next(events)
+    except AdmissionRejected as e:
+        return _rejected_response(e)
+    except Exception as e:
+        logger.exception(f"❌ Streaming simplification failed: {e}")
+        return jsonify({"success": False, "error": f"Error during simplification: {str(e)}"}), 500
+
+    def generate():
+        try:
+            for event, data in chain([first], events):
+                if event != "done":
+                    yield _sse(event, {"text": data})
+                    continue
+
+                history_id = _save_stream_history(data, document_text, filename, user_session)
+                _archive_original(_take_original(), {"history_id": history_id}, document_text, filename, user_session)
+                yield _sse_done(data, history_id)
+        except Exception as e:
+            logger.exception(f"❌ Streaming simplification failed: {e}")
+            yield _sse("error", {"success": False, "error": f"Error during simplification: {str(e)}"})
+
+    response = Response(stream_with_context(generate()), mimetype="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
+    # The admission slot is held until the stream ends or the client disconnects
+    response.call_on_close(events.close)
+    return response
+
+
+def _sse(event, data):
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def _sse_done(data, history_id):
+    """The final "done" event of a stream; shared with asgi.py."""
+    return _sse("done", {
+        "success": True,
+        "cached": data["source"] == "cache",
+        "source": data["source"],
+        "entities": data["entities"],
+        "usage": data["usage"],
+        "model": data["model"],
+        "history_id": history_id
+    })
+
+
+def _save_stream_history(data, document_text, filename, user_session):
+    """Queue the history record of a finished stream; returns its id, or None. Shared with asgi.py."""
+    try:
+        return save_document_history(user_session, document_text, data["simplified_text"], filename, data["entities"])
+    except Exception as e:
+        logger.error(f"❌ History queueing failed: {e}")
+        return None
+
+
+def _read_simplify_input():
+    """
+    Read the document from a file upload or a JSON body.
+    Returns (document_text, filename, mode, error_response); error_response is None on success.
+    """
     document_text = ""
     filename = None
+    mode = "auto"
 
     # 🧩 File upload case
     if 'file' in request.files:
         file = request.files['file']
         filename = file.filename
-        print(f"📄 File received: {filename}")
+        mode = request.form.get('mode', mode)
+        logger.debug(f"📄 File received: {filename}")
         try:
-            file_content = file.read()
-            document_text = file_content.decode('utf-8', errors='ignore')
-            print(f"✅ File decoded successfully ({len(document_text)} characters)")
+            with time_stage("upload_decode"):
+                request.environ["simplifier.original"] = _spool_original(file)
+                document_text = read_upload(file, Config.MAX_UPLOAD_BYTES)
+            logger.debug(f"✅ File decoded successfully ({len(document_text)} characters)")
+        except DocumentTooLarge as e:
+            logger.warning(f"⚠️ Upload rejected: {e}")
+            return None, None, None, (jsonify({"success": False, "error": str(e)}), 413)
+        except UnsupportedDocument as e:
+            logger.warning(f"⚠️ Upload rejected: {e}")
+            return None, None, None, (jsonify({"success": False, "error": str(e)}), 415)
         except Exception as e:
-            print(f"❌ File read error: {e}")
-            return jsonify({"success": False, "error": f"Error reading file: {e}"}), 400
+            logger.error(f"❌ File read error: {e}")
+            return None, None, None, (jsonify({"success": False, "error": f"Error reading file: {e}"}), 400)
 
     # 🧩 JSON case
     elif request.is_json:
         data = request.get_json()
         document_text = data.get('text', '')
-        print(f"📦 JSON text length: {len(document_text)}")
+        mode = data.get('mode', mode)
+        logger.debug(f"📦 JSON text length: {len(document_text)}")
 
     else:
-        print("⚠️ No file or JSON data received")
-        return jsonify({"success": False, "error": "Provide file or JSON with 'text'"}), 400
+        logger.warning("⚠️ No file or JSON data received")
+        return None, None, None, (jsonify({"success": False, "error": "Provide file or JSON with 'text'"}), 400)
 
     # 🧩 Validate text
     if not document_text.strip():
-        print("⚠️ Document text empty!")
-        return jsonify({"success": False, "error": "Document text is empty"}), 400
+        logger.warning("⚠️ Document text empty!")
+        return None, None, None, (jsonify({"success": False, "error": "Document text is empty"}), 400)
+
+    if mode not in SIMPLIFY_MODES:
+        return None, None, None, (jsonify({"success": False, "error": f"Invalid mode '{mode}'. Use one of: {', '.join(SIMPLIFY_MODES)}"}), 400)
+
+    return document_text, filename, mode, None
+
+
+def _spool_original(file):
+    """
+    Copy the raw upload to a temp file for the archive (None if archiving is
+    off). read_upload closes the stream, so this happens first; the copy is
+    chunked, so memory stays bounded. The file is deleted when the request
+    ends unless _take_original() hands it over.
+    """
+    if not (Config.ARCHIVE_UPLOADS and upload_archiver.enabled):
+        return None
+    return upload_archiver.spool(file.stream, Config.MAX_UPLOAD_BYTES)
+
+
+def _take_original():
+    """The request's spooled upload, now owned by the caller, or None."""
+    return request.environ.pop("simplifier.original", None)
+
+
+def _archive_original(original, result, document_text, filename, user_session):
+    """
+    Archive the spooled upload once the request was admitted and its history
+    record is queued; otherwise just delete it. Shared with asgi.py.
+    """
+    if original and result.get("history_id"):
+        upload_archiver.submit(original, filename, user_session, document_id_for(document_text))
+    else:
+        upload_archiver.discard(original)
+
+
+def _simplify_and_save(document_text, mode, filename, user_session, admit=None):
+    """Simplify a document and queue its history record. Shared by the sync route and job workers."""
+    result = ai_simplifier.simplify(document_text, mode=mode, admit=admit)
+    return _save_history(result, document_text, filename, user_session)
+
+
+def _save_history(result, document_text, filename, user_session):
+    """Queue the history record for a simplification result and set result["history_id"]."""
+    simplified_text = result["simplified_text"]
+    logger.info(f"✅ Simplified text generated ({len(simplified_text)} chars, source: {result['source']})")
 
-    # 🧠 Simplify
     try:
-        simplified_text = ai_simplifier.simplify_text(document_text)
-        print(f"✅ Simplified text generated ({len(simplified_text)} chars)")
+        inserted_id = save_document_history(user_session, document_text, simplified_text, filename, result["entities"])
+        logger.debug(f"✅ History record queued → ID: {inserted_id}")
+        result["history_id"] = inserted_id
     except Exception as e:
-        print(f"❌ Simplification failed: {e}")
-        traceback.print_exc()
-        return jsonify({"success": False, "error": f"Error during simplification: {str(e)}"}), 500
+        logger.error(f"❌ History queueing failed: {e}")
+        result["history_id"] = None
+
+    return result
+
 
-    # 💾 Save to MongoDB
+# ==========================================================
+# 📚 Batch Simplify Route (many files or one zip archive)
+# ==========================================================
+
+# Shared across requests so concurrent batches cannot multiply the number of
+# in-flight Gemini calls; the key pool decides which key serves each one.
+batch_executor = ThreadPoolExecutor(max_workers=Config.BATCH_WORKERS, thread_name_prefix="batch")
+
+
+@app.route('/api/simplify/batch', methods=['POST'])
+def simplify_batch_route():
+    """
+    Simplify several uploaded documents in one request.
+    Accepts multipart 'files' (repeated) or a single zip archive; returns one
+    result per document and lists the documents that failed separately.
+    Each document that misses the cache is admitted on its own; documents
+    turned away are listed as failures, with 429 if no document succeeded.
+    """
+    if not ai_simplifier or not getattr(ai_simplifier, "available", False):
+        return jsonify({"success": False, "error": "AI Simplifier not available"}), 503
+
+    uploads = request.files.getlist('files') or request.files.getlist('file')
+    if not uploads:
+        return jsonify({"success": False, "error": "Provide one or more 'files' or a zip archive"}), 400
+
+    mode = request.form.get('mode', 'auto')
+    if mode not in SIMPLIFY_MODES:
+        return jsonify({"success": False, "error": f"Invalid mode '{mode}'. Use one of: {', '.join(SIMPLIFY_MODES)}"}), 400
+
+    # No supported file at all: 415 up front. A mixed batch lists each unsupported file under failures.
+    if all(not is_zip_upload(upload) and document_kind(upload.filename) is None for upload in uploads):
+        names = ", ".join(upload.filename or "unnamed" for upload in uploads)
+        return jsonify({"success": False, "error": f"Unsupported file type(s): {names}. "
+                                                   f"Use one of: {', '.join(SUPPORTED_EXTENSIONS)} or a .zip archive"}), 415
+
+    failures = []
+    futures = []
+    # Documents are decoded one at a time and handed to the executor as soon
+    # as they are read, so simplification overlaps with decoding the rest.
+    with time_stage("upload_decode"):
+        for filename, text, error in iter_batch_documents(uploads, Config.BATCH_MAX_DOCUMENTS, Config.BATCH_MAX_DOCUMENT_BYTES):
+            if error:
+                failures.append({"filename": filename, "error": error})
+            else:
+                futures.append((filename, text, batch_executor.submit(ai_simplifier.simplify, text, mode,
+                                                                      _admission_slot)))
+
+    results = []
+    originals = []
+    retry_after = 0
+    for filename, text, future in futures:
+        try:
+            result = future.result()
+        except AdmissionRejected as e:
+            retry_after = max(retry_after, e.retry_after)
+            failures.append({"filename": filename, "error": str(e), "retry_after": e.retry_after})
+            continue
+        except Exception as e:
+            logger.error(f"❌ Batch simplification failed for {filename}: {e}")
+            failures.append({"filename": filename, "error": f"Error during simplification: {str(e)}"})
+            continue
+        originals.append(text)
+        results.append({
+            "filename": filename,
+            "simplified_text": result["simplified_text"],
+            "cached": result["source"] == "cache",
+            "source": result["source"],
+            "entities": result["entities"],
+            "usage": result["usage"],
+            "model": result["model"],
+            "history_id": None,
+        })
+
+    # 💾 One bulk insert for the whole batch
+    user_session = request.remote_addr or "unknown_user"
     try:
-        user_session = request.remote_addr or "unknown_user"
-        inserted_id = save_document_history(user_session, document_text, simplified_text, filename)
-        print(f"✅ MongoDB insert success → ID: {inserted_id}")
+        history_ids = save_document_history_many(
+            user_session, [(text, r["simplified_text"], r["filename"], r["entities"]) for text, r in zip(originals, results)]
+        )
+        for result, history_id in zip(results, history_ids):
+            result["history_id"] = history_id
     except Exception as e:
-        print(f"❌ MongoDB insert failed: {e}")
+        logger.error(f"❌ Batch history queueing failed: {e}")
+
+    logger.info(f"✅ Batch simplified: {len(results)} succeeded, {len(failures)} failed")
+    body = jsonify({
+        "success": bool(results),
+        "total": len(results) + len(failures),
+        "succeeded": len(results),
+        "failed": len(failures),
+        "results": results,
+        "failures": failures
+    })
+    if not results and retry_after:
+        return body, 429, {"Retry-After": str(retry_after)}
+    return body, 200 if results else 422
 
-    # 🎯 Return to frontend
+
+# ==========================================================
+# ☁️ Upload Archiving (Cloudinary, in the background)
+# ==========================================================
+upload_archiver = UploadArchiver(
+    max_workers=Config.ARCHIVE_WORKERS,
+    max_pending=Config.ARCHIVE_MAX_PENDING,
+    max_retries=Config.ARCHIVE_MAX_RETRIES,
+    backoff_seconds=Config.ARCHIVE_RETRY_BACKOFF_SECONDS,
+)
+
+
+# ==========================================================
+# 🗂️ Asynchronous Simplification Jobs
+# ==========================================================
+def _run_simplify_job(payload):
+    """Job handler: runs on the JobManager worker pool."""
+    result = {}
+    try:
+        result = _simplify_and_save(payload["text"], payload["mode"], payload["filename"], payload["user_session"])
+    finally:
+        _archive_original(payload["original"], result, payload["text"], payload["filename"], payload["user_session"])
+    return {
+        "simplified_text": result["simplified_text"],
+        "cached": result["source"] == "cache",
+        "entities": result["entities"],
+        "usage": result["usage"],
+        "model": result["model"],
+        "history_id": result["history_id"]
+    }
+
+
+job_manager = JobManager(
+    _run_simplify_job,
+    max_workers=Config.JOB_WORKERS,
+    max_pending=Config.JOB_MAX_PENDING,
+    ttl_seconds=Config.JOB_TTL_SECONDS,
+)
+
+gauge("simplifier_job_queue_depth", "Queued and running background jobs.", lambda: job_manager.stats()["active"])
+gauge("simplifier_history_queue_depth", "History records waiting for the write-behind flush.", history_writer.pending)
+gauge("simplifier_archive_queue_depth", "Uploads waiting to be archived or being archived.",
+      lambda: upload_archiver.stats()["pending"])
+gauge("simplifier_admission_queue_depth", "Simplify requests waiting for admission.",
+      lambda: admission.stats()["queued"] if admission else None)
+gauge("simplifier_admission_in_flight", "Simplify requests admitted and running.",
+      lambda: admission.in_flight if admission else None)
+gauge("simplifier_admission_concurrency_limit", "Current admission concurrency limit.",
+      lambda: admission.stats()["concurrency_limit"] if admission else None)
+gauge("simplifier_key_pool_available_requests", "Requests the API key pool could start right now.",
+      lambda: ai_simplifier.key_pool.available_capacity() if ai_simplifier and ai_simplifier.key_pool else None)
+
+
+@app.route('/api/jobs', methods=['POST'])
+def create_job_route():
+    """
+    Queue a document for simplification and return a job id to poll.
+    Jobs skip admission control: JOB_WORKERS bounds how many run at once and a
+    full queue (JOB_MAX_PENDING) is already answered with 429, while waiting
+    for a slot is what a queued job is for.
+    """
+    if not ai_simplifier or not getattr(ai_simplifier, "available", False):
+        return jsonify({"success": False, "error": "AI Simplifier not available"}), 503
+
+    document_text, filename, mode, error = _read_simplify_input()
+    if error:
+        return error
+
+    try:
+        job_id = job_manager.submit({
+            "text": document_text,
+            "mode": mode,
+            "filename": filename,
+            "user_session": request.remote_addr or "unknown_user",
+            "original": request.environ.get("simplifier.original"),
+        })
+    except JobQueueFull as e:
+        return jsonify({"success": False, "error": str(e)}), 429
+    _take_original()   # the job archives or deletes it
+
+    return jsonify({
+        "success": True,
+        "job_id": job_id,
+        "status": "queued",
+        "status_url": f"/api/jobs/{job_id}"
+    }), 202
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job_route(job_id):
+    """Return the status (and, once finished, the result) of a simplification job."""
+    job = job_manager.get(job_id)
+    if not job:
+        return jsonify({"success": False, "error": "Job not found or expired"}), 404
+    # A finished job no longer changes; a pending one must be polled
+    finished = job["status"] in ("completed", "failed")
+    cache_control = _result_cache_control() if finished else "private, no-cache"
+    etag = key_etag("job", job_id, job["status"], job["finished_at"])
+    return (not_modified(request, etag, cache_control)
+            or set_validators(jsonify({"success": True, **job}), cache_control, etag))
+
+
+# ==========================================================
+# ⚡ Simplification Cache Stats
+# ==========================================================
+@app.route('/api/cache/stats', methods=['GET'])
+def cache_stats_route():
+    """Hit/miss counters for the result cache and the single-flight coalescing rate."""
+    if not ai_simplifier:
+        return jsonify({"success": False, "error": "AI Simplifier not available"}), 503
+    return jsonify({
+        "success": True,
+        "cache": ai_simplifier.cache.stats(),
+        "single_flight": ai_simplifier.single_flight.stats()
+    })
+
+
+# ==========================================================
+# 🔑 API Key Pool Utilization
+# ==========================================================
+@app.route('/api/keys/stats', methods=['GET'])
+def key_pool_stats_route():
+    """Per-key request/token budgets, usage and cooldown state, admission state and model tier latencies."""
+    if not ai_simplifier or not ai_simplifier.key_pool:
+        return jsonify({"success": False, "error": "AI Simplifier not available"}), 503
     return jsonify({
         "success": True,
-        "simplified_text": simplified_text
+        "available_capacity": round(ai_simplifier.key_pool.available_capacity(), 2),
+        "admission": admission.stats() if admission else None,
+        "models": ai_simplifier.router.stats(),
+        "keys": ai_simplifier.key_pool.utilization()
     })
 
+
 # ==========================================================
 # 🕒 Fetch User History
 # ==========================================================
 @app.route('/api/history', methods=['GET'])
 def get_user_history_route():
-    """Fetch recent simplification history for a user."""
+    """
+    Fetch a page of simplification history for a user, newest first.
+    Query params: limit (page size) and cursor (next_cursor from the previous page).
+    """
+    user_session = request.remote_addr or "unknown_user"
+    page_size = request.args.get('limit', Config.HISTORY_PAGE_SIZE, type=int)
+    page_size = max(1, min(page_size, Config.HISTORY_MAX_PAGE_SIZE))
+    try:
+        page = get_user_history_page(user_session, page_size=page_size, cursor=request.args.get('cursor') or None)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+    # New records can appear at any time, so the page is always revalidated (cheap with a 304)
+    return set_validators(jsonify({
+        "success": True,
+        "history": page["history"],
+        "next_cursor": page["next_cursor"]
+    }), "private, no-cache")
+
+
+@app.route('/api/history/search', methods=['GET'])
+def search_user_history_route():
+    """Full-text search of a user's past documents by party name or clause wording (?q=...)."""
     user_session = request.remote_addr or "unknown_user"
-    history = get_user_history(user_session)
+    query = (request.args.get('q') or "").strip()
+    if not query:
+        return jsonify({"success": False, "error": "Missing search query 'q'."}), 400
+    limit = max(1, min(request.args.get('limit', 20, type=int), Config.HISTORY_MAX_PAGE_SIZE))
     return jsonify({
         "success": True,
-        "history": history
+        "results": search_user_history(user_session, query[:200], limit=limit)
     })
 
 
+@app.route('/api/history/<history_id>', methods=['GET'])
+def get_history_item_route(history_id):
+    """Return one past simplification with the full original and simplified texts."""
+    user_session = request.remote_addr or "unknown_user"
+    meta = get_history_item_meta(user_session, history_id)
+    if not meta:
+        return jsonify({"success": False, "error": "History record not found or expired"}), 404
+    # The texts of a record never change and archive_url is set once, so the tag
+    # comes from the stored ids and a revalidation never loads the document
+    etag = key_etag("history", meta["_id"], meta.get("document_id"), meta.get("status"), meta.get("archive_url"))
+    not_changed = not_modified(request, etag, _result_cache_control())
+    if not_changed:
+        return not_changed
+    item = get_history_item(user_session, history_id, meta)
+    if not item:
+        return jsonify({"success": False, "error": "History record not found or expired"}), 404
+    return set_validators(jsonify({"success": True, "item": item}), _result_cache_control(), etag)
+
+
+def _result_cache_control():
+    """Stored results are per client (sessions are keyed by address) and change rarely."""
+    return f"private, max-age={Config.HTTP_RESULT_MAX_AGE_SECONDS}"
+
+
 # ==========================================================
 # 🧪 Test MongoDB Connection + Insert (Debug Route)
 # ==========================================================
@@ -160,6 +676,8 @@ def test_db_route():
     """Insert a test document and verify MongoDB is working."""
     try:
         client = get_mongodb_client()
+        if not client:
+            raise RuntimeError("MongoDB client could not be created.")
         db = client["legal_documents"]
         collection = db["history"]
 
@@ -172,7 +690,6 @@ def test_db_route():
         }
 
         result = collection.insert_one(test_doc)
-        client.close()
 
         return jsonify({
             "success": True,
@@ -181,43 +698,97 @@ def test_db_route():
         }), 200
 
     except Exception as e:
-        print(f"❌ /api/test-db failed: {e}")
+        logger.error(f"❌ /api/test-db failed: {e}")
         return jsonify({
             "success": False,
             "error": str(e)
         }), 500
 
 
+# ==========================================================
+# 📈 Prometheus Metrics
+# ==========================================================
+@app.route('/metrics', methods=['GET'])
+def metrics_route():
+    """Prometheus text-format metrics: per-stage latency histograms and counters."""
+    return Response(REGISTRY.render(), mimetype=METRICS_CONTENT_TYPE)
+
+
+@app.before_request
+def start_request_timer():
+    request.environ["simplifier.start_time"] = time.perf_counter()
+
+
+@app.teardown_request
+def discard_original(exc):
+    """Delete a spooled upload no one took over (rejected, failed or not archived)."""
+    original = request.environ.pop("simplifier.original", None)
+    if original:
+        upload_archiver.discard(original)
+
+
+@app.teardown_request
+def record_request_latency(exc):
+    start = request.environ.get("simplifier.start_time")
+    if start is None or request.url_rule is None:
+        return
+    status = "500" if exc is not None else str(request.environ.get("simplifier.status", "unknown"))
+    HTTP_REQUEST_LATENCY.observe(
+        time.perf_counter() - start,
+        endpoint=request.url_rule.rule, method=request.method, status=status,
+    )
+
+
 # ==========================================================
 # 🧱 CORS Headers After Response
 # ==========================================================
+ALLOWED_ORIGINS = frozenset({
+    "http://127.0.0.1:3000",
+    "http://localhost:3000",
+    "https://aisimplifierfrontend.netlify.app",
+    "https://aisimplifier.onrender.com",
+})
+
+
 @app.after_request
 def add_cors_headers(response):
-    allowed_origins = [
-        "http://127.0.0.1:3000",
-        "http://localhost:3000",
-        "https://aisimplifierfrontend.netlify.app",
-        "https://aisimplifier.onrender.com",
-    ]
-
     origin = request.headers.get("Origin")
-    if origin in allowed_origins:
+    if origin in ALLOWED_ORIGINS:
         response.headers["Access-Control-Allow-Origin"] = origin
+        response.vary.add("Origin")   # cached responses must not leak to another origin
 
     response.headers["Access-Control-Allow-Methods"] = "GET, POST, OPTIONS"
-    response.headers["Access-Control-Allow-Headers"] = "Content-Type"
+    response.headers["Access-Control-Allow-Headers"] = "Content-Type, If-None-Match"
     response.headers["Access-Control-Allow-Credentials"] = "true"
+    response.headers["Access-Control-Expose-Headers"] = "ETag"
+    request.environ["simplifier.status"] = response.status_code
     return response
 
+
+# after_request hooks run in reverse order: this one runs first, so the
+# status recorded above is the final one (304 included).
+@app.after_request
+def compress_response(response):
+    """304 for conditional GETs whose ETag still matches, then gzip/brotli above the size threshold."""
+    return finalize_response(
+        response, request,
+        min_bytes=Config.COMPRESSION_MIN_BYTES,
+        gzip_level=Config.GZIP_LEVEL,
+        brotli_quality=Config.BROTLI_QUALITY,
+    )
+
+@app.errorhandler(413)
+def request_too_large(e):
+    return jsonify({
+        "success": False,
+        "error": f"Upload exceeds the {Config.MAX_REQUEST_BYTES} byte request limit."
+    }), 413
+
+
 @app.route('/api/debug-upload', methods=['POST'])
 def debug_upload():
-    print("\n============================")
-    print("📥 /api/debug-upload CALLED")
-    print("============================")
-    print("Headers:", dict(request.headers))
-    print("request.files.keys():", list(request.files.keys()))
-    print("request.form.keys():", list(request.form.keys()))
-    print("============================")
+    logger.debug("📥 /api/debug-upload headers=%s files=%s form=%s",
+                 dict(request.headers), list(request.files.keys()), list(request.form.keys()))
 
     if 'file' not in request.files:
         return jsonify({"success": False, "msg": "No file detected"}), 400
@@ -225,11 +796,15 @@ def debug_upload():
     file = request.files['file']
     name = file.filename
     content = file.read().decode('utf-8')
-    print(f"📄 File received: {name} ({len(content)} characters)")
+    logger.debug(f"📄 File received: {name} ({len(content)} characters)")
     return jsonify({"success": True, "msg": f"File {name} received", "length": len(content)})
 
 
 
+IMPORT_MS = round((time.perf_counter() - _import_started) * 1000, 1)
+logger.info(f"🚀 App imported in {IMPORT_MS} ms")
+
+
 # ==========================================================
 # 🚀 Application Entrypoint
 # ==========================================================
@@ -0,0 +1,305 @@
+import asyncio
+import io
+import logging
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, nullcontext
+
+from a2wsgi import WSGIMiddleware
+from a2wsgi.wsgi import build_environ
+from flask import Response, jsonify, request
+from werkzeug.exceptions import HTTPException
+
+from config import Config
+from app import (app as flask_app, ai_simplifier, admission, _read_simplify_input, _simplify_json, _save_history,
+                 _rejected_response, _take_original, _archive_original, _sse, _sse_done, _save_stream_history)
+from utils.admission import AdmissionRejected
+from utils.metrics import gauge
+
+logger = logging.getLogger(__name__)
+
+# ==========================================================
+# ⚡ Asyncio Serving Mode (ASGI)
+# ==========================================================
+# Run with:  uvicorn asgi:app --host 0.0.0.0 --port $PORT
+#       or:  gunicorn asgi:app -k uvicorn.workers.UvicornWorker
+#
+# POST /api/simplify and /api/simplify/stream run natively on the event loop:
+# the upload is read without blocking, Gemini calls (and streams) are awaited,
+# and a semaphore bounds how many simplifications run at once. A request
+# waiting on Gemini holds no thread, so one process can serve hundreds of
+# concurrent simplifications. Blocking steps (parsing, cache and history
+# calls) run on an executor of ASYNC_EXECUTOR_THREADS threads. Every other
+# route is handed to the Flask app on a small thread pool.
+
+
+class _ClientDisconnected(Exception):
+    pass
+
+
+class AsyncSimplifierApp:
+    """ASGI application: native async /api/simplify and /api/simplify/stream, Flask (WSGI) for the rest."""
+
+    def __init__(self, flask_app, max_concurrency=256, wsgi_threads=32, executor_threads=64):
+        self.flask_app = flask_app
+        self.wsgi = WSGIMiddleware(flask_app, workers=wsgi_threads)
+        self.max_concurrency = max_concurrency
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        # asyncio.to_thread() runs on the loop's default executor, which is
+        # only min(32, CPUs + 4) threads unless it is replaced
+        self.executor_threads = executor_threads
+        self.executor = ThreadPoolExecutor(max_workers=executor_threads, thread_name_prefix="async-io")
+        self._executor_loop = None
+        self.in_flight = 0
+
+    async def __call__(self, scope, receive, send):
+        self._install_executor()
+        if scope["type"] == "lifespan":
+            return await self._lifespan(receive, send)
+        if scope["type"] == "http" and scope["method"] == "POST":
+            if scope["path"] == "/api/simplify":
+                return await self._simplify(scope, receive, send)
+            if scope["path"] == "/api/simplify/stream":
+                return await self._simplify_stream(scope, receive, send)
+        return await self.wsgi(scope, receive, send)
+
+    def _install_executor(self):
+        loop = asyncio.get_running_loop()
+        if self._executor_loop is not loop:
+            loop.set_default_executor(self.executor)
+            self._executor_loop = loop
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                logger.info(f"⚡ Async server ready (max {self.max_concurrency} concurrent simplifications, "
+                            f"{self.executor_threads} executor threads)")
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    # ==========================================================
+    # ✨ Simplify Route (async)
+    # ==========================================================
+
+    async def _simplify(self, scope, receive, send):
+        started = time.perf_counter()
+        environ, parsed = await self._read_input(scope, receive, send, started)
+        if parsed is None:
+            return
+
+        document_text, filename, mode, user_session, original = parsed
+        self.in_flight += 1
+        result = {}
+        try:
+            result = await ai_simplifier.simplify_async(document_text, mode=mode, admit=self._slot)
+            result = await asyncio.to_thread(_save_history, result, document_text, filename, user_session)
+            rv = lambda: _simplify_json(result)
+        except AdmissionRejected as e:
+            rejected = e   # "e" is unbound after the except block
+            rv = lambda: _rejected_response(rejected)
+        except Exception as e:
+            logger.exception(f"❌ Simplification failed: {e}")
+            message = f"Error during simplification: {str(e)}"
+            rv = lambda: (jsonify({"success": False, "error": message}), 500)
+        finally:
+            self.in_flight -= 1
+            _archive_original(original, result, document_text, filename, user_session)
+        await self._respond(send, environ, started, rv)
+
+    @asynccontextmanager
+    async def _slot(self):
+        """Admission slot plus the concurrency bound, taken only when a simplification misses the cache."""
+        async with admission.slot_async() if admission is not None else nullcontext():
+            async with self.semaphore:
+                yield
+
+    # ==========================================================
+    # 📡 Streaming Simplify Route (async Server-Sent Events)
+    # ==========================================================
+
+    async def _simplify_stream(self, scope, receive, send):
+        """Same events as the Flask /api/simplify/stream route, with Gemini streamed on the event loop."""
+        started = time.perf_counter()
+        environ, parsed = await self._read_input(scope, receive, send, started)
+        if parsed is None:
+            return
+
+        document_text, filename, mode, user_session, original = parsed
+        events = ai_simplifier.stream_simplify_async(document_text, mode=mode, admit=self._slot)
+        history_id = None
+        self.in_flight += 1
+        try:
+            try:
+                # Run up to the first event before answering, so a request turned away by admission control gets a 429
+                first = await events.__anext__()
+            except AdmissionRejected as e:
+                rejected = e
+                return await self._respond(send, environ, started, lambda: _rejected_response(rejected))
+            except Exception as e:
+                logger.exception(f"❌ Streaming simplification failed: {e}")
+                message = f"Error during simplification: {str(e)}"
+                return await self._respond(send, environ, started,
+                                           lambda: (jsonify({"success": False, "error": message}), 500))
+
+            await self._start_stream(send, environ, started)
+            streaming = asyncio.ensure_future(
+                self._send_events(send, first, events, document_text, filename, user_session))
+            # The body has been read, so the next message is the client going away
+            disconnected = asyncio.ensure_future(receive())
+            await asyncio.wait({streaming, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            for task in (streaming, disconnected):
+                task.cancel()
+            try:
+                history_id = await streaming
+            except asyncio.CancelledError:
+                logger.info("📡 Client disconnected mid-stream; generation stopped.")
+        finally:
+            self.in_flight -= 1
+            await events.aclose()   # frees the admission slot and ends the Gemini stream
+            _archive_original(original, {"history_id": history_id}, document_text, filename, user_session)
+
+    async def _send_events(self, send, first, events, document_text, filename, user_session):
+        """Send every event as SSE, queueing the history record on "done". Returns its id."""
+        history_id = None
+        event, data = first
+        try:
+            while True:
+                if event == "done":
+                    history_id = await asyncio.to_thread(_save_stream_history, data, document_text, filename,
+                                                         user_session)
+                    payload = _sse_done(data, history_id)
+                else:
+                    payload = _sse(event, {"text": data})
+                await send({"type": "http.response.body", "body": payload.encode("utf-8"), "more_body": True})
+                event, data = await events.__anext__()
+        except StopAsyncIteration:
+            pass
+        except Exception as e:
+            logger.exception(f"❌ Streaming simplification failed: {e}")
+            payload = _sse("error", {"success": False, "error": f"Error during simplification: {str(e)}"})
+            await send({"type": "http.response.body", "body": payload.encode("utf-8"), "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+        return history_id
+
+    async def _start_stream(self, send, environ, started):
+        """Send the SSE response headers, with the usual after_request hooks applied."""
+        environ["simplifier.start_time"] = started
+        with self.flask_app.request_context(environ):
+            # Latency is recorded here, when the first event is ready, as time to first byte
+            response = self.flask_app.process_response(Response(mimetype="text/event-stream", headers={
+                "Cache-Control": "no-cache",
+                "X-Accel-Buffering": "no"
+            }))
+            headers = [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in response.headers.items()
+                       if k.lower() != "content-length"]
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+
+    # ==========================================================
+    # 📥 Request Input
+    # ==========================================================
+
+    async def _read_input(self, scope, receive, send, started):
+        """
+        Read and parse a simplify request. Returns (environ, parsed); parsed is
+        None when the client went away or an error response was already sent.
+        """
+        try:
+            body = await self._read_body(scope, receive)
+        except _ClientDisconnected:
+            return None, None
+
+        if body is None:
+            environ = self._environ(scope, io.BytesIO())
+            await self._respond(send, environ, started, lambda: (jsonify({
+                "success": False,
+                "error": f"Upload exceeds the {Config.MAX_REQUEST_BYTES} byte request limit."
+            }), 413))
+            return environ, None
+
+        environ = self._environ(scope, body)
+        try:
+            # Form parsing and PDF/DOCX extraction are blocking; keep them off the loop
+            parsed, error = await asyncio.to_thread(self._parse_input, environ)
+        finally:
+            body.close()
+        if error is not None:
+            await self._respond(send, environ, started, lambda: error)
+        return environ, parsed
+
+    def _parse_input(self, environ):
+        """Runs the Flask input parsing in a request context. Returns (parsed, error)."""
+        with self.flask_app.request_context(environ):
+            if not ai_simplifier or not getattr(ai_simplifier, "available", False):
+                logger.error("❌ AI Simplifier not ready")
+                return None, (jsonify({"success": False, "error": "AI Simplifier not available"}), 503)
+            try:
+                document_text, filename, mode, error = _read_simplify_input()
+            except HTTPException as e:
+                # Outside Flask's dispatch, so route it through the app's error
+                # handlers here (e.g. BadRequest for a malformed JSON body)
+                return None, self.flask_app.handle_user_exception(e)
+            if error:
+                return None, error
+            # Taken out of the request so the context's teardown does not delete it
+            return (document_text, filename, mode, request.remote_addr or "unknown_user", _take_original()), None
+
+    async def _read_body(self, scope, receive):
+        """
+        Read the request body into a spooled temp file without blocking the loop.
+        Returns None if it exceeds MAX_REQUEST_BYTES.
+        """
+        for name, value in scope.get("headers", []):
+            if name == b"content-length" and value.isdigit() and int(value) > Config.MAX_REQUEST_BYTES:
+                return None
+
+        body = tempfile.SpooledTemporaryFile(max_size=Config.UPLOAD_SPOOL_THRESHOLD_BYTES)
+        size = 0
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                body.close()
+                raise _ClientDisconnected()
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > Config.MAX_REQUEST_BYTES:
+                body.close()
+                return None
+            body.write(chunk)
+            more_body = message.get("more_body", False)
+        body.seek(0)
+        return body
+
+    def _environ(self, scope, body):
+        environ = build_environ(scope, body)
+        environ["wsgi.input_terminated"] = True   # the whole body is buffered
+        return environ
+
+    async def _respond(self, send, environ, started, make_rv):
+        """
+        Build the response inside a Flask request context so the usual
+        after_request hooks (CORS headers) and latency metrics apply.
+        """
+        environ["simplifier.start_time"] = started
+        with self.flask_app.request_context(environ):
+            response = self.flask_app.process_response(self.flask_app.make_response(make_rv()))
+            status = response.status_code
+            headers = [(k.lower().encode("latin-1"), v.encode("latin-1")) for k, v in response.headers.items()]
+            payload = response.get_data()
+
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": payload})
+
+
+app = AsyncSimplifierApp(
+    flask_app,
+    max_concurrency=Config.ASYNC_MAX_CONCURRENCY,
+    wsgi_threads=Config.ASYNC_WSGI_THREADS,
+    executor_threads=Config.ASYNC_EXECUTOR_THREADS,
+)
+
+gauge("simplifier_async_in_flight", "Simplifications in progress on the asyncio server.", lambda: app.in_flight)
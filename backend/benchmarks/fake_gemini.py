@@ -0,0 +1,168 @@
+"""
+Local stand-in for the Gemini REST API, used by the benchmark suite.
+
+Serves models/*:generateContent and models/*:streamGenerateContent with
+configurable latency, streaming behaviour and 429 (ResourceExhausted)
+responses, so the backend can be load-tested without spending quota.
+
+Run standalone:
+    python -m benchmarks.fake_gemini --port 8765 --latency-ms 800 --rate-limit-ratio 0.05
+"""
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_PATH = re.compile(r"^/v1beta/models/(?P<model>[^:/]+):(?P<method>generateContent|streamGenerateContent)")
+
+
+class FakeGeminiSettings:
+    """Behaviour knobs shared by every request handler."""
+
+    def __init__(self, latency_ms=800.0, jitter_ms=200.0, first_token_ms=150.0, stream_chunks=8,
+                 rate_limit_ratio=0.0, output_chars=2000):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.first_token_ms = first_token_ms
+        self.stream_chunks = stream_chunks
+        self.rate_limit_ratio = rate_limit_ratio
+        self.output_chars = output_chars
+
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.rate_limited = 0
+
+    def latency(self):
+        return max(0.0, random.gauss(self.latency_ms, self.jitter_ms)) / 1000.0
+
+    def should_rate_limit(self):
+        return random.random() < self.rate_limit_ratio
+
+
+def _candidate(text):
+    return {"candidates": [{
+        "content": {"parts": [{"text": text}], "role": "model"},
+        "finishReason": "STOP",
+        "index": 0
+    }]}
+
+
+def _summary_text(settings, prompt_chars):
+    header = f"**Summary** (fake Gemini, prompt of {prompt_chars} characters)\n"
+    body = "This clause means the parties agree to the terms in plain English. "
+    return header + (body * (settings.output_chars // len(body) + 1))[:settings.output_chars]
+
+
+def make_handler(settings):
+    class FakeGeminiHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.0"
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_POST(self):
+            match = _PATH.match(self.path)
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length) if length else b""
+            if not match:
+                self._send_json(404, {"error": {"code": 404, "message": "Not found", "status": "NOT_FOUND"}})
+                return
+
+            with settings.lock:
+                settings.requests += 1
+                rate_limited = settings.should_rate_limit()
+                if rate_limited:
+                    settings.rate_limited += 1
+
+            if rate_limited:
+                time.sleep(0.02)
+                self._send_json(429, {"error": {
+                    "code": 429,
+                    "message": "Resource has been exhausted (e.g. check quota).",
+                    "status": "RESOURCE_EXHAUSTED"
+                }})
+                return
+
+            text = _summary_text(settings, len(body))
+            if match.group("method") == "generateContent":
+                time.sleep(settings.latency())
+                self._send_json(200, _candidate(text))
+            else:
+                self._stream(text)
+
+        def _stream(self, text):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+
+            chunks = max(1, settings.stream_chunks)
+            size = len(text) // chunks + 1
+            pieces = [text[i:i + size] for i in range(0, len(text), size)]
+            remaining = max(0.0, settings.latency() - settings.first_token_ms / 1000.0)
+            time.sleep(settings.first_token_ms / 1000.0)
+
+            self.wfile.write(b"[")
+            for i, piece in enumerate(pieces):
+                if i:
+                    time.sleep(remaining / max(1, len(pieces) - 1))
+                    self.wfile.write(b",\r\n")
+                self.wfile.write(json.dumps(_candidate(piece)).encode("utf-8"))
+                self.wfile.flush()
+            self.wfile.write(b"]")
+
+        def _send_json(self, status, payload):
+            data = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return FakeGeminiHandler
+
+
+def start_fake_gemini(settings, host="127.0.0.1", port=0):
+    """Start the fake server on a background thread. Returns (server, base_url)."""
+    server = ThreadingHTTPServer((host, port), make_handler(settings))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-gemini", daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def add_settings_arguments(parser):
+    parser.add_argument("--latency-ms", type=float, default=800.0, help="Mean generation latency")
+    parser.add_argument("--jitter-ms", type=float, default=200.0, help="Std-dev of the generation latency")
+    parser.add_argument("--first-token-ms", type=float, default=150.0, help="Delay before the first streamed chunk")
+    parser.add_argument("--stream-chunks", type=int, default=8, help="Chunks per streamed response")
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0, help="Fraction of calls answered with 429")
+    parser.add_argument("--output-chars", type=int, default=2000, help="Length of each fake summary")
+
+
+def settings_from_args(args):
+    return FakeGeminiSettings(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        first_token_ms=args.first_token_ms,
+        stream_chunks=args.stream_chunks,
+        rate_limit_ratio=args.rate_limit_ratio,
+        output_chars=args.output_chars,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local fake Gemini REST server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_settings_arguments(parser)
+    args = parser.parse_args()
+
+    server, url = start_fake_gemini(settings_from_args(args), args.host, args.port)
+    print(f"Fake Gemini listening on {url} (set GEMINI_API_ENDPOINT={url} GEMINI_TRANSPORT=rest)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
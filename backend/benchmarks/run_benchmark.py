@@ -0,0 +1,330 @@
+"""
+Offline load test for the backend.
+
+Starts the fake Gemini server from fake_gemini.py, launches the backend
+against it (no real quota is used and MongoDB is disabled), drives
+/api/simplify and /api/history with the legal_docs/sample_*.txt corpus
+at one or more concurrency levels, and prints a JSON report.
+
+    cd backend
+    python -m benchmarks.run_benchmark --concurrency 1,8,32 --requests 200 --output bench.json
+    python -m benchmarks.run_benchmark --compare bench.json
+
+Each run reports p50/p95/p99 latency, requests per second, error and
+fallback rates, and the backend's memory high-water mark (VmHWM).
+"""
+import argparse
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from .fake_gemini import add_settings_arguments, settings_from_args, start_fake_gemini
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORPUS_GLOB = os.path.join(BACKEND_DIR, "..", "legal_docs", "sample_*.txt")
+
+
+# ==========================================================
+# 📊 Statistics
+# ==========================================================
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    k = (len(sorted_values) - 1) * pct / 100.0
+    lo, hi = int(k), min(int(k) + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (k - lo)
+
+
+def summarize(samples, wall_seconds):
+    """samples: list of (latency_seconds, ok, source)."""
+    latencies = sorted(s[0] * 1000.0 for s in samples)
+    ok = [s for s in samples if s[1]]
+    fallbacks = [s for s in ok if s[2] == "fallback"]
+    return {
+        "requests": len(samples),
+        "errors": len(samples) - len(ok),
+        "error_rate": round((len(samples) - len(ok)) / len(samples), 4) if samples else 0.0,
+        "fallback_rate": round(len(fallbacks) / len(ok), 4) if ok else 0.0,
+        "rps": round(len(samples) / wall_seconds, 2) if wall_seconds else 0.0,
+        "latency_ms": {
+            "p50": _round(percentile(latencies, 50)),
+            "p95": _round(percentile(latencies, 95)),
+            "p99": _round(percentile(latencies, 99)),
+            "max": _round(latencies[-1] if latencies else None),
+            "mean": _round(sum(latencies) / len(latencies) if latencies else None),
+        },
+    }
+
+
+def _round(value):
+    return round(value, 2) if value is not None else None
+
+
+# ==========================================================
+# 🚀 Backend Process
+# ==========================================================
+
+def start_backend(args, gemini_url):
+    env = dict(os.environ)
+    for i in range(1, 6):
+        env.pop(f"GEMINI_API_KEY_{i}", None)
+    for i in range(1, args.keys + 1):
+        env[f"GEMINI_API_KEY_{i}"] = f"bench-key-{i:04d}"
+    env.update({
+        "PORT": str(args.port),
+        "GEMINI_API_ENDPOINT": gemini_url,
+        # The fake server speaks REST only; pool a connection per concurrent call so
+        # the numbers measure the backend, not connections opened past the pool
+        "GEMINI_TRANSPORT": "rest",
+        "GEMINI_REST_POOL_SIZE": str(max(args.concurrency)),
+        "GEMINI_KEY_RPM": str(args.key_rpm),
+        "CACHE_PERSISTENT": "false",
+        "MONGODB_URI": "",
+        "PYTHONUNBUFFERED": "1",
+    })
+
+    if args.server == "gunicorn":
+        cmd = [sys.executable, "-m", "gunicorn", "app:app", "-b", f"127.0.0.1:{args.port}",
+               "--workers", str(args.workers), "--threads", str(args.threads)]
+    elif args.server == "asgi":
+        cmd = [sys.executable, "-m", "gunicorn", "asgi:app", "-k", "uvicorn.workers.UvicornWorker",
+               "-b", f"127.0.0.1:{args.port}", "--workers", str(args.workers)]
+    else:
+        cmd = [sys.executable, "app.py"]
+
+    log = open(args.backend_log, "w") if args.backend_log else subprocess.DEVNULL
+    process = subprocess.Popen(cmd, cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    deadline = time.time() + args.startup_timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Backend exited during startup with code {process.returncode}")
+        try:
+            with urllib.request.urlopen(f"{base_url}/api/health", timeout=1) as response:
+                if response.status == 200:
+                    return process, base_url
+        except (urllib.error.URLError, ConnectionError, OSError):
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError("Backend did not become healthy in time")
+
+
+def memory_high_water_kb(pid):
+    """Peak resident set size of pid (and its children for gunicorn) from /proc, in kB."""
+    total = 0
+    pids = [pid]
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            pids += [int(p) for p in f.read().split()]
+    except OSError:
+        pass
+    for p in pids:
+        try:
+            with open(f"/proc/{p}/status") as f:
+                for line in f:
+                    if line.startswith("VmHWM:"):
+                        total += int(line.split()[1])
+        except OSError:
+            pass
+    return total or None
+
+
+# ==========================================================
+# 🔁 Load Generation
+# ==========================================================
+
+def load_corpus():
+    corpus = []
+    for path in sorted(glob.glob(CORPUS_GLOB)):
+        with open(path, encoding="utf-8", errors="ignore") as f:
+            corpus.append(f.read())
+    if not corpus:
+        raise RuntimeError(f"No documents found at {CORPUS_GLOB}")
+    return corpus
+
+
+def simplify_request(base_url, text, timeout):
+    body = json.dumps({"text": text}).encode("utf-8")
+    req = urllib.request.Request(f"{base_url}/api/simplify", data=body, headers={"Content-Type": "application/json"})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            payload = json.loads(response.read())
+        return time.perf_counter() - start, bool(payload.get("success")), payload.get("source")
+    except Exception:
+        return time.perf_counter() - start, False, None
+
+
+def history_request(base_url, timeout):
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(f"{base_url}/api/history", timeout=timeout) as response:
+            response.read()
+            return time.perf_counter() - start, response.status == 200, None
+    except Exception:
+        return time.perf_counter() - start, False, None
+
+
+def run_level(fn, total, concurrency):
+    samples = []
+    lock = threading.Lock()
+
+    def one(i):
+        sample = fn(i)
+        with lock:
+            samples.append(sample)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(total)))
+    return samples, time.perf_counter() - start
+
+
+def run(args):
+    corpus = load_corpus()
+    settings = settings_from_args(args)
+    gemini, gemini_url = start_fake_gemini(settings)
+    process, base_url = start_backend(args, gemini_url)
+
+    def make_text(i):
+        text = corpus[i % len(corpus)]
+        # A unique suffix defeats the result cache and single-flight so every request reaches Gemini.
+        return text if args.repeat_documents else f"{text}\n\nBenchmark reference {uuid.uuid4().hex}"
+
+    levels = []
+    try:
+        for concurrency in args.concurrency:
+            simplify_samples, simplify_wall = run_level(
+                lambda i: simplify_request(base_url, make_text(i), args.timeout), args.requests, concurrency)
+            history_samples, history_wall = run_level(
+                lambda i: history_request(base_url, args.timeout), args.history_requests, concurrency)
+            levels.append({
+                "concurrency": concurrency,
+                "simplify": summarize(simplify_samples, simplify_wall),
+                "history": summarize(history_samples, history_wall),
+            })
+        memory_kb = memory_high_water_kb(process.pid)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+        gemini.shutdown()
+
+    return {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "config": {
+            "server": args.server,
+            "gemini_transport": "rest",
+            "rest_pool_size": max(args.concurrency),
+            "keys": args.keys,
+            "key_rpm": args.key_rpm,
+            "requests": args.requests,
+            "history_requests": args.history_requests,
+            "repeat_documents": args.repeat_documents,
+            "fake_gemini": {
+                "latency_ms": settings.latency_ms,
+                "jitter_ms": settings.jitter_ms,
+                "first_token_ms": settings.first_token_ms,
+                "stream_chunks": settings.stream_chunks,
+                "rate_limit_ratio": settings.rate_limit_ratio,
+                "output_chars": settings.output_chars,
+            },
+        },
+        "fake_gemini_calls": {"requests": settings.requests, "rate_limited": settings.rate_limited},
+        "memory_high_water_kb": memory_kb,
+        "levels": levels,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except Exception:
+        return None
+
+
+# ==========================================================
+# 🆚 Comparing Runs
+# ==========================================================
+
+def compare(baseline, current):
+    """Per-level deltas of the headline numbers between two reports."""
+    rows = []
+    base_levels = {level["concurrency"]: level for level in baseline["levels"]}
+    for level in current["levels"]:
+        base = base_levels.get(level["concurrency"])
+        if not base:
+            continue
+        for endpoint in ("simplify", "history"):
+            b, c = base[endpoint], level[endpoint]
+            row = {"concurrency": level["concurrency"], "endpoint": endpoint}
+            for name, old, new in (
+                ("p50_ms", b["latency_ms"]["p50"], c["latency_ms"]["p50"]),
+                ("p95_ms", b["latency_ms"]["p95"], c["latency_ms"]["p95"]),
+                ("p99_ms", b["latency_ms"]["p99"], c["latency_ms"]["p99"]),
+                ("rps", b["rps"], c["rps"]),
+                ("fallback_rate", b["fallback_rate"], c["fallback_rate"]),
+            ):
+                row[name] = {"baseline": old, "current": new,
+                             "change_pct": round((new - old) / old * 100, 1) if old else None}
+            rows.append(row)
+    return {
+        "baseline_commit": baseline.get("commit"),
+        "current_commit": current.get("commit"),
+        "memory_high_water_kb": {"baseline": baseline.get("memory_high_water_kb"),
+                                 "current": current.get("memory_high_water_kb")},
+        "levels": rows,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Offline load test for the simplifier backend.")
+    parser.add_argument("--concurrency", type=lambda v: [int(x) for x in v.split(",")], default=[1, 8, 32],
+                        help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=100, help="/api/simplify requests per level")
+    parser.add_argument("--history-requests", type=int, default=100, help="/api/history requests per level")
+    parser.add_argument("--repeat-documents", action="store_true",
+                        help="Send the corpus verbatim so cache and coalescing take effect")
+    parser.add_argument("--keys", type=int, default=5, help="Number of fake API keys")
+    parser.add_argument("--key-rpm", type=float, default=10000, help="GEMINI_KEY_RPM passed to the backend")
+    parser.add_argument("--server", choices=["flask", "gunicorn", "asgi"], default="flask",
+                        help="asgi runs asgi:app on gunicorn's uvicorn worker")
+    parser.add_argument("--workers", type=int, default=1, help="gunicorn workers (gunicorn and asgi)")
+    parser.add_argument("--threads", type=int, default=8, help="gunicorn threads per worker")
+    parser.add_argument("--port", type=int, default=5099)
+    parser.add_argument("--timeout", type=float, default=180.0, help="Per-request client timeout")
+    parser.add_argument("--startup-timeout", type=float, default=60.0)
+    parser.add_argument("--backend-log", help="Write backend stdout/stderr to this file")
+    parser.add_argument("--output", help="Write the JSON report to this file as well as stdout")
+    parser.add_argument("--compare", metavar="BASELINE_JSON", help="Compare this run against an earlier report")
+    add_settings_arguments(parser)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    report = run(args)
+    if args.compare:
+        with open(args.compare) as f:
+            report["comparison"] = compare(json.load(f), report)
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
@@ -0,0 +1,135 @@
+"""
+Cold-start benchmark for the backend.
+
+Measures, over several fresh processes:
+  - import_ms: time to `import app` (the Flask app and all its modules)
+  - first_response_ms: from launching the server to the first 200 from /api/health
+  - checks_ms: until the background startup checks report complete
+
+Fake API keys are used and MongoDB is disabled, so no network is needed.
+
+    cd backend
+    python -m benchmarks.startup_benchmark --runs 5
+    python -m benchmarks.startup_benchmark --server uvicorn --output startup.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_SNIPPET = (
+    "import time; t = time.perf_counter(); import app; "
+    "print((time.perf_counter() - t) * 1000)"
+)
+
+
+def backend_env(port):
+    env = dict(os.environ)
+    for i in range(1, 6):
+        env[f"GEMINI_API_KEY_{i}"] = f"bench-key-{i:04d}"
+    env.update({"PORT": str(port), "MONGODB_URI": "", "CACHE_PERSISTENT": "false", "PYTHONUNBUFFERED": "1"})
+    return env
+
+
+# ==========================================================
+# ⏱️ Measurements
+# ==========================================================
+
+def measure_import(env):
+    output = subprocess.check_output([sys.executable, "-c", IMPORT_SNIPPET], cwd=BACKEND_DIR, env=env,
+                                     stderr=subprocess.DEVNULL)
+    return float(output.decode().strip().splitlines()[-1])
+
+
+def measure_server(args, env):
+    """Launch the server, return (first_response_ms, checks_ms)."""
+    if args.server == "uvicorn":
+        cmd = [sys.executable, "-m", "uvicorn", "asgi:app", "--port", str(args.port), "--log-level", "warning"]
+    else:
+        cmd = [sys.executable, "app.py"]
+
+    url = f"http://127.0.0.1:{args.port}/api/health"
+    started = time.perf_counter()
+    process = subprocess.Popen(cmd, cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    first_response_ms = None
+    try:
+        deadline = time.time() + args.startup_timeout
+        while time.time() < deadline:
+            if process.poll() is not None:
+                raise RuntimeError(f"Backend exited during startup with code {process.returncode}")
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    health = json.loads(response.read())
+                if first_response_ms is None:
+                    first_response_ms = (time.perf_counter() - started) * 1000
+                startup = health.get("startup", {})
+                if startup.get("complete"):
+                    return first_response_ms, startup.get("duration_ms")
+            except (urllib.error.URLError, ConnectionError, OSError):
+                pass
+            time.sleep(0.02)
+        raise RuntimeError("Backend did not finish starting in time")
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def stats(values):
+    values = [v for v in values if v is not None]
+    if not values:
+        return None
+    return {
+        "median": round(statistics.median(values), 1),
+        "min": round(min(values), 1),
+        "max": round(max(values), 1),
+    }
+
+
+def run(args):
+    env = backend_env(args.port)
+    imports, first_responses, checks = [], [], []
+    for _ in range(args.runs):
+        imports.append(measure_import(env))
+        first_response_ms, checks_ms = measure_server(args, env)
+        first_responses.append(first_response_ms)
+        checks.append(checks_ms)
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "server": args.server,
+        "runs": args.runs,
+        "import_ms": stats(imports),
+        "first_response_ms": stats(first_responses),
+        "checks_ms": stats(checks),
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Cold-start benchmark for the simplifier backend.")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh processes to measure")
+    parser.add_argument("--server", choices=["flask", "uvicorn"], default="flask")
+    parser.add_argument("--port", type=int, default=5098)
+    parser.add_argument("--startup-timeout", type=float, default=60.0)
+    parser.add_argument("--output", help="Write the JSON report to this file as well as stdout")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    output = json.dumps(run(args), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output)
+    print(output)
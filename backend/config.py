@@ -10,9 +10,9 @@ class Config:
     """Application configuration.
 
     This implementation defensively loads GEMINI_API_KEY_N entries from the
-    environment and ignores any that are not present. It prints a brief
-    diagnostic message when imported so startup logs show how many keys were
-    found (helps debugging issues like the NameError you encountered).
+    environment and ignores any that are not present. app.py logs a brief
+    diagnostic at startup so logs show how many keys were found (helps
+    debugging issues like the NameError you encountered).
     """
 
     # Attempt to read up to 5 keys from environment variables
@@ -26,10 +26,120 @@ class Config:
 
     # Main configuration
     GEMINI_MODEL_NAME = os.getenv('GEMINI_MODEL_NAME', 'gemini-2.5-pro')
+    # Optional overrides, e.g. to point at the local fake server in benchmarks/
+    GEMINI_API_ENDPOINT = os.getenv('GEMINI_API_ENDPOINT') or None
+    GEMINI_TRANSPORT = os.getenv('GEMINI_TRANSPORT') or None
+    # Connections each API key's client keeps open when GEMINI_TRANSPORT=rest;
+    # calls beyond it open a new connection and discard it afterwards
+    GEMINI_REST_POOL_SIZE = int(os.getenv('GEMINI_REST_POOL_SIZE', 64))
+
+    # Per-key budgets and cooldown for the API key pool scheduler
+    GEMINI_KEY_RPM = float(os.getenv('GEMINI_KEY_RPM', 5))
+    GEMINI_KEY_TPM = float(os.getenv('GEMINI_KEY_TPM', 250000))
+    GEMINI_KEY_COOLDOWN_SECONDS = float(os.getenv('GEMINI_KEY_COOLDOWN_SECONDS', 5))
+    GEMINI_KEY_MAX_COOLDOWN_SECONDS = float(os.getenv('GEMINI_KEY_MAX_COOLDOWN_SECONDS', 300))
+    GEMINI_KEY_MAX_WAIT_SECONDS = float(os.getenv('GEMINI_KEY_MAX_WAIT_SECONDS', 5))
+
+    # Input token budget for a single-pass prompt; GEMINI_INPUT_TOKEN_BUDGETS
+    # overrides it per model, e.g. "gemini-2.5-pro=30000,gemini-2.5-flash=12000"
+    GEMINI_INPUT_TOKEN_BUDGET = int(os.getenv('GEMINI_INPUT_TOKEN_BUDGET', 8000))
+    GEMINI_INPUT_TOKEN_BUDGETS = os.getenv('GEMINI_INPUT_TOKEN_BUDGETS', '')
+
+    # Model tiers, primary first and then faster models, e.g.
+    # "gemini-2.5-pro,gemini-2.5-flash"; by default only GEMINI_MODEL_NAME is used.
+    # "model:max_chars" also sends prompts up to that size straight to that tier,
+    # and a model whose circuit is open fails over to the next tier. With
+    # GEMINI_HEDGING=true a call still running after the hedge percentile of its
+    # model's recent latency (or close to the deadline) is also sent to the next
+    # faster tier, and the first answer wins
+    GEMINI_MODEL_TIERS = os.getenv('GEMINI_MODEL_TIERS', GEMINI_MODEL_NAME)
+    GEMINI_HEDGING = os.getenv('GEMINI_HEDGING', 'false').lower() == 'true'
+    GEMINI_HEDGE_PERCENTILE = float(os.getenv('GEMINI_HEDGE_PERCENTILE', 95))
+    GEMINI_HEDGE_MIN_SAMPLES = int(os.getenv('GEMINI_HEDGE_MIN_SAMPLES', 20))
+    GEMINI_LATENCY_DEADLINE_SECONDS = float(os.getenv('GEMINI_LATENCY_DEADLINE_SECONDS', 30))
+    GEMINI_HEDGE_WORKERS = int(os.getenv('GEMINI_HEDGE_WORKERS', 64))
+
+    # Circuit breakers: after this many consecutive server errors or timeouts a
+    # model's circuit opens and calls fail over (or fall back) at once; after
+    # the reset time one probe call decides whether it closes again. MongoDB
+    # has its own: MONGODB_CIRCUIT_FAILURE_THRESHOLD (3), MONGODB_CIRCUIT_RESET_SECONDS (30)
+    GEMINI_CIRCUIT_FAILURE_THRESHOLD = int(os.getenv('GEMINI_CIRCUIT_FAILURE_THRESHOLD', 5))
+    GEMINI_CIRCUIT_RESET_SECONDS = float(os.getenv('GEMINI_CIRCUIT_RESET_SECONDS', 30))
+
     PORT = int(os.getenv('PORT', 5000))
     FRONTEND_URL = os.getenv('FRONTEND_URL', 'https://aisimplifier.netlify.app')
 
+    # Logging: LOG_LEVEL is DEBUG/INFO/WARNING/ERROR, LOG_FORMAT is "text" or "json"
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
+    LOG_FORMAT = os.getenv('LOG_FORMAT', 'text')
+
+    # Long-document (map-reduce) simplification
+    CHUNK_THRESHOLD_CHARS = int(os.getenv('CHUNK_THRESHOLD_CHARS', 30000))
+    CHUNK_MAX_CHARS = int(os.getenv('CHUNK_MAX_CHARS', 12000))
+    CHUNK_WORKERS = int(os.getenv('CHUNK_WORKERS', 4))
+
+    # Clause-level incremental simplification (mode "incremental")
+    CLAUSE_MIN_CHARS = int(os.getenv('CLAUSE_MIN_CHARS', 200))
+    CLAUSE_CACHE_MAX_ENTRIES = int(os.getenv('CLAUSE_CACHE_MAX_ENTRIES', 4096))
+
+    # Simplification result cache (in-memory LRU + MongoDB collection)
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 512))
+    CACHE_MAX_BYTES = int(os.getenv('CACHE_MAX_BYTES', 32 * 1024 * 1024))
+    CACHE_TTL_SECONDS = int(os.getenv('CACHE_TTL_SECONDS', 7 * 24 * 3600))
+    CACHE_PERSISTENT = os.getenv('CACHE_PERSISTENT', 'true').lower() == 'true'
+
+    # Asynchronous job API (/api/jobs)
+    JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))
+    JOB_MAX_PENDING = int(os.getenv('JOB_MAX_PENDING', 50))
+    JOB_TTL_SECONDS = int(os.getenv('JOB_TTL_SECONDS', 3600))
+
+    # Upload ingestion: per-document decode limit, whole-request limit (413 before
+    # the body is read) and the size above which upload parts are spooled to disk
+    MAX_UPLOAD_BYTES = int(os.getenv('MAX_UPLOAD_BYTES', 10 * 1024 * 1024))
+    MAX_REQUEST_BYTES = int(os.getenv('MAX_REQUEST_BYTES', 100 * 1024 * 1024))
+    UPLOAD_SPOOL_THRESHOLD_BYTES = int(os.getenv('UPLOAD_SPOOL_THRESHOLD_BYTES', 1024 * 1024))
+
+    # Batch simplification (/api/simplify/batch)
+    BATCH_WORKERS = int(os.getenv('BATCH_WORKERS', 4))
+    BATCH_MAX_DOCUMENTS = int(os.getenv('BATCH_MAX_DOCUMENTS', 50))
+    BATCH_MAX_DOCUMENT_BYTES = int(os.getenv('BATCH_MAX_DOCUMENT_BYTES', 2 * 1024 * 1024))
+
+    # History listing (/api/history): default and maximum page size. The
+    # per-session page cache is tuned in utils/database.py (HISTORY_CACHE_*)
+    HISTORY_PAGE_SIZE = int(os.getenv('HISTORY_PAGE_SIZE', 10))
+    HISTORY_MAX_PAGE_SIZE = int(os.getenv('HISTORY_MAX_PAGE_SIZE', 100))
+
+    # HTTP responses: JSON bodies of at least COMPRESSION_MIN_BYTES are sent
+    # brotli- (if installed) or gzip-compressed. Stored results (history records,
+    # finished jobs) may be reused by the browser for HTTP_RESULT_MAX_AGE_SECONDS
+    # before it revalidates them with their ETag
+    COMPRESSION_MIN_BYTES = int(os.getenv('COMPRESSION_MIN_BYTES', 1024))
+    GZIP_LEVEL = int(os.getenv('GZIP_LEVEL', 6))
+    BROTLI_QUALITY = int(os.getenv('BROTLI_QUALITY', 5))
+    HTTP_RESULT_MAX_AGE_SECONDS = int(os.getenv('HTTP_RESULT_MAX_AGE_SECONDS', 60))
+
+    # Asyncio serving mode (asgi.py): simplifications running at once on the
+    # event loop, and threads for the routes still served by Flask
+    ASYNC_MAX_CONCURRENCY = int(os.getenv('ASYNC_MAX_CONCURRENCY', 256))
+    ASYNC_WSGI_THREADS = int(os.getenv('ASYNC_WSGI_THREADS', 32))
+    # Threads for blocking work of the async routes (parsing, cache and history
+    # calls, and Gemini calls themselves when GEMINI_TRANSPORT=rest)
+    ASYNC_EXECUTOR_THREADS = int(os.getenv('ASYNC_EXECUTOR_THREADS', 64))
+
+    # Background archiving of original uploads to Cloudinary (needs CLOUDINARY_URL
+    # or CLOUDINARY_CLOUD_NAME/API_KEY/API_SECRET): concurrent uploads, queued
+    # uploads before new ones are skipped, and retries with exponential backoff
+    ARCHIVE_UPLOADS = os.getenv('ARCHIVE_UPLOADS', 'true').lower() == 'true'
+    ARCHIVE_WORKERS = int(os.getenv('ARCHIVE_WORKERS', 2))
+    ARCHIVE_MAX_PENDING = int(os.getenv('ARCHIVE_MAX_PENDING', 100))
+    ARCHIVE_MAX_RETRIES = int(os.getenv('ARCHIVE_MAX_RETRIES', 4))
+    ARCHIVE_RETRY_BACKOFF_SECONDS = float(os.getenv('ARCHIVE_RETRY_BACKOFF_SECONDS', 2))
 
-# Print a short diagnostic so logs show what the config discovered.
-print(f"Config loaded: PORT={Config.PORT}, FRONTEND_URL={Config.FRONTEND_URL}, GEMINI_API_KEYS={len(Config.GEMINI_API_KEYS)} key(s) found")
-    
\ No newline at end of file
+    # Admission control for simplify requests: the concurrency limit and wait
+    # queue follow the key pool's live capacity within these bounds; requests
+    # that cannot be admitted get 429 with Retry-After
+    ADMISSION_CONTROL = os.getenv('ADMISSION_CONTROL', 'true').lower() == 'true'
+    ADMISSION_MIN_CONCURRENCY = int(os.getenv('ADMISSION_MIN_CONCURRENCY', 2))
+    ADMISSION_MAX_CONCURRENCY = int(os.getenv('ADMISSION_MAX_CONCURRENCY', 256))
+    ADMISSION_MAX_QUEUE_WAIT_SECONDS = float(os.getenv('ADMISSION_MAX_QUEUE_WAIT_SECONDS', 10))
+    ADMISSION_LATENCY_ESTIMATE_SECONDS = float(os.getenv('ADMISSION_LATENCY_ESTIMATE_SECONDS', 10))
@@ -0,0 +1,232 @@
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+
+from .metrics import ADMISSION_REJECTIONS, ADMISSION_QUEUE_WAIT
+
+logger = logging.getLogger(__name__)
+
+# ==========================================================
+# 🚪 Admission Control (backpressure from key-pool capacity)
+# ==========================================================
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request cannot be admitted; retry_after is in whole seconds."""
+
+    def __init__(self, message, retry_after):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    def __init__(self, loop=None):
+        self.granted = False
+        self.enqueued_at = time.monotonic()
+        self.loop = loop
+        self.event = threading.Event() if loop is None else None
+        self.future = loop.create_future() if loop is not None else None
+
+    def wake(self):
+        if self.loop is None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(lambda: self.future.done() or self.future.set_result(None))
+
+
+class AdmissionController:
+    """
+    Limits how many simplifications run at once and how many may wait, both
+    sized from what the API keys can actually serve.
+
+    The concurrency limit is the requests the key pool could start right now
+    plus its sustained rate times the observed request latency (Little's law).
+    Running requests have already taken their key capacity, so under sustained
+    load the limit settles at rate x latency. The queue holds what that rate
+    can drain within max_queue_wait. Beyond that, requests are rejected at once
+    with a Retry-After estimate instead of piling up behind rate limits.
+    Waiters are admitted in FIFO order and give up after max_queue_wait, so
+    admitted requests see a bounded queueing delay.
+    """
+
+    def __init__(self, capacity_fn, min_concurrency=2, max_concurrency=256, max_queue_wait=10.0,
+                 latency_estimate=10.0, max_retry_after=60):
+        self.capacity_fn = capacity_fn
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.max_queue_wait = max_queue_wait
+        self.max_retry_after = max_retry_after
+        self.latency = latency_estimate   # EWMA of admitted request duration, seconds
+
+        self.in_flight = 0
+        self.admitted = 0
+        self.rejected = 0
+        self._waiters = deque()
+        self._lock = threading.Lock()
+
+    # ==========================================================
+    # 📏 Limits
+    # ==========================================================
+
+    def limits(self):
+        """(concurrency_limit, queue_limit, capacity) from the live key-pool capacity."""
+        capacity = self.capacity_fn()
+        rate = capacity["requests_per_second"]
+        concurrency = math.ceil(capacity["available"] + rate * self.latency)
+        concurrency = max(self.min_concurrency, min(self.max_concurrency, concurrency))
+        queue_limit = math.floor(rate * self.max_queue_wait)
+        return concurrency, queue_limit, capacity
+
+    def _retry_after(self, queued, capacity):
+        """Seconds until the keys could work through the current queue, or a cooling key returns."""
+        rate = capacity["requests_per_second"]
+        if rate > 0:
+            seconds = (queued + 1) / rate
+        else:
+            seconds = capacity["cooldown_remaining"] or self.max_retry_after
+        return max(1, min(self.max_retry_after, math.ceil(seconds)))
+
+    # ==========================================================
+    # 🎟️ Acquire / Release
+    # ==========================================================
+
+    def acquire(self):
+        """Admit the calling thread, waiting in the queue if needed. Raises AdmissionRejected."""
+        waiter = self._enter()
+        if waiter is None:
+            return
+        deadline = waiter.enqueued_at + self.max_queue_wait
+        while True:
+            remaining = deadline - time.monotonic()
+            # Wake periodically: the limit grows as key capacity refills, without any release
+            if waiter.event.wait(min(0.25, max(0.0, remaining))) or self._pump(waiter):
+                return self._admitted(waiter)
+            if remaining <= 0:
+                self._give_up(waiter)
+
+    async def acquire_async(self):
+        """Coroutine version of acquire() for the asyncio server."""
+        waiter = self._enter(asyncio.get_running_loop())
+        if waiter is None:
+            return
+        deadline = waiter.enqueued_at + self.max_queue_wait
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                try:
+                    await asyncio.wait_for(asyncio.shield(waiter.future), min(0.25, max(0.0, remaining)))
+                    return self._admitted(waiter)
+                except asyncio.TimeoutError:
+                    if self._pump(waiter):
+                        return self._admitted(waiter)
+                if remaining <= 0:
+                    self._give_up(waiter)
+        except asyncio.CancelledError:
+            # Client went away: hand the slot back if it was granted meanwhile
+            with self._lock:
+                if not waiter.granted:
+                    self._waiters.remove(waiter)
+                    waiter = None
+            if waiter is not None:
+                self.release()
+            raise
+
+    @contextmanager
+    def slot(self):
+        """
+        Hold a slot for the duration of the block; the time spent in it
+        updates the latency estimate. Raises AdmissionRejected.
+        """
+        self.acquire()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(time.perf_counter() - started)
+
+    @asynccontextmanager
+    async def slot_async(self):
+        """Async version of slot() for the asyncio server."""
+        await self.acquire_async()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.release(time.perf_counter() - started)
+
+    def release(self, duration=None):
+        """Free a slot; duration (seconds) of the admitted request updates the latency estimate."""
+        with self._lock:
+            self.in_flight -= 1
+            if duration is not None:
+                self.latency = 0.8 * self.latency + 0.2 * duration
+        self._pump()
+
+    def _enter(self, loop=None):
+        """Admit at once (returns None) or join the queue (returns the waiter)."""
+        concurrency, queue_limit, capacity = self.limits()
+        with self._lock:
+            if not self._waiters and self.in_flight < concurrency:
+                self.in_flight += 1
+                self.admitted += 1
+                return None
+            if len(self._waiters) >= queue_limit:
+                self.rejected += 1
+                retry_after = self._retry_after(len(self._waiters), capacity)
+                ADMISSION_REJECTIONS.inc(reason="queue_full")
+                raise AdmissionRejected(
+                    f"Server is at capacity ({self.in_flight} running, {len(self._waiters)} queued).", retry_after)
+            waiter = _Waiter(loop)
+            self._waiters.append(waiter)
+            return waiter
+
+    def _pump(self, waiter=None):
+        """Grant queued waiters while there is room; returns whether waiter was granted."""
+        concurrency, _, _ = self.limits()
+        granted = []
+        with self._lock:
+            while self._waiters and self.in_flight < concurrency:
+                head = self._waiters.popleft()
+                head.granted = True
+                self.in_flight += 1
+                self.admitted += 1
+                granted.append(head)
+            is_granted = waiter is not None and waiter.granted
+        for head in granted:
+            if head is not waiter:
+                head.wake()
+        return is_granted
+
+    def _admitted(self, waiter):
+        ADMISSION_QUEUE_WAIT.observe(time.monotonic() - waiter.enqueued_at)
+
+    def _give_up(self, waiter):
+        """Leave the queue after max_queue_wait, unless a slot was granted in the meantime."""
+        with self._lock:
+            if waiter.granted:
+                return
+            self._waiters.remove(waiter)
+            self.rejected += 1
+            queued = len(self._waiters)
+        ADMISSION_REJECTIONS.inc(reason="timeout")
+        raise AdmissionRejected(
+            f"Timed out after {self.max_queue_wait:g}s waiting for capacity.",
+            self._retry_after(queued, self.capacity_fn()))
+
+    def stats(self):
+        concurrency, queue_limit, capacity = self.limits()
+        with self._lock:
+            return {
+                "in_flight": self.in_flight,
+                "queued": len(self._waiters),
+                "concurrency_limit": concurrency,
+                "queue_limit": queue_limit,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "latency_estimate": round(self.latency, 2),
+                "key_requests_per_second": round(capacity["requests_per_second"], 3),
+            }
@@ -1,10 +1,13 @@
 # In backend/utils/ai_simplifier.py
 
+import asyncio
+import logging
 import os
-import re
+import threading
 import time
-import google.generativeai as genai
-from google.api_core import exceptions
+from contextlib import nullcontext
+from concurrent.futures import (ThreadPoolExecutor, Future, CancelledError, FIRST_COMPLETED,
+                                TimeoutError as FutureTimeout, wait)
 
 try:
     from config import Config
@@ -14,6 +17,63 @@ except ImportError:
     except ImportError:
         from backend.config import Config
 
+from .chunker import split_into_chunks, split_into_clauses
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .fallback_summarizer import summarize
+from .key_pool import KeyPool
+from .lazy_import import lazy_module
+from .model_router import ModelRouter, parse_model_tiers
+from .legal_ner import extract_entities, compress_with_references, format_entities
+from .prompt_builder import estimate_tokens, TokenUsage, compact_document, normalize_whitespace, parse_token_budgets
+from .result_cache import ResultCache, make_cache_key, content_hash
+from .single_flight import SingleFlight
+from .metrics import (
+    time_stage, STAGE_LATENCY, BLOCKED_RESPONSES, FALLBACKS, KEY_ROTATIONS, CLAUSE_REQUESTS,
+    GEMINI_TOKENS, REQUEST_TOKENS, GEMINI_CALLS, GEMINI_HEDGES,
+)
+
+logger = logging.getLogger(__name__)
+
+SIMPLIFY_MODES = ("auto", "single", "chunked", "incremental")
+
+# The Gemini SDK takes most of a second to import; it loads on first use or
+# during the background startup checks (see warm_up).
+genai = lazy_module("google.generativeai")
+glm = lazy_module("google.ai.generativelanguage")
+exceptions = lazy_module("google.api_core.exceptions")
+
+
+def rate_limit_errors():
+    # gRPC reports quota errors as ResourceExhausted, the REST transport as HTTP 429.
+    return (exceptions.ResourceExhausted, exceptions.TooManyRequests)
+
+
+def outage_errors():
+    # Server errors (5xx, including DeadlineExceeded) and transport failures count
+    # against a model's circuit; quota errors and rejected requests do not.
+    return (exceptions.ServerError, exceptions.RetryError, OSError)
+
+
+async def _iterate_in_thread(iterator):
+    """Iterate a blocking generator on worker threads, one item at a time, without blocking the loop."""
+    done = object()
+    try:
+        while (item := await asyncio.to_thread(next, iterator, done)) is not done:
+            yield item
+    finally:
+        try:
+            iterator.close()
+        except ValueError:
+            pass   # still running in a thread after a cancellation; closed once garbage collected
+
+
+GENERATION_CONFIG = {"temperature": 0.1, "max_output_tokens": 4096}
+SAFETY_SETTINGS = [{"category": c, "threshold": "BLOCK_NONE"} for c in ["HARM_CATEGORY_HARASSMENT", "HARM_CATEGORY_HATE_SPEECH", "HARM_CATEGORY_SEXUALLY_EXPLICIT", "HARM_CATEGORY_DANGEROUS_CONTENT"]]
+
+
+# Bump whenever the prompts change so cached results from older prompts are not reused.
+PROMPT_VERSION = "v3"
+
 class AISimplifier:
     """
     A class to simplify legal documents using the Gemini API, with robust
@@ -22,57 +82,263 @@ class AISimplifier:
     def __init__(self):
         """Initializes the AISimplifier, loading a pool of API keys."""
         self.available = False
-        self.model = None
+        self.key_pool = None
+        self.router = None
+        self.hedge_pool = None
+        self.breakers = {}
+        self.cache = ResultCache(
+            max_entries=getattr(Config, 'CACHE_MAX_ENTRIES', 512),
+            max_bytes=getattr(Config, 'CACHE_MAX_BYTES', 32 * 1024 * 1024),
+            ttl_seconds=getattr(Config, 'CACHE_TTL_SECONDS', 7 * 24 * 3600),
+            persistent=getattr(Config, 'CACHE_PERSISTENT', True),
+        )
+        # Per-clause summaries for incremental mode, keyed by clause hash
+        self.clause_cache = ResultCache(
+            max_entries=getattr(Config, 'CLAUSE_CACHE_MAX_ENTRIES', 4096),
+            max_bytes=getattr(Config, 'CACHE_MAX_BYTES', 32 * 1024 * 1024),
+            ttl_seconds=getattr(Config, 'CACHE_TTL_SECONDS', 7 * 24 * 3600),
+            persistent=getattr(Config, 'CACHE_PERSISTENT', True),
+            name="clause",
+        )
+        self.single_flight = SingleFlight()
         
         try:
             self.api_keys = getattr(Config, 'GEMINI_API_KEYS', [])
-            self.model_name = getattr(Config, 'GEMINI_MODEL_NAME', 'gemini-2.5-pro')
+            # Model tiers, primary first. Results and clause summaries are cached
+            # under the primary's name whichever tier served them, on purpose:
+            # routing, failover and hedging are per-call latency decisions, so a
+            # faster tier's answer is shared with later requests for that document.
+            self.router = ModelRouter(
+                parse_model_tiers(getattr(Config, 'GEMINI_MODEL_TIERS', ''),
+                                  getattr(Config, 'GEMINI_MODEL_NAME', 'gemini-2.5-pro')),
+                hedge_percentile=getattr(Config, 'GEMINI_HEDGE_PERCENTILE', 95.0),
+                deadline=getattr(Config, 'GEMINI_LATENCY_DEADLINE_SECONDS', 30.0),
+                min_samples=getattr(Config, 'GEMINI_HEDGE_MIN_SAMPLES', 20),
+                hedging=getattr(Config, 'GEMINI_HEDGING', False),
+            )
+            self.model_name = self.router.primary
+            # One circuit per model tier: an outage of one model fails over to the next
+            self.breakers = {
+                tier.name: CircuitBreaker(
+                    f"gemini:{tier.name}",
+                    failure_threshold=getattr(Config, 'GEMINI_CIRCUIT_FAILURE_THRESHOLD', 5),
+                    reset_timeout=getattr(Config, 'GEMINI_CIRCUIT_RESET_SECONDS', 30.0),
+                )
+                for tier in self.router.tiers
+            }
+            if self.router.hedging:
+                # Sync hedges run here; the primary call of a hedge gets its own thread
+                self.hedge_pool = ThreadPoolExecutor(max_workers=getattr(Config, 'GEMINI_HEDGE_WORKERS', 64),
+                                                     thread_name_prefix="gemini-call")
+            self.chunk_threshold = getattr(Config, 'CHUNK_THRESHOLD_CHARS', 30000)
+            self.chunk_max_chars = getattr(Config, 'CHUNK_MAX_CHARS', 12000)
+            self.chunk_workers = getattr(Config, 'CHUNK_WORKERS', 4)
+            self.clause_min_chars = getattr(Config, 'CLAUSE_MIN_CHARS', 200)
+            self.token_budgets = parse_token_budgets(
+                getattr(Config, 'GEMINI_INPUT_TOKEN_BUDGETS', ''),
+                getattr(Config, 'GEMINI_INPUT_TOKEN_BUDGET', 8000),
+            )
 
             if not self.api_keys:
                 raise ValueError("GEMINI_API_KEYS list is empty in config.py. Please check .env file.")
 
-            self.current_key_index = 0
-            self._configure_client_with_current_key()
+            self.key_pool = KeyPool(
+                self.api_keys,
+                self._make_model,
+                requests_per_minute=getattr(Config, 'GEMINI_KEY_RPM', 5),
+                tokens_per_minute=getattr(Config, 'GEMINI_KEY_TPM', 250000),
+                base_cooldown=getattr(Config, 'GEMINI_KEY_COOLDOWN_SECONDS', 5.0),
+                max_cooldown=getattr(Config, 'GEMINI_KEY_MAX_COOLDOWN_SECONDS', 300.0),
+                max_wait=getattr(Config, 'GEMINI_KEY_MAX_WAIT_SECONDS', 5.0),
+            )
             
             self.available = True
-            print(f"✓ Gemini AI simplifier initialized with {len(self.api_keys)} API key(s). Using model: {self.model_name}")
+            logger.info(f"✓ Gemini AI simplifier initialized with {len(self.api_keys)} API key(s). "
+                        f"Using model: {self.model_name} (tiers: {', '.join(t.name for t in self.router.tiers)})")
 
         except Exception as e:
-            print(f"⚠️ Gemini initialization failed: {e}")
+            logger.warning(f"⚠️ Gemini initialization failed: {e}")
             self.available = False
 
-    def _configure_client_with_current_key(self):
-        """Helper function to configure genai and instantiate the model with the current key."""
-        current_key = self.api_keys[self.current_key_index]
-        print(f"--> Configuring Gemini with API Key #{self.current_key_index + 1}")
-        genai.configure(api_key=current_key)
-        self.model = genai.GenerativeModel(self.model_name)
-
-    def _switch_to_next_key(self) -> bool:
-        """Switches to the next API key. Returns True if successful, False if all keys are exhausted."""
-        print(f"⚠️ API Key #{self.current_key_index + 1} is rate-limited.")
-        self.current_key_index += 1
-        if self.current_key_index < len(self.api_keys):
-            self._configure_client_with_current_key()
-            return True
-        else:
-            print("🔴 All API keys have been exhausted.")
-            return False
+    def _make_model(self, api_key: str, model_name: str):
+        """
+        Builds a GenerativeModel bound to its own API key.
+        genai.configure() holds a single process-wide key, which concurrent
+        requests on different keys would race on, so each key gets its own client.
+        """
+        model = genai.GenerativeModel(model_name)
+        model._client = glm.GenerativeServiceClient(
+            client_options=self._client_options(api_key),
+            transport=getattr(Config, 'GEMINI_TRANSPORT', None),
+        )
+        if getattr(Config, 'GEMINI_TRANSPORT', None) == "rest":
+            self._size_rest_pool(model._client)
+        return model
 
-    def simplify_text(self, text: str) -> str:
-        """Simplifies a full legal document, automatically rotating API keys on quota errors."""
-        if not self.available:
-            return self._fallback_simplify(text, reason="Gemini model not available")
+    def _size_rest_pool(self, client):
+        """
+        The REST transport's requests session keeps at most 10 connections per
+        host, so under more concurrent calls than that each extra call opens a
+        connection and throws it away. Mount an adapter sized to the concurrency.
+        """
+        from requests.adapters import HTTPAdapter
+
+        adapter = HTTPAdapter(pool_maxsize=getattr(Config, 'GEMINI_REST_POOL_SIZE', 64))
+        for prefix in ("https://", "http://"):
+            client._transport._session.mount(prefix, adapter)
+
+    def _client_options(self, api_key: str) -> dict:
+        client_options = {"api_key": api_key}
+        api_endpoint = getattr(Config, 'GEMINI_API_ENDPOINT', None)
+        if api_endpoint:
+            client_options["api_endpoint"] = api_endpoint
+        return client_options
+
+    def warm_up(self):
+        """Import the Gemini SDK and build the per-key clients (run by the startup checks)."""
+        if self.key_pool is not None:
+            self.key_pool.warm_up([tier.name for tier in self.router.tiers])
+
+    def simplify_text(self, text: str, mode: str = "auto") -> str:
+        """
+        Simplifies a full legal document, automatically rotating API keys on quota errors.
+
+        mode is one of "auto", "single", "chunked" or "incremental". "auto" switches
+        to the map-reduce path for documents longer than CHUNK_THRESHOLD_CHARS;
+        "incremental" reuses stored clause summaries from earlier drafts.
+        """
+        return self.simplify(text, mode=mode)["simplified_text"]
+
+    def simplify(self, text: str, mode: str = "auto", admit=None) -> dict:
+        """
+        Same as simplify_text, but also reports how the result was produced.
+        Returns a dict with simplified_text, source ("gemini", "cache" or "fallback"), cache_key,
+        coalesced (True when the result was shared from an identical in-flight request),
+        entities (parties, defined terms, dates, amounts and governing law found locally),
+        usage (Gemini input/output tokens and calls per model spent on this request) and
+        model (the model tier that produced the final Gemini answer, None if none did).
+
+        admit is an optional context manager factory (AdmissionController.slot)
+        entered only around work that may call Gemini: cache hits and requests
+        that join an identical in-flight one never take a slot. Its exception
+        (AdmissionRejected) propagates, to joined requests as well.
+        """
+        if mode not in SIMPLIFY_MODES:
+            raise ValueError(f"Unknown simplify mode '{mode}'. Expected one of {', '.join(SIMPLIFY_MODES)}.")
 
         clean_text = (text or "").strip()
-        if not clean_text: return ""
+        entities = self._extract_entities(clean_text)
+        usage = TokenUsage()
+
+        if not self.available:
+            return {
+                "simplified_text": self._fallback_simplify(text, reason="Gemini model not available"),
+                "source": "fallback",
+                "cache_key": None,
+                "coalesced": False,
+                "entities": entities,
+                "usage": usage.as_dict(),
+                "model": None,
+            }
+
+        if not clean_text:
+            return {"simplified_text": "", "source": "empty", "cache_key": None, "coalesced": False,
+                    "entities": entities, "usage": usage.as_dict(), "model": usage.model}
+
+        cache_key = make_cache_key(clean_text, self.model_name, PROMPT_VERSION, mode)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            logger.debug(f"⚡ Cache hit for {cache_key[:12]}…")
+            return {"simplified_text": cached, "source": "cache", "cache_key": cache_key, "coalesced": False,
+                    "entities": entities, "usage": usage.as_dict(), "model": usage.model}
+
+        def run():
+            with (admit or nullcontext)():
+                return self._simplify_and_cache(clean_text, mode, cache_key, entities, usage)
+
+        # Identical documents already being simplified share that in-flight call;
+        # only the caller that made the call is charged for its tokens.
+        (simplified_text, source, model), coalesced = self.single_flight.do(cache_key, run)
+        self._record_usage(usage)
+        return {"simplified_text": simplified_text, "source": source, "cache_key": cache_key,
+                "coalesced": coalesced, "entities": entities, "usage": usage.as_dict(), "model": model}
+
+    def _simplify_and_cache(self, clean_text: str, mode: str, cache_key: str, entities: dict, usage: TokenUsage = None) -> tuple:
+        """Returns (simplified_text, source, model); model is the tier that served the final call."""
+        simplified_text, source = self._simplify_uncached(clean_text, mode, entities, usage)
+        if source != "fallback":
+            self.cache.set(cache_key, simplified_text)
+        return simplified_text, source, usage.model if usage is not None else None
 
-        if len(clean_text) > 30000:
-            clean_text = clean_text[:15000] + "\n\n...[DOCUMENT TRUNCATED]...\n\n" + clean_text[-15000:]
+    def _simplify_uncached(self, clean_text: str, mode: str, entities: dict, usage: TokenUsage = None) -> tuple:
+        """Runs the Gemini pipeline. Returns (simplified_text, source)."""
+        if mode == "incremental":
+            return self._simplify_incremental(clean_text, usage)
+        if mode == "chunked" or (mode == "auto" and len(clean_text) > self.chunk_threshold):
+            return self._simplify_chunked(clean_text, entities, usage)
 
+        prompt, model_name = self._single_prompt(clean_text, entities)
+        try:
+            return self._generate(prompt, usage, model_name), "gemini"
+        except exceptions.ResourceExhausted as e:
+            self._log_error(e)
+            return self._fallback_simplify(clean_text, reason="All API keys are rate-limited."), "fallback"
+        except Exception as e:
+            logger.warning(f"⚠️ An unrecoverable Gemini API error occurred, using fallback. Reason: {e}")
+            self._log_error(e)
+            return self._fallback_simplify(clean_text, reason=str(e)), "fallback"
+
+    def _extract_entities(self, clean_text: str) -> dict:
+        """Local legal NER; runs before any prompt is built."""
+        with time_stage("ner"):
+            return extract_entities(clean_text)
+
+    def _single_prompt(self, clean_text: str, entities: dict) -> tuple:
+        """
+        Builds the single-pass prompt: entity references, normalized whitespace,
+        no signature blocks or repeated paragraphs, fitted to the input token
+        budget of the model tier it is routed to. Returns (prompt, model_name).
+        """
+        with time_stage("prompt_build"):
+            document = compress_with_references(clean_text, entities)
+            # The tier depends on the prompt size, so fit to the primary's budget
+            # first; a tier with a smaller budget gets the document cut to its own.
+            budget = self._input_budget(self.model_name)
+            prompt_text, stats = compact_document(document, budget)
+            model_name, _ = self._route(len(self._build_prompt(prompt_text, entities)))
+            if self._input_budget(model_name) < budget:
+                prompt_text, stats = compact_document(document, self._input_budget(model_name))
+            logger.debug(f"✂️ Prompt compacted for {model_name}: {stats}")
+            return self._build_prompt(prompt_text, entities), model_name
+
+    def _input_budget(self, model_name: str) -> int:
+        return self.token_budgets.get(model_name, self.token_budgets["default"])
+
+    def _compact_for_chunks(self, clean_text: str, entities: dict) -> str:
+        # Chunked documents are covered in full, so nothing is cut to a budget here.
+        prompt_text, stats = compact_document(compress_with_references(clean_text, entities or {}))
+        logger.debug(f"✂️ Document compacted for chunking: {stats}")
+        return prompt_text
+
+    def _record_usage(self, usage: TokenUsage):
+        totals = usage.as_dict()
+        if totals["calls"]:
+            REQUEST_TOKENS.observe(totals["input_tokens"], direction="input")
+            REQUEST_TOKENS.observe(totals["output_tokens"], direction="output")
+
+    def _entities_block(self, entities: dict) -> str:
+        # Only the party list: later mentions of a party's full name were replaced by its role.
+        listing = format_entities(entities or {}, fields=("parties",))
+        if not listing:
+            return ""
+        return f"KEY ENTITIES (parties are referred to by their defined role in the document):\n{listing}\n"
+
+    def _build_prompt(self, clean_text: str, entities: dict = None) -> str:
+        """Builds the single-pass simplification prompt."""
         # This advanced prompt with an example is the key to high-quality results.
-        prompt = f"""
+        return f"""
         You are an expert legal analyst... (Full few-shot prompt from previous answer) ...
+        {self._entities_block(entities)}
         LEGAL DOCUMENT:
         ---
         {clean_text}
@@ -80,41 +346,875 @@ class AISimplifier:
         SIMPLIFIED SUMMARY:
         """
 
-        for _ in range(len(self.api_keys) - self.current_key_index):
+    def _generate(self, prompt: str, usage: TokenUsage = None, model_name: str = None) -> str:
+        """
+        Runs one prompt through Gemini on the model tier chosen for its size
+        (or on model_name, for a prompt already fitted to a tier). If that model is slower than usual, the prompt is also sent to the next
+        faster tier and the first answer wins (see ModelRouter).
+
+        Each call of a hedge counts its tokens on its own; only the winner's
+        are added to usage. A blocking call cannot be interrupted, so on this
+        path the loser still runs to the end on its thread and holds its API
+        key's in-flight slot until then; it only stops early if it is between
+        key rotations. The asyncio path (_generate_async) cancels the loser.
+        """
+        model_name, hedge_model = self._route(len(prompt), model_name)
+        if hedge_model is None:
+            return self._generate_on(prompt, usage, model_name)
+
+        # The primary starts at once on a thread of its own: queued behind the
+        # pool it would look slow and trigger a hedge it does not need. The
+        # pool only runs hedges, and only once one is due.
+        superseded = threading.Event()
+        primary = self._start_thread(self._hedged_call, prompt, model_name, superseded)
+        try:
+            try:
+                return self._charge(usage, *primary.result(timeout=self.router.hedge_delay(model_name, hedge_model)))
+            except FutureTimeout:
+                pass
+            except CircuitOpenError:
+                # Half-open, with another request probing the primary
+                return self._generate_on(prompt, usage, hedge_model)
+
+            logger.debug(f"🏎️ {model_name} is slow, hedging with {hedge_model}")
+            GEMINI_HEDGES.inc(outcome="sent")
+            hedge = self.hedge_pool.submit(self._hedged_call, prompt, hedge_model, superseded)
+            pending = {primary, hedge}
+            error = None
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        GEMINI_HEDGES.inc(outcome="hedge_won" if future is hedge else "primary_won")
+                        return self._charge(usage, *future.result())
+                    error = error or future.exception()
+            raise error
+        finally:
+            superseded.set()
+
+    def _hedged_call(self, prompt: str, model_name: str, superseded: threading.Event = None) -> tuple:
+        """One call of a hedge: (text, its own TokenUsage), so the loser's tokens are never charged."""
+        call_usage = TokenUsage()
+        return self._generate_on(prompt, call_usage, model_name, superseded), call_usage
+
+    def _charge(self, usage: TokenUsage, text: str, call_usage: TokenUsage) -> str:
+        if usage is not None:
+            usage.merge(call_usage)
+        return text
+
+    def _start_thread(self, fn, *args) -> Future:
+        """Run fn(*args) on a new thread and return its Future."""
+        future = Future()
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+
+        threading.Thread(target=run, name="gemini-call", daemon=True).start()
+        return future
+
+    def _route(self, prompt_chars: int, model_name: str = None) -> tuple:
+        """
+        router.route() (or model_name with its hedge tier, if given), going
+        straight to the next faster tier while the chosen model's circuit is open.
+        """
+        if model_name is None:
+            model_name, hedge_model = self.router.route(prompt_chars)
+        else:
+            hedge_model = self.router.next_tier(model_name) if self.router.hedging else None
+        failover = self.router.next_tier(model_name)
+        if failover is not None and self.breakers[model_name].is_open:
+            return failover, None
+        return model_name, hedge_model
+
+    def _breaker_for(self, model_name: str) -> CircuitBreaker:
+        """The model's circuit breaker; raises CircuitOpenError while it refuses calls."""
+        breaker = self.breakers[model_name]
+        if not breaker.allow():
+            raise CircuitOpenError(f"Gemini model {model_name} is failing; circuit open.")
+        return breaker
+
+    def _generate_on(self, prompt: str, usage: TokenUsage, model_name: str,
+                     superseded: threading.Event = None) -> str:
+        """
+        Runs one prompt on one model, rotating API keys on quota errors.
+        Raises ResourceExhausted once every key is rate-limited, CircuitOpenError
+        while the model's circuit is open, CancelledError if superseded is set
+        before the next key is tried, and re-raises any other error.
+        Tokens spent on the successful call are added to usage.
+        """
+        breaker = self._breaker_for(model_name)
+        try:
+            return self._generate_with_keys(prompt, usage, model_name, breaker, superseded)
+        finally:
+            breaker.release()
+
+    def _generate_with_keys(self, prompt: str, usage: TokenUsage, model_name: str, breaker: CircuitBreaker,
+                            superseded: threading.Event = None) -> str:
+        estimated_tokens = estimate_tokens(prompt)
+        for _ in range(len(self.key_pool)):
+            if superseded is not None and superseded.is_set():
+                raise CancelledError(f"{model_name} call superseded by the other call of its hedge.")
+            slot = self.key_pool.acquire(estimated_tokens)
+            if slot is None:
+                break
+            try:
+                started = time.perf_counter()
+                with time_stage("gemini_call"):
+                    response = slot.model_for(model_name).generate_content(
+                        prompt,
+                        generation_config=GENERATION_CONFIG,
+                        safety_settings=SAFETY_SETTINGS
+                    )
+                self.router.observe(model_name, time.perf_counter() - started)
+                breaker.record_success()   # a blocked answer still means the model is up
+
+                model_text = self._response_text(response)
+                input_tokens, output_tokens = self._count_tokens(response, estimated_tokens, model_text)
+                self.key_pool.report_success(slot, estimated_tokens, input_tokens + output_tokens)
+                self._add_usage(usage, input_tokens, output_tokens, model_name)
+                return model_text
+
+            except rate_limit_errors():
+                self.key_pool.report_rate_limited(slot)
+                KEY_ROTATIONS.inc()
+            except Exception as e:
+                self.key_pool.report_error(slot)
+                if isinstance(e, outage_errors()):
+                    breaker.record_failure()
+                raise
+
+        logger.warning("🔴 All API keys are rate-limited or cooling down.")
+        raise exceptions.ResourceExhausted("All available API keys failed due to rate limits.")
+
+    def _response_text(self, response) -> str:
+        """Text of a complete response; raises ValueError for blocked or empty output."""
+        if not response.parts:
+            BLOCKED_RESPONSES.inc()
+            finish_reason = response.candidates[0].finish_reason.name if response.candidates else "UNKNOWN"
+            raise ValueError(f"Blocked response. Finish Reason: {finish_reason}")
+
+        model_text = (response.text or "").strip()
+        if not model_text:
+            raise ValueError("Gemini returned an empty string.")
+        return model_text
+
+    def _count_tokens(self, response, estimated_input: int, model_text: str) -> tuple:
+        """(input, output) tokens: the API's usage_metadata when present, otherwise estimates."""
+        metadata = getattr(response, "usage_metadata", None)
+        if metadata is not None and getattr(metadata, "prompt_token_count", 0):
+            return metadata.prompt_token_count, getattr(metadata, "candidates_token_count", 0) or estimate_tokens(model_text)
+        return estimated_input, estimate_tokens(model_text)
+
+    def _add_usage(self, usage: TokenUsage, input_tokens: int, output_tokens: int, model_name: str):
+        GEMINI_TOKENS.inc(input_tokens, direction="input")
+        GEMINI_TOKENS.inc(output_tokens, direction="output")
+        GEMINI_CALLS.inc(model=model_name)
+        if usage is not None:
+            usage.add(input_tokens, output_tokens, model_name)
+
+    # ==========================================================
+    # 🧩 Map-Reduce Simplification for Long Documents
+    # ==========================================================
+
+    def _simplify_chunked(self, clean_text: str, entities: dict = None, usage: TokenUsage = None) -> tuple:
+        """
+        Splits the document on clause boundaries, simplifies every chunk in
+        parallel on a bounded thread pool and merges the partial summaries
+        with a single reduce pass. Returns (simplified_text, source).
+        """
+        chunks = self._chunk_document(clean_text, entities)
+        if len(chunks) == 1:
             try:
-                generation_config = {"temperature": 0.1, "max_output_tokens": 4096}
-                safety_settings = [{"category": c, "threshold": "BLOCK_NONE"} for c in ["HARM_CATEGORY_HARASSMENT", "HARM_CATEGORY_HATE_SPEECH", "HARM_CATEGORY_SEXUALLY_EXPLICIT", "HARM_CATEGORY_DANGEROUS_CONTENT"]]
+                return self._generate(self._build_prompt(chunks[0], entities), usage), "gemini"
+            except Exception as e:
+                self._log_error(e)
+                return self._fallback_simplify(clean_text, reason=str(e)), "fallback"
+
+        partials, source = self._map_chunks(chunks, usage)
+        try:
+            return self._generate(self._build_reduce_prompt(partials, entities), usage), source
+        except Exception as e:
+            logger.warning(f"⚠️ Reduce pass failed, returning the per-part summaries. Reason: {e}")
+            self._log_error(e)
+            return "\n\n".join(f"**Part {i + 1}**\n{p}" for i, p in enumerate(partials)), "fallback"
+
+    def _chunk_document(self, clean_text: str, entities: dict = None) -> list:
+        with time_stage("prompt_build"):
+            return split_into_chunks(self._compact_for_chunks(clean_text, entities), max_chars=self.chunk_max_chars)
+
+    def _map_chunks(self, chunks: list, usage: TokenUsage = None) -> tuple:
+        """Simplifies chunks in parallel. Returns (partial_summaries, source)."""
+        logger.debug(f"🧩 Simplifying {len(chunks)} chunks with up to {self.chunk_workers} worker(s)")
+        workers = min(self.chunk_workers, len(chunks))
+        source = "gemini"
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="simplify-chunk") as pool:
+            with time_stage("prompt_build"):
+                prompts = [self._build_chunk_prompt(chunk, i + 1, len(chunks)) for i, chunk in enumerate(chunks)]
+            futures = [pool.submit(self._generate, prompt, usage) for prompt in prompts]
+
+            partials = []
+            for i, future in enumerate(futures):
+                try:
+                    partials.append(future.result())
+                except Exception as e:
+                    logger.warning(f"⚠️ Chunk {i + 1}/{len(chunks)} failed, using fallback for that part. Reason: {e}")
+                    self._log_error(e)
+                    partials.append(self._fallback_simplify(chunks[i], reason=str(e)))
+                    source = "fallback"
+        return partials, source
+
+    def _build_chunk_prompt(self, chunk: str, index: int, total: int) -> str:
+        """Builds the map prompt for one part of a long document."""
+        return f"""
+        You are an expert legal analyst. The following is part {index} of {total} of a longer legal document.
+        Summarize this part in plain English. Keep clause numbers, parties, amounts, dates and obligations.
+        Do not add an introduction or conclusion; another step will merge all parts.
+        DOCUMENT PART {index}/{total}:
+        ---
+        {chunk}
+        ---
+        PART SUMMARY:
+        """
+
+    def _build_reduce_prompt(self, partials: list, entities: dict = None) -> str:
+        """Builds the reduce prompt that merges per-chunk summaries into one result."""
+        joined = "\n\n".join(f"PART {i + 1}:\n{p}" for i, p in enumerate(partials))
+        return f"""
+        You are an expert legal analyst. Below are plain-English summaries of consecutive parts of one legal document.
+        Merge them into a single simplified summary of the whole document, in document order.
+        Remove repetition between parts and keep every obligation, right, deadline and amount.
+        {self._entities_block(entities)}
+        PART SUMMARIES:
+        ---
+        {joined}
+        ---
+        SIMPLIFIED SUMMARY:
+        """
+
+    # ==========================================================
+    # 🧷 Clause-level Incremental Simplification
+    # ==========================================================
+
+    def _simplify_incremental(self, clean_text: str, usage: TokenUsage = None) -> tuple:
+        """
+        Simplifies a document clause by clause, reusing the stored summary of
+        every clause whose text is unchanged since an earlier draft. Only new
+        or edited clauses go to Gemini; the summaries are stitched back
+        together in document order. Returns (simplified_text, source).
+        """
+        clauses, keys, summaries, changed = self._lookup_clauses(clean_text)
+
+        source = "gemini" if changed else "cache"
+        if changed:
+            workers = min(self.chunk_workers, len(changed))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="simplify-clause") as pool:
+                futures = {i: pool.submit(self._generate, self._build_clause_prompt(clauses[i]), usage) for i in changed}
+                for i, future in futures.items():
+                    try:
+                        summaries[i] = future.result()
+                        self.clause_cache.set(keys[i], summaries[i])
+                    except Exception as e:
+                        logger.warning(f"⚠️ Clause {i + 1}/{len(clauses)} failed, using fallback for that clause. Reason: {e}")
+                        self._log_error(e)
+                        summaries[i] = self._fallback_simplify(clauses[i], reason=str(e))
+                        source = "fallback"
+
+        return "\n\n".join(summaries), source
 
-                response = self.model.generate_content(
+    def _lookup_clauses(self, clean_text: str) -> tuple:
+        """Splits the document into clauses and looks up stored summaries. Returns (clauses, keys, summaries, changed)."""
+        with time_stage("prompt_build"):
+            clauses = split_into_clauses(clean_text, min_chars=self.clause_min_chars)
+            keys = [self._clause_key(clause) for clause in clauses]
+
+        summaries = [self.clause_cache.get(key) for key in keys]
+        changed = [i for i, summary in enumerate(summaries) if summary is None]
+        CLAUSE_REQUESTS.inc(len(clauses) - len(changed), outcome="reused")
+        CLAUSE_REQUESTS.inc(len(changed), outcome="simplified")
+        logger.info(f"🧷 Incremental simplify: {len(clauses) - len(changed)}/{len(clauses)} clause(s) reused, {len(changed)} sent to Gemini")
+        return clauses, keys, summaries, changed
+
+    def _clause_key(self, clause: str) -> str:
+        # Keyed by the primary model, like results (see __init__)
+        return f"clause:{content_hash(clause)}:{self.model_name}:{PROMPT_VERSION}"
+
+    def _build_clause_prompt(self, clause: str) -> str:
+        """Builds the prompt for one clause of a document simplified incrementally."""
+        return f"""
+        You are an expert legal analyst. The following is one clause of a legal agreement.
+        Restate it in plain English in a few short bullet points, starting with the clause number and heading if it has one.
+        Keep parties, amounts, dates and obligations. Do not add an introduction or conclusion.
+        CLAUSE:
+        ---
+        {normalize_whitespace(clause)}
+        ---
+        PLAIN-ENGLISH CLAUSE:
+        """
+
+    # ==========================================================
+    # 📡 Streaming Simplification
+    # ==========================================================
+
+    def stream_simplify(self, text: str, mode: str = "auto", admit=None):
+        """
+        Generator version of simplify() that yields (event, data) tuples as
+        Gemini produces output:
+
+            ("chunk", text)     incremental simplified text
+            ("reset", reason)   a stream failed partway; discard text received so far
+            ("fallback", text)  complete fallback output after Gemini failed
+            ("done", result)    final dict with simplified_text, source, cache_key, entities, usage and model
+
+        Long documents run the map phase first and stream only the reduce pass;
+        incremental mode sends the stitched clause summaries as a single chunk.
+        admit works as in simplify(): a slot is taken only on a cache miss, before
+        the first event, and held until the stream ends or is closed.
+        """
+        if mode not in SIMPLIFY_MODES:
+            raise ValueError(f"Unknown simplify mode '{mode}'. Expected one of {', '.join(SIMPLIFY_MODES)}.")
+
+        clean_text = (text or "").strip()
+        entities = self._extract_entities(clean_text)
+        usage = TokenUsage()
+
+        if not self.available:
+            fallback = self._fallback_simplify(text, reason="Gemini model not available")
+            yield "fallback", fallback
+            yield "done", {"simplified_text": fallback, "source": "fallback", "cache_key": None,
+                           "entities": entities, "usage": usage.as_dict(), "model": usage.model}
+            return
+
+        if not clean_text:
+            yield "done", {"simplified_text": "", "source": "empty", "cache_key": None,
+                           "entities": entities, "usage": usage.as_dict(), "model": usage.model}
+            return
+
+        cache_key = make_cache_key(clean_text, self.model_name, PROMPT_VERSION, mode)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            yield "chunk", cached
+            yield "done", {"simplified_text": cached, "source": "cache", "cache_key": cache_key,
+                           "entities": entities, "usage": usage.as_dict(), "model": usage.model}
+            return
+
+        with (admit or nullcontext)():
+            yield from self._stream_uncached(clean_text, mode, cache_key, entities, usage)
+
+    def _stream_uncached(self, clean_text: str, mode: str, cache_key: str, entities: dict, usage: TokenUsage):
+        """The Gemini part of stream_simplify(), after the cache missed."""
+        if mode == "incremental":
+            # Only changed clauses are generated, in parallel; send the stitched result at once.
+            simplified_text, source = self._simplify_incremental(clean_text, usage)
+            if source == "fallback":
+                yield "fallback", simplified_text
+            else:
+                yield "chunk", simplified_text
+                self.cache.set(cache_key, simplified_text)
+            self._record_usage(usage)
+            yield "done", {"simplified_text": simplified_text, "source": source, "cache_key": cache_key,
+                           "entities": entities, "usage": usage.as_dict(), "model": usage.model}
+            return
+
+        source = "gemini"
+        model_name = None
+        if mode == "chunked" or (mode == "auto" and len(clean_text) > self.chunk_threshold):
+            chunks = self._chunk_document(clean_text, entities)
+            if len(chunks) > 1:
+                partials, source = self._map_chunks(chunks, usage)
+                prompt = self._build_reduce_prompt(partials, entities)
+            else:
+                prompt = self._build_prompt(chunks[0], entities)
+        else:
+            prompt, model_name = self._single_prompt(clean_text, entities)
+
+        pieces = []
+        try:
+            for event, data in self._stream_generate(prompt, usage, model_name):
+                if event == "reset":
+                    pieces = []
+                else:
+                    pieces.append(data)
+                yield event, data
+            simplified_text = "".join(pieces).strip()
+        except Exception as e:
+            logger.warning(f"⚠️ Gemini stream failed, using fallback. Reason: {e}")
+            self._log_error(e)
+            if pieces:
+                yield "reset", str(e)
+            simplified_text = self._fallback_simplify(clean_text, reason=str(e))
+            source = "fallback"
+            yield "fallback", simplified_text
+
+        if source == "gemini":
+            self.cache.set(cache_key, simplified_text)
+        self._record_usage(usage)
+        yield "done", {"simplified_text": simplified_text, "source": source, "cache_key": cache_key,
+                       "entities": entities, "usage": usage.as_dict(), "model": usage.model}
+
+    def _stream_generate(self, prompt: str, usage: TokenUsage = None, model_name: str = None):
+        """
+        Streams one prompt through Gemini, yielding ("chunk", text) events.
+        If a key is rate-limited partway through, yields ("reset", reason)
+        and restarts the stream on the next key.
+        """
+        # Streams go to the tier chosen for the prompt size but are not hedged:
+        # text already sent to the client cannot be swapped for another model's.
+        model_name, _ = self._route(len(prompt), model_name)
+        breaker = self._breaker_for(model_name)
+        try:
+            yield from self._stream_with_keys(prompt, usage, model_name, breaker)
+        finally:
+            breaker.release()
+
+    def _stream_with_keys(self, prompt: str, usage: TokenUsage, model_name: str, breaker: CircuitBreaker):
+        estimated_tokens = estimate_tokens(prompt)
+        for _ in range(len(self.key_pool)):
+            slot = self.key_pool.acquire(estimated_tokens)
+            if slot is None:
+                break
+            emitted = []
+            started = time.perf_counter()
+            try:
+                response = slot.model_for(model_name).generate_content(
                     prompt,
-                    generation_config=generation_config,
-                    safety_settings=safety_settings
+                    generation_config=GENERATION_CONFIG,
+                    safety_settings=SAFETY_SETTINGS,
+                    stream=True
                 )
-                
-                if not response.parts:
-                    finish_reason = response.candidates[0].finish_reason.name if response.candidates else "UNKNOWN"
-                    raise ValueError(f"Blocked response. Finish Reason: {finish_reason}")
-                
-                model_text = (response.text or "").strip()
-                if model_text:
-                    return model_text
-                else:
-                    raise ValueError("Gemini returned an empty string.")
+                for chunk in response:
+                    if not chunk.parts:
+                        continue
+                    piece = chunk.text
+                    if piece:
+                        emitted.append(piece)
+                        yield "chunk", piece
 
-            except exceptions.ResourceExhausted as e:
-                if not self._switch_to_next_key():
-                    self._log_error(e)
-                    return self._fallback_simplify(text, reason="All API keys are rate-limited.")
-            
+                breaker.record_success()
+                if not emitted:
+                    raise ValueError("Gemini stream ended without any text.")
+                STAGE_LATENCY.observe(time.perf_counter() - started, stage="gemini_call")
+                self.router.observe(model_name, time.perf_counter() - started)
+                # The last streamed chunk carries usage_metadata when the API reports it
+                input_tokens, output_tokens = self._count_tokens(chunk, estimated_tokens, "".join(emitted))
+                self.key_pool.report_success(slot, estimated_tokens, input_tokens + output_tokens)
+                self._add_usage(usage, input_tokens, output_tokens, model_name)
+                return
+
+            except rate_limit_errors():
+                self.key_pool.report_rate_limited(slot)
+                KEY_ROTATIONS.inc()
+                if emitted:
+                    yield "reset", "API key rate-limited during stream"
+            except BaseException as e:
+                # Includes GeneratorExit when the client disconnects mid-stream.
+                self.key_pool.report_error(slot)
+                if isinstance(e, outage_errors()):
+                    breaker.record_failure()
+                raise
+
+        logger.warning("🔴 All API keys are rate-limited or cooling down.")
+        raise exceptions.ResourceExhausted("All available API keys failed due to rate limits.")
+
+    # ==========================================================
+    # ⚡ Async Simplification (ASGI serving mode)
+    # ==========================================================
+
+    async def simplify_async(self, text: str, mode: str = "auto", admit=None) -> dict:
+        """
+        Coroutine version of simplify() used by the ASGI server (asgi.py).
+        Gemini calls are awaited on the gRPC asyncio transport, so a request
+        waiting on the model holds no thread. Local CPU and database work
+        (NER, prompt building, cache lookups, fallback) runs in worker threads.
+        admit works as in simplify(), with an async context manager
+        (AdmissionController.slot_async).
+        """
+        if mode not in SIMPLIFY_MODES:
+            raise ValueError(f"Unknown simplify mode '{mode}'. Expected one of {', '.join(SIMPLIFY_MODES)}.")
+
+        clean_text = (text or "").strip()
+        entities = await asyncio.to_thread(self._extract_entities, clean_text)
+        usage = TokenUsage()
+
+        if not self.available:
+            fallback = await asyncio.to_thread(self._fallback_simplify, text, "Gemini model not available")
+            return {"simplified_text": fallback, "source": "fallback", "cache_key": None, "coalesced": False,
+                    "entities": entities, "usage": usage.as_dict(), "model": usage.model}
+
+        if not clean_text:
+            return {"simplified_text": "", "source": "empty", "cache_key": None, "coalesced": False,
+                    "entities": entities, "usage": usage.as_dict(), "model": usage.model}
+
+        cache_key = make_cache_key(clean_text, self.model_name, PROMPT_VERSION, mode)
+        cached = await asyncio.to_thread(self.cache.get, cache_key)
+        if cached is not None:
+            return {"simplified_text": cached, "source": "cache", "cache_key": cache_key, "coalesced": False,
+                    "entities": entities, "usage": usage.as_dict(), "model": usage.model}
+
+        async def run():
+            async with (admit or nullcontext)():
+                return await self._simplify_and_cache_async(clean_text, mode, cache_key, entities, usage)
+
+        (simplified_text, source, model), coalesced = await self.single_flight.do_async(cache_key, run)
+        self._record_usage(usage)
+        return {"simplified_text": simplified_text, "source": source, "cache_key": cache_key,
+                "coalesced": coalesced, "entities": entities, "usage": usage.as_dict(), "model": model}
+
+    async def _simplify_and_cache_async(self, clean_text: str, mode: str, cache_key: str, entities: dict,
+                                        usage: TokenUsage) -> tuple:
+        simplified_text, source = await self._simplify_uncached_async(clean_text, mode, entities, usage)
+        if source != "fallback":
+            await asyncio.to_thread(self.cache.set, cache_key, simplified_text)
+        return simplified_text, source, usage.model
+
+    async def _simplify_uncached_async(self, clean_text: str, mode: str, entities: dict, usage: TokenUsage) -> tuple:
+        if mode == "incremental":
+            return await self._simplify_incremental_async(clean_text, usage)
+        if mode == "chunked" or (mode == "auto" and len(clean_text) > self.chunk_threshold):
+            return await self._simplify_chunked_async(clean_text, entities, usage)
+
+        prompt, model_name = await asyncio.to_thread(self._single_prompt, clean_text, entities)
+        try:
+            return await self._generate_async(prompt, usage, model_name), "gemini"
+        except Exception as e:
+            logger.warning(f"⚠️ Gemini API error, using fallback. Reason: {e}")
+            self._log_error(e)
+            return await asyncio.to_thread(self._fallback_simplify, clean_text, str(e)), "fallback"
+
+    async def _simplify_chunked_async(self, clean_text: str, entities: dict, usage: TokenUsage) -> tuple:
+        chunks = await asyncio.to_thread(self._chunk_document, clean_text, entities)
+        if len(chunks) == 1:
+            try:
+                return await self._generate_async(self._build_prompt(chunks[0], entities), usage), "gemini"
             except Exception as e:
-                print(f"⚠️ An unrecoverable Gemini API error occurred, using fallback. Reason: {e}")
                 self._log_error(e)
-                return self._fallback_simplify(text, reason=str(e))
-        
-        return self._fallback_simplify(text, reason="All available API keys failed due to rate limits.")
+                return await asyncio.to_thread(self._fallback_simplify, clean_text, str(e)), "fallback"
+
+        partials, source = await self._map_chunks_async(chunks, usage)
+        try:
+            return await self._generate_async(self._build_reduce_prompt(partials, entities), usage), source
+        except Exception as e:
+            logger.warning(f"⚠️ Reduce pass failed, returning the per-part summaries. Reason: {e}")
+            self._log_error(e)
+            return "\n\n".join(f"**Part {i + 1}**\n{p}" for i, p in enumerate(partials)), "fallback"
+
+    async def _map_chunks_async(self, chunks: list, usage: TokenUsage) -> tuple:
+        """Coroutine version of _map_chunks(). Returns (partials, source)."""
+        prompts = [self._build_chunk_prompt(chunk, i + 1, len(chunks)) for i, chunk in enumerate(chunks)]
+        partials = await self._generate_many_async(prompts, usage)
+        source = "gemini"
+        for i, partial in enumerate(partials):
+            if isinstance(partial, Exception):
+                logger.warning(f"⚠️ Chunk {i + 1}/{len(chunks)} failed, using fallback for that part. Reason: {partial}")
+                self._log_error(partial)
+                partials[i] = await asyncio.to_thread(self._fallback_simplify, chunks[i], str(partial))
+                source = "fallback"
+        return partials, source
+
+    async def _simplify_incremental_async(self, clean_text: str, usage: TokenUsage) -> tuple:
+        clauses, keys, summaries, changed = await asyncio.to_thread(self._lookup_clauses, clean_text)
+        if not changed:
+            return "\n\n".join(summaries), "cache"
+
+        source = "gemini"
+        results = await self._generate_many_async([self._build_clause_prompt(clauses[i]) for i in changed], usage)
+        for i, result in zip(changed, results):
+            if isinstance(result, Exception):
+                logger.warning(f"⚠️ Clause {i + 1}/{len(clauses)} failed, using fallback for that clause. Reason: {result}")
+                self._log_error(result)
+                summaries[i] = await asyncio.to_thread(self._fallback_simplify, clauses[i], str(result))
+                source = "fallback"
+            else:
+                summaries[i] = result
+                await asyncio.to_thread(self.clause_cache.set, keys[i], result)
+        return "\n\n".join(summaries), source
+
+    async def _generate_many_async(self, prompts: list, usage: TokenUsage) -> list:
+        """Runs prompts concurrently, at most CHUNK_WORKERS at a time; failed prompts yield their exception."""
+        limit = asyncio.Semaphore(self.chunk_workers)
+
+        async def run(prompt):
+            async with limit:
+                return await self._generate_async(prompt, usage)
+
+        return list(await asyncio.gather(*(run(prompt) for prompt in prompts), return_exceptions=True))
+
+    async def _generate_async(self, prompt: str, usage: TokenUsage = None, model_name: str = None) -> str:
+        """
+        Coroutine version of _generate(): same routing and hedging, but never
+        blocks the event loop, and the losing call of a hedge is cancelled.
+        """
+        model_name, hedge_model = self._route(len(prompt), model_name)
+        if hedge_model is None:
+            return await self._generate_on_async(prompt, usage, model_name)
+
+        primary = asyncio.ensure_future(self._hedged_call_async(prompt, model_name))
+        tasks = [primary]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.router.hedge_delay(model_name, hedge_model))
+            if done:
+                if isinstance(primary.exception(), CircuitOpenError):
+                    return await self._generate_on_async(prompt, usage, hedge_model)
+                return self._charge(usage, *primary.result())
+
+            logger.debug(f"🏎️ {model_name} is slow, hedging with {hedge_model}")
+            GEMINI_HEDGES.inc(outcome="sent")
+            hedge = asyncio.ensure_future(self._hedged_call_async(prompt, hedge_model))
+            tasks.append(hedge)
+            pending = set(tasks)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        GEMINI_HEDGES.inc(outcome="hedge_won" if task is hedge else "primary_won")
+                        return self._charge(usage, *task.result())
+                    error = error or task.exception()
+            raise error
+        finally:
+            # Also covers this request being cancelled while it waits
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _hedged_call_async(self, prompt: str, model_name: str) -> tuple:
+        """Coroutine version of _hedged_call()."""
+        call_usage = TokenUsage()
+        return await self._generate_on_async(prompt, call_usage, model_name), call_usage
+
+    async def _generate_on_async(self, prompt: str, usage: TokenUsage, model_name: str) -> str:
+        """Coroutine version of _generate_on(): same key rotation and circuit breaker on one model."""
+        breaker = self._breaker_for(model_name)
+        try:
+            return await self._generate_with_keys_async(prompt, usage, model_name, breaker)
+        finally:
+            breaker.release()
+
+    async def _generate_with_keys_async(self, prompt: str, usage: TokenUsage, model_name: str,
+                                        breaker: CircuitBreaker) -> str:
+        estimated_tokens = estimate_tokens(prompt)
+        for _ in range(len(self.key_pool)):
+            slot = await self.key_pool.acquire_async(estimated_tokens)
+            if slot is None:
+                break
+            try:
+                started = time.perf_counter()
+                response = await self._generate_content_async(slot, prompt, model_name)
+                STAGE_LATENCY.observe(time.perf_counter() - started, stage="gemini_call")
+                self.router.observe(model_name, time.perf_counter() - started)
+                breaker.record_success()
+
+                model_text = self._response_text(response)
+                input_tokens, output_tokens = self._count_tokens(response, estimated_tokens, model_text)
+                self.key_pool.report_success(slot, estimated_tokens, input_tokens + output_tokens)
+                self._add_usage(usage, input_tokens, output_tokens, model_name)
+                return model_text
+
+            except rate_limit_errors():
+                self.key_pool.report_rate_limited(slot)
+                KEY_ROTATIONS.inc()
+            except asyncio.CancelledError:
+                # The client disconnected or a hedged call finished first. The time so
+                # far is a lower bound on this call's latency; keep it so a slowing
+                # model still raises its percentile.
+                self.router.observe(model_name, time.perf_counter() - started)
+                self.key_pool.release(slot)
+                raise
+            except BaseException as e:
+                self.key_pool.report_error(slot)
+                if isinstance(e, outage_errors()):
+                    breaker.record_failure()
+                raise
+
+        logger.warning("🔴 All API keys are rate-limited or cooling down.")
+        raise exceptions.ResourceExhausted("All available API keys failed due to rate limits.")
+
+    async def _generate_content_async(self, slot, prompt: str, model_name: str):
+        if getattr(Config, 'GEMINI_TRANSPORT', None) == "rest":
+            # The async client only speaks gRPC; keep the loop free by using a thread instead.
+            return await asyncio.to_thread(
+                slot.model_for(model_name).generate_content, prompt,
+                generation_config=GENERATION_CONFIG, safety_settings=SAFETY_SETTINGS
+            )
+        return await self._async_model(slot, model_name).generate_content_async(
+            prompt,
+            generation_config=GENERATION_CONFIG,
+            safety_settings=SAFETY_SETTINGS
+        )
+
+    def _async_model(self, slot, model_name: str):
+        """The key's model for model_name, with its gRPC asyncio client."""
+        model = slot.model_for(model_name)
+        if model._async_client is None:
+            # Created inside the running loop, which the gRPC asyncio channel is bound to.
+            model._async_client = glm.GenerativeServiceAsyncClient(
+                client_options=self._client_options(slot.api_key),
+                transport="grpc_asyncio",
+            )
+        return model
+
+    # ==========================================================
+    # 📡 Async Streaming Simplification (ASGI serving mode)
+    # ==========================================================
+
+    async def stream_simplify_async(self, text: str, mode: str = "auto", admit=None):
+        """
+        Async generator version of stream_simplify() used by the ASGI server:
+        the same events, with Gemini streamed on the gRPC asyncio transport.
+        admit works as in simplify_async().
+        """
+        if mode not in SIMPLIFY_MODES:
+            raise ValueError(f"Unknown simplify mode '{mode}'. Expected one of {', '.join(SIMPLIFY_MODES)}.")
+
+        clean_text = (text or "").strip()
+        entities = await asyncio.to_thread(self._extract_entities, clean_text)
+        usage = TokenUsage()
+
+        if not self.available:
+            fallback = await asyncio.to_thread(self._fallback_simplify, text, "Gemini model not available")
+            yield "fallback", fallback
+            yield "done", {"simplified_text": fallback, "source": "fallback", "cache_key": None,
+                           "entities": entities, "usage": usage.as_dict(), "model": usage.model}
+            return
+
+        if not clean_text:
+            yield "done", {"simplified_text": "", "source": "empty", "cache_key": None,
+                           "entities": entities, "usage": usage.as_dict(), "model": usage.model}
+            return
+
+        cache_key = make_cache_key(clean_text, self.model_name, PROMPT_VERSION, mode)
+        cached = await asyncio.to_thread(self.cache.get, cache_key)
+        if cached is not None:
+            yield "chunk", cached
+            yield "done", {"simplified_text": cached, "source": "cache", "cache_key": cache_key,
+                           "entities": entities, "usage": usage.as_dict(), "model": usage.model}
+            return
+
+        async with (admit or nullcontext)():
+            async for event in self._stream_uncached_async(clean_text, mode, cache_key, entities, usage):
+                yield event
+
+    async def _stream_uncached_async(self, clean_text: str, mode: str, cache_key: str, entities: dict,
+                                     usage: TokenUsage):
+        """Coroutine version of _stream_uncached()."""
+        if mode == "incremental":
+            simplified_text, source = await self._simplify_incremental_async(clean_text, usage)
+            if source == "fallback":
+                yield "fallback", simplified_text
+            else:
+                yield "chunk", simplified_text
+                await asyncio.to_thread(self.cache.set, cache_key, simplified_text)
+            self._record_usage(usage)
+            yield "done", {"simplified_text": simplified_text, "source": source, "cache_key": cache_key,
+                           "entities": entities, "usage": usage.as_dict(), "model": usage.model}
+            return
+
+        source = "gemini"
+        model_name = None
+        if mode == "chunked" or (mode == "auto" and len(clean_text) > self.chunk_threshold):
+            chunks = await asyncio.to_thread(self._chunk_document, clean_text, entities)
+            if len(chunks) > 1:
+                partials, source = await self._map_chunks_async(chunks, usage)
+                prompt = self._build_reduce_prompt(partials, entities)
+            else:
+                prompt = self._build_prompt(chunks[0], entities)
+        else:
+            prompt, model_name = await asyncio.to_thread(self._single_prompt, clean_text, entities)
+
+        pieces = []
+        try:
+            async for event, data in self._stream_generate_async(prompt, usage, model_name):
+                if event == "reset":
+                    pieces = []
+                else:
+                    pieces.append(data)
+                yield event, data
+            simplified_text = "".join(pieces).strip()
+        except Exception as e:
+            logger.warning(f"⚠️ Gemini stream failed, using fallback. Reason: {e}")
+            self._log_error(e)
+            if pieces:
+                yield "reset", str(e)
+            simplified_text = await asyncio.to_thread(self._fallback_simplify, clean_text, str(e))
+            source = "fallback"
+            yield "fallback", simplified_text
+
+        if source == "gemini":
+            await asyncio.to_thread(self.cache.set, cache_key, simplified_text)
+        self._record_usage(usage)
+        yield "done", {"simplified_text": simplified_text, "source": source, "cache_key": cache_key,
+                       "entities": entities, "usage": usage.as_dict(), "model": usage.model}
+
+    async def _stream_generate_async(self, prompt: str, usage: TokenUsage = None, model_name: str = None):
+        """Coroutine version of _stream_generate(): same routing, key rotation and reset events."""
+        model_name, _ = self._route(len(prompt), model_name)
+        if getattr(Config, 'GEMINI_TRANSPORT', None) == "rest":
+            # The async client only speaks gRPC: pull the blocking stream one event at a time on a thread
+            async for event in _iterate_in_thread(self._stream_generate(prompt, usage, model_name)):
+                yield event
+            return
+
+        breaker = self._breaker_for(model_name)
+        try:
+            async for event in self._stream_with_keys_async(prompt, usage, model_name, breaker):
+                yield event
+        finally:
+            breaker.release()
+
+    async def _stream_with_keys_async(self, prompt: str, usage: TokenUsage, model_name: str,
+                                      breaker: CircuitBreaker):
+        estimated_tokens = estimate_tokens(prompt)
+        for _ in range(len(self.key_pool)):
+            slot = await self.key_pool.acquire_async(estimated_tokens)
+            if slot is None:
+                break
+            emitted = []
+            started = time.perf_counter()
+            try:
+                response = await self._async_model(slot, model_name).generate_content_async(
+                    prompt,
+                    generation_config=GENERATION_CONFIG,
+                    safety_settings=SAFETY_SETTINGS,
+                    stream=True
+                )
+                async for chunk in response:
+                    if not chunk.parts:
+                        continue
+                    piece = chunk.text
+                    if piece:
+                        emitted.append(piece)
+                        yield "chunk", piece
+
+                breaker.record_success()
+                if not emitted:
+                    raise ValueError("Gemini stream ended without any text.")
+                STAGE_LATENCY.observe(time.perf_counter() - started, stage="gemini_call")
+                self.router.observe(model_name, time.perf_counter() - started)
+                input_tokens, output_tokens = self._count_tokens(chunk, estimated_tokens, "".join(emitted))
+                self.key_pool.report_success(slot, estimated_tokens, input_tokens + output_tokens)
+                self._add_usage(usage, input_tokens, output_tokens, model_name)
+                return
+
+            except rate_limit_errors():
+                self.key_pool.report_rate_limited(slot)
+                KEY_ROTATIONS.inc()
+                if emitted:
+                    yield "reset", "API key rate-limited during stream"
+            except BaseException as e:
+                # Includes cancellation and GeneratorExit when the client disconnects mid-stream.
+                self.key_pool.report_error(slot)
+                if isinstance(e, outage_errors()):
+                    breaker.record_failure()
+                raise
+
+        logger.warning("🔴 All API keys are rate-limited or cooling down.")
+        raise exceptions.ResourceExhausted("All available API keys failed due to rate limits.")
 
     def _log_error(self, error: Exception):
-        # ... (same as before)
         """Logs errors with timestamp."""
         os.makedirs("backend/logs", exist_ok=True)
         log_path = os.path.join("backend/logs", "gemini_errors.log")
@@ -122,31 +1222,29 @@ class AISimplifier:
         with open(log_path, "a", encoding="utf-8") as f:
             f.write(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] {type(error).__name__}: {error}\n")
 
-        print(f"📝 Error logged to {log_path}")
-        pass
+        logger.debug(f"📝 Error logged to {log_path}")
 
     def _fallback_simplify(self, text: str, reason: str = "Unknown") -> str:
-        # ... (same as before)
         """Fallback simplification logic if Gemini fails."""
-        print(f"⚙️ Using fallback simplifier. Reason: {reason}")
+        logger.warning(f"⚙️ Using fallback simplifier. Reason: {reason}")
+        FALLBACKS.inc()
+        with time_stage("fallback"):
+            return self._fallback_summary(text, reason)
 
+    def _fallback_summary(self, text: str, reason: str) -> str:
+        """Local extractive summary: key sentences per clause, rewritten in plain English."""
         try:
-            simplified = re.sub(r"\b(herein|thereof|whereas|therein|thereby|hereto)\b", "", text, flags=re.IGNORECASE)
-            simplified = re.sub(r"\s+", " ", simplified).strip()
-
-            # Short fallback summary (not AI, just a placeholder)
             summary = (
                 "⚠️ AI Simplifier is temporarily unavailable.\n"
-                "Here is a cleaned version of your document for readability:\n\n"
-                f"{simplified[:1500]}{'...' if len(simplified) > 1500 else ''}"
+                "Here are the key points of each clause, automatically extracted and reworded:\n\n"
+                f"{summarize(text)}"
             )
             return summary
         except Exception as e:
             return f"⚠️ Simplifier unavailable. Reason: {reason}. Fallback failed: {e}"
-        pass
+
 
 if __name__ == '__main__':
-    # ... (same as before)
     ai = AISimplifier()
     sample_text = """
     This Agreement shall be governed by and construed in accordance with the laws
@@ -155,4 +1253,3 @@ if __name__ == '__main__':
     result = ai.simplify_text(sample_text)
     print("\n=== Simplified Document ===\n")
     print(result)
-    pass
\ No newline at end of file
@@ -0,0 +1,86 @@
+import re
+
+# ==========================================================
+# ✂️ Clause-aware Document Chunking
+# ==========================================================
+
+# A new segment starts at an ARTICLE/SECTION heading or a numbered clause
+# such as "1.", "1.1" or "3.2.4" at the beginning of a line.
+CLAUSE_BOUNDARY = re.compile(
+    r"(?m)^(?=[ \t]*(?:ARTICLE\s+[IVXLCDM\d]+\b|SECTION\s+\d+\b|\d+(?:\.\d+)*\.?[ \t]+\S))",
+    re.IGNORECASE,
+)
+PARAGRAPH_BOUNDARY = re.compile(r"\n\s*\n")
+
+
+def split_into_segments(text):
+    """
+    Split a document on clause and article boundaries.
+    Returns a list of non-empty segments in document order.
+    """
+    segments = []
+    start = 0
+    for match in CLAUSE_BOUNDARY.finditer(text):
+        if match.start() > start:
+            segments.append(text[start:match.start()])
+        start = match.start()
+    segments.append(text[start:])
+    return [s for s in segments if s.strip()]
+
+
+def _split_oversized(segment, max_chars):
+    """Break a single segment that is larger than max_chars on paragraphs, then hard-wrap."""
+    pieces = []
+    for paragraph in PARAGRAPH_BOUNDARY.split(segment):
+        while len(paragraph) > max_chars:
+            cut = paragraph.rfind(". ", 0, max_chars)
+            cut = cut + 1 if cut > max_chars // 2 else max_chars
+            pieces.append(paragraph[:cut])
+            paragraph = paragraph[cut:]
+        if paragraph.strip():
+            pieces.append(paragraph + "\n\n")
+    return pieces
+
+
+def split_into_chunks(text, max_chars=12000):
+    """
+    Pack clause segments into chunks of at most max_chars characters.
+    Clauses are never split unless a single clause is larger than a chunk.
+    """
+    chunks = []
+    current = []
+    current_len = 0
+
+    for segment in split_into_segments(text):
+        parts = [segment] if len(segment) <= max_chars else _split_oversized(segment, max_chars)
+        for part in parts:
+            if current and current_len + len(part) > max_chars:
+                chunks.append("".join(current).strip())
+                current, current_len = [], 0
+            current.append(part)
+            current_len += len(part)
+
+    if current:
+        chunks.append("".join(current).strip())
+    return [c for c in chunks if c]
+
+
+def split_into_clauses(text, min_chars=200):
+    """
+    Split a document into clauses for incremental simplification.
+    Headings and other segments shorter than min_chars are attached to the
+    clause that follows, so each clause carries its own context.
+    """
+    clauses = []
+    pending = ""
+    for segment in split_into_segments(text):
+        pending += segment
+        if len(pending.strip()) >= min_chars:
+            clauses.append(pending.strip())
+            pending = ""
+    if pending.strip():
+        if clauses:
+            clauses[-1] = clauses[-1] + "\n\n" + pending.strip()
+        else:
+            clauses.append(pending.strip())
+    return clauses
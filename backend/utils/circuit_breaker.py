@@ -0,0 +1,135 @@
+import logging
+import threading
+import time
+
+from .metrics import CIRCUIT_REJECTIONS, CIRCUIT_TRANSITIONS
+
+logger = logging.getLogger(__name__)
+
+# ==========================================================
+# 🔌 Circuit Breakers (fail fast while a dependency is down)
+# ==========================================================
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Tracks one dependency's health in three states.
+
+    Closed: calls go through; failure_threshold consecutive failures open the
+    circuit. Open: allow() refuses every call for reset_timeout seconds, so
+    callers fall back at once instead of waiting for a timeout. Half-open: one
+    probe call is let through; its success closes the circuit and its failure
+    opens it again. A probe that ends without a verdict (see release) or
+    never reports back frees the slot for the next probe.
+
+    Only failures that mean the dependency is unreachable or broken should be
+    recorded; bad requests and quota errors are not the dependency's fault.
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_timeout=30.0):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started = None
+        self.rejected = 0
+        self.trips = 0
+        self._lock = threading.Lock()
+
+        with _breakers_lock:
+            _breakers[name] = self
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    @property
+    def is_open(self):
+        """True while calls are refused outright (open and not yet due for a probe)."""
+        return self.state == OPEN
+
+    def allow(self):
+        """Whether a call may go ahead now. A refused call should fail fast."""
+        now = time.monotonic()
+        with self._lock:
+            state = self._current_state(now)
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and (self._probe_started is None
+                                       or now - self._probe_started >= self.reset_timeout):
+                self._probe_started = now
+                return True
+            self.rejected += 1
+        CIRCUIT_REJECTIONS.inc(breaker=self.name)
+        return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            if self._state != CLOSED:
+                self._transition(CLOSED)
+
+    def record_failure(self):
+        now = time.monotonic()
+        with self._lock:
+            state = self._current_state(now)
+            self._failures += 1
+            if state == HALF_OPEN or (state == CLOSED and self._failures >= self.failure_threshold):
+                self._opened_at = now
+                self.trips += 1
+                self._transition(OPEN)
+
+    def release(self):
+        """A call that was allowed ended without a verdict (cancelled, rate-limited): free the probe slot."""
+        with self._lock:
+            self._probe_started = None
+
+    def _current_state(self, now):
+        # Open turns half-open lazily, on the first look after reset_timeout
+        if self._state == OPEN and now - self._opened_at >= self.reset_timeout:
+            self._transition(HALF_OPEN)
+        return self._state
+
+    def _transition(self, state):
+        self._state = state
+        self._probe_started = None
+        CIRCUIT_TRANSITIONS.inc(breaker=self.name, state=state)
+        if state == OPEN:
+            logger.warning(f"🔌 Circuit '{self.name}' opened after {self._failures} failure(s); "
+                           f"failing fast for {self.reset_timeout:g}s.")
+        else:
+            logger.info(f"🔌 Circuit '{self.name}' is {state.replace('_', '-')}.")
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            state = self._current_state(now)
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "trips": self.trips,
+                "rejected": self.rejected,
+                "retry_in": round(max(0.0, self._opened_at + self.reset_timeout - now), 1) if state == OPEN else 0.0,
+            }
+
+
+def circuit_breaker_stats():
+    """State of every circuit breaker in the process, by name."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.stats() for breaker in breakers}
@@ -1,28 +1,242 @@
-import cloudinary
-import cloudinary.uploader
-import cloudinary.api
+import hashlib
+import logging
 import os
+import random
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from .database import attach_archive_url, find_archived_upload, save_archived_upload
+from .lazy_import import lazy_module
+from .metrics import ARCHIVE_UPLOADS
+
+cloudinary = lazy_module("cloudinary")
+cloudinary_uploader = lazy_module("cloudinary.uploader")
+
+logger = logging.getLogger(__name__)
+
+_configured = False
+_configure_lock = threading.Lock()
+
+
+def cloudinary_enabled():
+    """Credentials come from CLOUDINARY_URL or the three CLOUDINARY_* variables."""
+    return bool(os.getenv('CLOUDINARY_URL') or os.getenv('CLOUDINARY_CLOUD_NAME'))
+
 
 def configure_cloudinary():
-    cloudinary.config(
-        cloud_name=os.getenv('CLOUDINARY_CLOUD_NAME'),
-        api_key=os.getenv('CLOUDINARY_API_KEY'),
-        api_secret=os.getenv('CLOUDINARY_API_SECRET')
+    global _configured
+    if _configured:
+        return
+    with _configure_lock:
+        # Without explicit variables the SDK reads CLOUDINARY_URL by itself
+        if os.getenv('CLOUDINARY_CLOUD_NAME'):
+            cloudinary.config(
+                cloud_name=os.getenv('CLOUDINARY_CLOUD_NAME'),
+                api_key=os.getenv('CLOUDINARY_API_KEY'),
+                api_secret=os.getenv('CLOUDINARY_API_SECRET')
+            )
+        _configured = True
+
+
+def upload_document_to_cloud(file, filename, content_hash):
+    """
+    Upload an original document (a path, file object or bytes) and return its
+    URL. The public id is the content hash, so identical files map to one
+    asset and are never overwritten. Raises on failure.
+    """
+    configure_cloudinary()
+    extension = os.path.splitext(filename or "")[1].lower()
+    result = cloudinary_uploader.upload(
+        file,
+        folder="legal_documents/originals",
+        public_id=f"{content_hash}{extension}",
+        resource_type="raw",  # Any file type, kept byte for byte
+        overwrite=False,
+        unique_filename=False,
     )
+    return result['secure_url']
 
-def upload_document_to_cloud(file_content, filename, user_session):
+
+# ==========================================================
+# 📦 Background Upload Archiving
+# ==========================================================
+
+
+class _HistoryNotWritten(Exception):
+    """The history record is still in the write-behind queue."""
+
+
+def _file_sha256(path, chunk_size=64 * 1024):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _remove(path):
     try:
-        configure_cloudinary()
-        
-        # Upload to cloudinary
-        result = cloudinary.uploader.upload(
-            file_content,
-            folder=f"legal_documents/{user_session}",
-            public_id=f"{filename}_{datetime.now().timestamp()}",
-            resource_type="raw"  # For text files
-        )
-        
-        return result['secure_url']
-    except Exception as e:
-        print(f"Cloudinary upload failed: {e}")
-        return None
\ No newline at end of file
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+class UploadArchiver:
+    """
+    Archives original uploads to Cloudinary on a small worker pool, off the
+    request path. Uploads are copied to a temporary file on disk (spool) and
+    the archiver owns that file from submit() on, so no request holds the raw
+    bytes in memory. Files are deduplicated by SHA-256: a hash uploaded before
+    (in this process or, via MongoDB, by any worker) reuses its URL, and
+    concurrent uploads of the same file share one upload. Uploads are retried
+    with exponential backoff, then the URL is set on the history record.
+    """
+
+    def __init__(self, max_workers=2, max_pending=100, max_retries=4, backoff_seconds=2.0, max_known=4096):
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_known = max_known
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="archive")
+        self._known = OrderedDict()   # content hash -> URL (LRU)
+        self._in_flight = {}          # content hash -> history records waiting for its URL
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return cloudinary_enabled()
+
+    def spool(self, stream, max_bytes, chunk_size=64 * 1024):
+        """
+        Copy an upload stream to a temporary file, in chunks, and rewind the
+        stream. Returns the path, to be passed to submit() or discard(), or
+        None if the upload is larger than max_bytes.
+        """
+        fd, path = tempfile.mkstemp(prefix="archive-")
+        size = 0
+        with os.fdopen(fd, "wb") as out:
+            for chunk in iter(lambda: stream.read(chunk_size), b""):
+                size += len(chunk)
+                if size > max_bytes:
+                    break
+                out.write(chunk)
+        stream.seek(0)
+        if size > max_bytes:
+            _remove(path)
+            return None
+        return path
+
+    def discard(self, path):
+        """Delete a spooled upload that will not be archived."""
+        if path:
+            _remove(path)
+
+    def submit(self, path, filename, user_session, document_id):
+        """
+        Queue a spooled upload for archiving; the archiver deletes the file
+        when done. Never blocks: returns False (and the upload is not
+        archived) when the queue is full.
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                ARCHIVE_UPLOADS.inc(outcome="dropped")
+                logger.warning(f"⚠️ Archive queue full, not archiving {filename}.")
+                _remove(path)
+                return False
+            self._pending += 1
+        self._executor.submit(self._run, path, filename, (user_session, document_id))
+        return True
+
+    def stats(self):
+        with self._lock:
+            return {"pending": self._pending, "in_flight": len(self._in_flight), "known": len(self._known)}
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, path, filename, target):
+        try:
+            content_hash = _file_sha256(path)
+            with self._lock:
+                url = self._known.get(content_hash)
+                if url is not None:
+                    self._known.move_to_end(content_hash)
+                elif content_hash in self._in_flight:
+                    # Another worker is uploading the same file and attaches the URL for us
+                    self._in_flight[content_hash].append(target)
+                    ARCHIVE_UPLOADS.inc(outcome="deduplicated")
+                    return
+                else:
+                    self._in_flight[content_hash] = [target]
+
+            if url is not None:
+                ARCHIVE_UPLOADS.inc(outcome="deduplicated")
+                self._attach(target, url)
+                return
+
+            targets = [target]
+            try:
+                url = self._archive(path, filename, content_hash)
+            finally:
+                with self._lock:
+                    targets = self._in_flight.pop(content_hash)
+                    if url is not None:
+                        self._known[content_hash] = url
+                        while len(self._known) > self.max_known:
+                            self._known.popitem(last=False)
+            if url is not None:
+                for target in targets:
+                    self._attach(target, url)
+        except Exception as e:
+            logger.error(f"❌ Archiving {filename} failed: {e}")
+        finally:
+            _remove(path)
+            with self._lock:
+                self._pending -= 1
+
+    def _archive(self, path, filename, content_hash):
+        """URL of the archived file, uploading it only if no worker has before. None on failure."""
+        url = find_archived_upload(content_hash)
+        if url is not None:
+            ARCHIVE_UPLOADS.inc(outcome="deduplicated")
+            return url
+        try:
+            url = self._retry(lambda: upload_document_to_cloud(path, filename, content_hash))
+        except Exception as e:
+            ARCHIVE_UPLOADS.inc(outcome="failed")
+            logger.error(f"❌ Cloudinary upload failed after {self.max_retries + 1} attempt(s): {e}")
+            return None
+        ARCHIVE_UPLOADS.inc(outcome="uploaded")
+        logger.debug(f"☁️ Archived {filename} → {url}")
+        save_archived_upload(content_hash, url, filename)
+        return url
+
+    def _attach(self, target, url):
+        user_session, document_id = target
+
+        def attach():
+            matched = attach_archive_url(user_session, document_id, url)
+            if matched == 0:
+                raise _HistoryNotWritten()
+
+        try:
+            self._retry(attach)
+        except _HistoryNotWritten:
+            logger.debug(f"⚠️ No history record for document {document_id[:12]}; archive URL not attached.")
+        except Exception as e:
+            logger.error(f"❌ Attaching archive URL failed: {e}")
+
+    def _retry(self, fn):
+        """Call fn, retrying with jittered exponential backoff."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                return fn()
+            except Exception:
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(self.backoff_seconds * (2 ** attempt) * random.uniform(0.5, 1.5))
@@ -1,113 +1,846 @@
+import atexit
+import base64
+import hashlib
+import logging
 import os
-from pymongo import MongoClient
-from datetime import datetime
-import cloudinary
-import cloudinary.uploader
-import cloudinary.api
+import queue
+import re
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from .circuit_breaker import CircuitBreaker, OPEN
+from .lazy_import import lazy_module
+from .metrics import time_stage, CACHE_REQUESTS
+
+# The driver is imported on first use (normally by the background startup check)
+pymongo = lazy_module("pymongo")
+gridfs = lazy_module("gridfs")
+bson = lazy_module("bson")
+
+DESCENDING = -1   # pymongo.DESCENDING, without importing the driver
+
+logger = logging.getLogger(__name__)
 
 # ==========================================================
 # 🧠 MongoDB Connection Setup
 # ==========================================================
 
+# One pooled client per worker process. MongoClient is thread-safe and keeps
+# its own connection pool, so every request reuses the same TLS connections.
+_client = None
+_client_lock = threading.Lock()
+_warned_missing_uri = False
+
+# While Atlas is unreachable every operation would wait serverSelectionTimeoutMS.
+# After a few connectivity failures the circuit opens and get_mongodb_client()
+# returns None, so reads come back empty and writes are skipped at once.
+mongodb_breaker = CircuitBreaker(
+    "mongodb",
+    failure_threshold=int(os.getenv('MONGODB_CIRCUIT_FAILURE_THRESHOLD', 3)),
+    reset_timeout=float(os.getenv('MONGODB_CIRCUIT_RESET_SECONDS', 30)),
+)
+
+
+def _record_failure(error):
+    """Count connectivity errors against the circuit; query errors do not mean Atlas is down."""
+    if isinstance(error, pymongo.errors.ConnectionFailure):
+        mongodb_breaker.record_failure()
+
+
+def _breaker_listener():
+    """Command listener that reports every successful command to the circuit breaker."""
+    class BreakerListener(pymongo.monitoring.CommandListener):
+        def started(self, event):
+            pass
+
+        def succeeded(self, event):
+            mongodb_breaker.record_success()
+
+        def failed(self, event):
+            pass    # connectivity errors reach the helpers, which report them
+
+    return BreakerListener()
+
+
 def get_mongodb_client():
     """
-    Establish and return a MongoDB Atlas client.
+    Return the process-wide MongoDB Atlas client, creating it on first use.
     Reads URI from environment variable MONGODB_URI.
+    The client is shared and must not be closed by callers.
+    Returns None while the MongoDB circuit is open.
     """
+    global _client, _warned_missing_uri
+    if not mongodb_breaker.allow():
+        return None
+    if _client is not None:
+        return _client
+
     mongodb_uri = os.getenv('MONGODB_URI')
     if not mongodb_uri:
-        print("⚠️ MONGODB_URI not set. Please check your .env file.")
+        if not _warned_missing_uri:
+            logger.warning("⚠️ MONGODB_URI not set. Please check your .env file.")
+            _warned_missing_uri = True
         return None
 
+    with _client_lock:
+        if _client is not None:
+            return _client
+        if mongodb_breaker.state == OPEN:
+            return None     # tripped while this thread waited for the lock
+        client = None
+        try:
+            client = pymongo.MongoClient(
+                mongodb_uri,
+                serverSelectionTimeoutMS=5000,
+                maxPoolSize=int(os.getenv('MONGODB_MAX_POOL_SIZE', 20)),
+                event_listeners=[_breaker_listener()],
+            )
+            # Ping the server once to verify connection
+            client.admin.command('ping')
+            logger.info("✓ Connected to MongoDB Atlas")
+            _client = client
+            return _client
+        except Exception as e:
+            logger.error(f"❌ MongoDB connection failed: {e}")
+            _record_failure(e)
+            if client is not None:
+                client.close()    # stop its monitor threads; every probe builds a new one
+            return None
+
+
+def ensure_history_indexes(client=None):
+    """
+    Create the indexes behind history listing, search and retention:
+    (user_session, timestamp, _id) for the listing, a text index on stored
+    documents for search, and TTL indexes on expires_at. create_index is a
+    no-op when the index already exists.
+    """
+    client = client or get_mongodb_client()
+    if not client:
+        return False
     try:
-        client = MongoClient(mongodb_uri, serverSelectionTimeoutMS=5000)
-        # Ping the server to verify connection
-        client.admin.command('ping')
-        print("✓ Connected to MongoDB Atlas")
-        return client
+        db = client["legal_documents"]
+        db["history"].create_index(
+            [("user_session", 1), ("timestamp", DESCENDING), ("_id", DESCENDING)],
+            name="user_session_timestamp",
+        )
+        db["history"].create_index([("user_session", 1), ("document_id", 1)], name="user_session_document")
+        db["history"].create_index("expires_at", expireAfterSeconds=0, name="history_retention")
+        db["documents"].create_index([("search_text", "text"), ("filename", "text")], name="document_search",
+                                     weights={"filename": 5, "search_text": 1}, default_language="english")
+        db["documents"].create_index("sessions", name="document_sessions")
+        db["documents"].create_index("expires_at", expireAfterSeconds=0, name="document_retention")
+        logger.info("✓ History indexes ready")
+        return True
     except Exception as e:
-        print(f"❌ MongoDB connection failed: {e}")
-        return None
+        logger.error(f"❌ Could not create history index: {e}")
+        _record_failure(e)
+        return False
+
+
+def close_mongodb_client():
+    """Flush pending history writes and close the shared client (worker shutdown)."""
+    global _client
+    history_writer.stop()
+    with _client_lock:
+        if _client is not None:
+            _client.close()
+            _client = None
 
 
 # ==========================================================
-# 💾 Save Simplification History
+# 📝 Write-behind History Queue
 # ==========================================================
 
-def save_document_history(user_session, original_text, simplified_text, filename=None):
+class HistoryWriter:
     """
-    Save the document simplification record to MongoDB.
-    Returns the inserted document ID if successful, else None.
+    Buffers history records in memory and inserts them in batches with
+    insert_many on a background thread, so requests never wait on MongoDB.
     """
-    client = get_mongodb_client()
-    if not client:
-        print("⚠️ No MongoDB client. Skipping insert.")
+
+    def __init__(self, batch_size=50, flush_interval=1.0, max_queue=10000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._stopping = threading.Event()
+
+    def submit(self, entry):
+        """Queue a history record for insertion. Writes inline if the queue is full."""
+        self.submit_many([entry])
+
+    def submit_many(self, entries):
+        """
+        Queue several records as one unit; they are always written by the
+        same insert_many call. Writes inline if the queue is full.
+        """
+        if not entries:
+            return
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(list(entries))
+        except queue.Full:
+            logger.warning(f"⚠️ History queue full, writing {len(entries)} record(s) synchronously.")
+            self._insert(list(entries))
+
+    def flush(self):
+        """Block until every queued record has been written (or dropped on error)."""
+        self._queue.join()
+
+    def stop(self, timeout=10.0):
+        """Drain the queue and stop the background thread."""
+        if self._thread is None:
+            return
+        self._stopping.set()
+        self._thread.join(timeout)
+        self._thread = None
+
+    def pending(self):
+        """Queued submissions (a bulk submission counts once)."""
+        return self._queue.qsize()
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._stopping.clear()
+                self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                batch = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                if self._stopping.is_set():
+                    return
+                continue
+            units = 1
+
+            while len(batch) < self.batch_size:
+                try:
+                    batch = batch + self._queue.get_nowait()
+                    units += 1
+                except queue.Empty:
+                    break
+
+            self._insert(batch)
+            for _ in range(units):
+                self._queue.task_done()
+
+    def _store_documents(self, client, documents):
+        # A failed document upsert must not cost the history records
+        try:
+            store_documents(client, documents)
+        except Exception as e:
+            logger.error(f"❌ Error storing full documents in MongoDB: {e}")
+
+    def _insert(self, batch):
+        # Full texts travel with the entry under "_document" and are stored separately
+        documents = [entry.pop("_document") for entry in batch if "_document" in entry]
+        client = get_mongodb_client()
+        if not client:
+            logger.warning(f"⚠️ No MongoDB client. Dropping {len(batch)} history record(s).")
+            return
+        try:
+            with time_stage("mongodb_save"):
+                self._store_documents(client, documents)
+                client["legal_documents"]["history"].insert_many(batch, ordered=False)
+            logger.debug(f"✅ MongoDB bulk insert success! {len(batch)} history record(s) written.")
+        except Exception as e:
+            logger.error(f"❌ Error saving history batch to MongoDB: {e}")
+            _record_failure(e)
+        finally:
+            # Partially written batches invalidate too, so readers never keep a stale page.
+            for user_session in {entry["user_session"] for entry in batch}:
+                history_page_cache.invalidate(user_session)
+
+
+history_writer = HistoryWriter(
+    batch_size=int(os.getenv('HISTORY_BATCH_SIZE', 50)),
+    flush_interval=float(os.getenv('HISTORY_FLUSH_INTERVAL', 1.0)),
+    max_queue=int(os.getenv('HISTORY_QUEUE_SIZE', 10000)),
+)
+atexit.register(close_mongodb_client)
+
+
+# ==========================================================
+# 🗜️ Compressed, Deduplicated Document Store
+# ==========================================================
+
+# Full uploads are stored once per content hash in the "documents" collection,
+# zlib-compressed, or in GridFS when even the compressed text is large.
+HISTORY_RETENTION_DAYS = float(os.getenv('HISTORY_RETENTION_DAYS', 90))
+DOCUMENT_GRIDFS_THRESHOLD_BYTES = int(os.getenv('DOCUMENT_GRIDFS_THRESHOLD_BYTES', 1024 * 1024))
+SEARCH_MAX_WORDS = int(os.getenv('SEARCH_MAX_WORDS', 20000))
+
+_SEARCH_WORD = re.compile(r"\w[\w'-]*")
+_last_gridfs_purge = 0.0
+
+
+def compress_text(text):
+    return bson.Binary(zlib.compress(text.encode("utf-8"), 6))
+
+
+def decompress_text(data):
+    return zlib.decompress(data).decode("utf-8") if data else ""
+
+
+def document_id_for(text):
+    """Content hash used to store each distinct upload once."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _search_text(original_text, entities):
+    """
+    What the text index sees: party names, defined terms and the distinct words
+    of the document in order of first use. Far smaller than the document itself.
+    """
+    seen = set()
+    words = []
+    for word in _SEARCH_WORD.findall(original_text.lower()):
+        if word not in seen:
+            seen.add(word)
+            words.append(word)
+            if len(words) >= SEARCH_MAX_WORDS:
+                break
+    names = [party["name"] for party in entities.get("parties", [])] + entities.get("defined_terms", [])
+    return " ".join(names + words)
+
+
+def _retention_deadline():
+    return datetime.utcnow() + timedelta(days=HISTORY_RETENTION_DAYS)
+
+
+def store_documents(client, documents):
+    """
+    Upsert full documents by content hash. Text and search fields are only
+    written on first insert; later saves add the session and extend retention.
+    """
+    if not documents:
+        return
+    db = client["legal_documents"]
+
+    # The same upload twice in one batch becomes a single upsert
+    unique = {}
+    for document in documents:
+        first = unique.setdefault(document["_id"], {**document, "sessions": set()})
+        first["sessions"].add(document["user_session"])
+
+    operations = []
+    for document in unique.values():
+        compressed = compress_text(document["text"])
+        on_insert = {
+            "filename": document["filename"],
+            "size": len(document["text"]),
+            "parties": [party["name"] for party in document["entities"].get("parties", [])],
+            "search_text": _search_text(document["text"], document["entities"]),
+            "created_at": datetime.utcnow(),
+        }
+        if len(compressed) >= DOCUMENT_GRIDFS_THRESHOLD_BYTES:
+            on_insert["gridfs_id"] = _put_gridfs(db, document["_id"], compressed, document["expires_at"])
+        else:
+            on_insert["original_z"] = compressed
+        operations.append(pymongo.UpdateOne(
+            {"_id": document["_id"]},
+            {
+                "$setOnInsert": on_insert,
+                "$addToSet": {"sessions": {"$each": sorted(document["sessions"])}},
+                "$max": {"expires_at": document["expires_at"]},
+            },
+            upsert=True,
+        ))
+    db["documents"].bulk_write(operations, ordered=False)
+    _purge_expired_gridfs(db)
+
+
+def _put_gridfs(db, document_id, compressed, expires_at):
+    fs = gridfs.GridFS(db)
+    if not fs.exists(document_id):
+        try:
+            fs.put(bytes(compressed), _id=document_id, metadata={"expires_at": expires_at})
+        except gridfs.errors.FileExists:
+            pass    # another worker stored the same document first
+    else:
+        db["fs.files"].update_one({"_id": document_id}, {"$max": {"metadata.expires_at": expires_at}})
+    return document_id
+
+
+def _purge_expired_gridfs(db, interval_seconds=3600):
+    """TTL indexes cannot remove GridFS chunks, so expired files are deleted here at most hourly."""
+    global _last_gridfs_purge
+    if time.monotonic() - _last_gridfs_purge < interval_seconds:
+        return
+    _last_gridfs_purge = time.monotonic()
+    fs = gridfs.GridFS(db)
+    for expired in db["fs.files"].find({"metadata.expires_at": {"$lt": datetime.utcnow()}}, {"_id": 1}):
+        fs.delete(expired["_id"])
+
+
+def load_document_text(client, document_id):
+    """Full original text of a stored document, or None if it expired."""
+    db = client["legal_documents"]
+    document = db["documents"].find_one({"_id": document_id}, {"original_z": 1, "gridfs_id": 1})
+    if not document:
         return None
+    if document.get("gridfs_id"):
+        return decompress_text(gridfs.GridFS(db).get(document["gridfs_id"]).read())
+    return decompress_text(document.get("original_z"))
 
-    try:
-        db = client["legal_documents"]     # Database name
-        collection = db["history"]         # Collection name
 
-        history_entry = {
-            "user_session": user_session or "unknown_user",
-            "original_text": original_text[:500],   # Store only first 500 chars
-            "simplified_text": simplified_text[:500],
+# ==========================================================
+# 💾 Save Simplification History
+# ==========================================================
+
+def _history_entry(user_session, original_text, simplified_text, filename=None, entities=None):
+    user_session = user_session or "unknown_user"
+    document_id = document_id_for(original_text)
+    expires_at = _retention_deadline()
+    return {
+        "_id": bson.ObjectId(),
+        "user_session": user_session,
+        "document_id": document_id,
+        "original_text": original_text[:500],   # Previews for the history list
+        "simplified_text": simplified_text[:500],
+        "simplified_z": compress_text(simplified_text),
+        "filename": filename,
+        "timestamp": datetime.utcnow(),
+        "expires_at": expires_at,
+        "status": "completed",
+        "_document": {
+            "_id": document_id,
+            "text": original_text,
             "filename": filename,
-            "timestamp": datetime.utcnow(),
-            "status": "completed"
-        }
+            "entities": entities or {},
+            "user_session": user_session,
+            "expires_at": expires_at,
+        },
+    }
 
-        print("🟡 Attempting to insert document into MongoDB...")
-        result = collection.insert_one(history_entry)
-        print(f"✅ MongoDB insert success! Document ID: {result.inserted_id}")
 
-        client.close()
-        return str(result.inserted_id)
+def save_document_history(user_session, original_text, simplified_text, filename=None, entities=None):
+    """
+    Queue the document simplification record for MongoDB.
+    The id is generated client-side, so it is returned immediately
+    while the insert happens in the background.
+    """
+    history_entry = _history_entry(user_session, original_text, simplified_text, filename, entities)
+    history_writer.submit(history_entry)
+    return str(history_entry["_id"])
 
-    except Exception as e:
-        print(f"❌ Error saving to MongoDB: {e}")
+
+def save_document_history_many(user_session, documents):
+    """
+    Queue the records for a batch of documents as a single bulk insert.
+    documents is a list of (original_text, simplified_text, filename, entities)
+    tuples; returns the history ids in the same order.
+    """
+    entries = [
+        _history_entry(user_session, original_text, simplified_text, filename, entities)
+        for original_text, simplified_text, filename, entities in documents
+    ]
+    history_writer.submit_many(entries)
+    return [str(entry["_id"]) for entry in entries]
+
+
+# ==========================================================
+# 🗂️ Per-session History Page Cache
+# ==========================================================
+
+class HistoryPageCache:
+    """
+    Short-lived cache of history pages, grouped by session so a new save can
+    drop every cached page of that session at once. A generation counter per
+    session stops a read that raced with a save from caching the old page.
+    """
+
+    def __init__(self, ttl_seconds=30.0, max_sessions=1024):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()   # user_session -> {(cursor, page_size): (expires_at, page)}
+        self._generations = {}
+        self._lock = threading.Lock()
+
+    def generation(self, user_session):
+        with self._lock:
+            return self._generations.get(user_session, 0)
+
+    def get(self, user_session, page_key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.get(user_session, {}).get(page_key)
+            if entry is not None and entry[0] > now:
+                self._sessions.move_to_end(user_session)
+                CACHE_REQUESTS.inc(cache="history", outcome="memory_hit")
+                return entry[1]
+        CACHE_REQUESTS.inc(cache="history", outcome="miss")
         return None
 
+    def set(self, user_session, page_key, page, generation):
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            if self._generations.get(user_session, 0) != generation:
+                return
+            pages = self._sessions.setdefault(user_session, {})
+            pages[page_key] = (time.monotonic() + self.ttl_seconds, page)
+            self._sessions.move_to_end(user_session)
+            while len(self._sessions) > self.max_sessions:
+                evicted, _ = self._sessions.popitem(last=False)
+                self._generations.pop(evicted, None)
+
+    def invalidate(self, user_session):
+        with self._lock:
+            self._sessions.pop(user_session, None)
+            self._generations[user_session] = self._generations.get(user_session, 0) + 1
+
+
+history_page_cache = HistoryPageCache(
+    ttl_seconds=float(os.getenv('HISTORY_CACHE_TTL_SECONDS', 30)),
+    max_sessions=int(os.getenv('HISTORY_CACHE_MAX_SESSIONS', 1024)),
+)
+
 
 # ==========================================================
 # 📜 Fetch Simplification History
 # ==========================================================
 
-def get_user_history(user_session, limit=10):
+# Only what the history list shows; the stored texts are cut to a short preview.
+HISTORY_LIST_PROJECTION = {
+    "filename": 1,
+    "timestamp": 1,
+    "status": 1,
+    "preview": {"$substrCP": [{"$ifNull": ["$simplified_text", ""]}, 0, 160]},
+}
+
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+def encode_history_cursor(item):
+    """Opaque keyset cursor pointing just after item (timestamp, _id)."""
+    # Timestamps are naive UTC with millisecond precision, as stored by MongoDB
+    raw = f"{(item['timestamp'] - _EPOCH) // timedelta(milliseconds=1)}:{item['_id']}"
+    return base64.urlsafe_b64encode(raw.encode("ascii")).decode("ascii").rstrip("=")
+
+
+def decode_history_cursor(cursor):
+    """Inverse of encode_history_cursor. Raises ValueError for a malformed cursor."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("ascii")
+        millis, object_id = raw.split(":", 1)
+        return _EPOCH + timedelta(milliseconds=int(millis)), bson.ObjectId(object_id)
+    except Exception:
+        raise ValueError("Invalid history cursor.")
+
+
+def get_user_history_page(user_session, page_size=10, cursor=None):
     """
-    Fetch recent simplification history for a user from MongoDB.
-    Returns a list of document dicts.
+    Fetch one page of a user's history, newest first, using keyset pagination
+    on (timestamp, _id). Returns {"history": [...], "next_cursor": str or None}.
+    Raises ValueError for a malformed cursor.
     """
+    query = {"user_session": user_session}
+    if cursor:
+        timestamp, object_id = decode_history_cursor(cursor)
+        query["$or"] = [
+            {"timestamp": {"$lt": timestamp}},
+            {"timestamp": timestamp, "_id": {"$lt": object_id}},
+        ]
+
+    page_key = (cursor, page_size)
+    cached = history_page_cache.get(user_session, page_key)
+    if cached is not None:
+        return cached
+    generation = history_page_cache.generation(user_session)
+
     client = get_mongodb_client()
     if not client:
-        print("⚠️ No MongoDB client. Returning empty list.")
-        return []
+        logger.warning("⚠️ No MongoDB client. Returning empty list.")
+        return {"history": [], "next_cursor": None}
 
     try:
-        db = client["legal_documents"]
-        collection = db["history"]
+        collection = client["legal_documents"]["history"]
 
-        print(f"🔍 Fetching last {limit} history items for user: {user_session}")
-        history = list(
-            collection.find({"user_session": user_session})
-                      .sort("timestamp", -1)
-                      .limit(limit)
+        logger.debug(f"🔍 Fetching {page_size} history items for user: {user_session}")
+        items = list(
+            collection.find(query, HISTORY_LIST_PROJECTION)
+                      .sort([("timestamp", DESCENDING), ("_id", DESCENDING)])
+                      .limit(page_size + 1)
         )
 
+        # One extra row tells us whether another page exists
+        next_cursor = encode_history_cursor(items[page_size - 1]) if len(items) > page_size else None
+        history = items[:page_size]
+
         # Convert ObjectId and datetime to string for JSON response
         for item in history:
             item["_id"] = str(item["_id"])
             item["timestamp"] = item["timestamp"].isoformat()
 
-        client.close()
-        print(f"✅ Fetched {len(history)} history records successfully.")
-        return history
+        page = {"history": history, "next_cursor": next_cursor}
+        history_page_cache.set(user_session, page_key, page, generation)
+        logger.debug(f"✅ Fetched {len(history)} history records successfully.")
+        return page
+
+    except Exception as e:
+        logger.error(f"❌ Error fetching history from MongoDB: {e}")
+        _record_failure(e)
+        return {"history": [], "next_cursor": None}
+
+
+_HISTORY_ITEM_FIELDS = {"document_id": 1, "filename": 1, "timestamp": 1, "status": 1, "archive_url": 1}
+
+
+def get_history_item_meta(user_session, history_id):
+    """
+    The small fields of one history record (document_id, filename, timestamp,
+    status, archive_url) without any text: enough to answer a conditional GET.
+    Returns None if it does not exist, belongs to another session or has expired.
+    """
+    return _find_history_item(user_session, history_id, _HISTORY_ITEM_FIELDS)
+
+
+def get_history_item(user_session, history_id, meta=None):
+    """
+    One history record with the full original and simplified texts.
+    meta, from get_history_item_meta(), supplies the small fields so only the
+    texts are read. Returns None if the record does not exist, belongs to
+    another session or has expired.
+    """
+    fields = {"simplified_z": 1, "simplified_text": 1, "original_text": 1}
+    entry = _find_history_item(user_session, history_id, fields if meta else {**_HISTORY_ITEM_FIELDS, **fields})
+    if not entry:
+        return None
+    entry = {**(meta or {}), **entry}
+
+    client = get_mongodb_client()
+    try:
+        # Records saved before full storage only have the 500-character previews
+        original = load_document_text(client, entry["document_id"]) if client and entry.get("document_id") else None
+        return {
+            "_id": str(entry["_id"]),
+            "filename": entry.get("filename"),
+            "timestamp": entry["timestamp"].isoformat(),
+            "status": entry.get("status"),
+            "original_text": original if original is not None else entry.get("original_text", ""),
+            "simplified_text": decompress_text(entry["simplified_z"]) if entry.get("simplified_z") else entry.get("simplified_text", ""),
+            "archive_url": entry.get("archive_url"),
+        }
+
+    except Exception as e:
+        logger.error(f"❌ Error fetching history item from MongoDB: {e}")
+        _record_failure(e)
+        return None
+
+
+def _find_history_item(user_session, history_id, projection):
+    try:
+        object_id = bson.ObjectId(history_id)
+    except Exception:
+        return None
+
+    client = get_mongodb_client()
+    if not client:
+        return None
+
+    try:
+        return client["legal_documents"]["history"].find_one({"_id": object_id, "user_session": user_session},
+                                                             projection)
+    except Exception as e:
+        logger.error(f"❌ Error fetching history item from MongoDB: {e}")
+        _record_failure(e)
+        return None
+
+
+def search_user_history(user_session, query, limit=20):
+    """
+    Full-text search over a user's stored documents (party names, defined
+    terms and clause wording), best matches first. Each result carries the
+    most recent history record for that document.
+    """
+    client = get_mongodb_client()
+    if not client:
+        logger.warning("⚠️ No MongoDB client. Returning empty list.")
+        return []
+
+    try:
+        db = client["legal_documents"]
+        matches = list(
+            db["documents"].find(
+                {"$text": {"$search": query}, "sessions": user_session},
+                {"score": {"$meta": "textScore"}, "filename": 1, "parties": 1},
+            )
+            .sort([("score", {"$meta": "textScore"})])
+            .limit(limit)
+        )
+        if not matches:
+            return []
+
+        latest = {}
+        for entry in db["history"].find(
+            {"user_session": user_session, "document_id": {"$in": [m["_id"] for m in matches]}},
+            {**HISTORY_LIST_PROJECTION, "document_id": 1},
+        ).sort([("timestamp", DESCENDING), ("_id", DESCENDING)]):
+            latest.setdefault(entry["document_id"], entry)
+
+        results = []
+        for match in matches:
+            entry = latest.get(match["_id"])
+            if entry is None:
+                continue    # history record already expired
+            results.append({
+                "history_id": str(entry["_id"]),
+                "document_id": match["_id"],
+                "filename": entry.get("filename") or match.get("filename"),
+                "parties": match.get("parties", []),
+                "timestamp": entry["timestamp"].isoformat(),
+                "preview": entry.get("preview", ""),
+                "score": round(match["score"], 3),
+            })
+        return results
 
     except Exception as e:
-        print(f"❌ Error fetching history from MongoDB: {e}")
+        logger.error(f"❌ Error searching history in MongoDB: {e}")
+        _record_failure(e)
         return []
 
 
+def get_user_history(user_session, limit=10):
+    """
+    Fetch recent simplification history for a user from MongoDB.
+    Returns a list of document dicts.
+    """
+    return get_user_history_page(user_session, page_size=limit)["history"]
+
+
+# ==========================================================
+# ⚡ Persistent Simplification Cache
+# ==========================================================
+
+_cache_index_ready = False
+
+
+def get_cached_result(cache_key):
+    """
+    Look up a cached simplification result by key.
+    Returns the simplified text, or None on a miss or error.
+    """
+    client = get_mongodb_client()
+    if not client:
+        return None
+
+    try:
+        collection = client["legal_documents"]["simplify_cache"]
+        entry = collection.find_one(
+            {"_id": cache_key, "expires_at": {"$gt": datetime.utcnow()}},
+            {"simplified_text": 1}
+        )
+        return entry["simplified_text"] if entry else None
+
+    except Exception as e:
+        logger.error(f"❌ Error reading simplification cache: {e}")
+        _record_failure(e)
+        return None
+
+
+def save_cached_result(cache_key, simplified_text, expires_at):
+    """
+    Upsert a simplification result into the persistent cache.
+    A TTL index on expires_at lets MongoDB expire old entries by itself.
+    """
+    client = get_mongodb_client()
+    if not client:
+        return False
+
+    try:
+        global _cache_index_ready
+        collection = client["legal_documents"]["simplify_cache"]
+        if not _cache_index_ready:
+            collection.create_index("expires_at", expireAfterSeconds=0)
+            _cache_index_ready = True
+        with time_stage("mongodb_save"):
+            collection.replace_one(
+                {"_id": cache_key},
+                {"_id": cache_key, "simplified_text": simplified_text, "expires_at": expires_at},
+                upsert=True
+            )
+        return True
+
+    except Exception as e:
+        logger.error(f"❌ Error writing simplification cache: {e}")
+        _record_failure(e)
+        return False
+
+
+# ==========================================================
+# ☁️ Archived Uploads (Cloudinary URLs by content hash)
+# ==========================================================
+
+def find_archived_upload(content_hash):
+    """URL of an original upload archived before, or None."""
+    client = get_mongodb_client()
+    if not client:
+        return None
+
+    try:
+        entry = client["legal_documents"]["archives"].find_one({"_id": content_hash}, {"url": 1})
+        return entry["url"] if entry else None
+
+    except Exception as e:
+        logger.error(f"❌ Error reading archived uploads: {e}")
+        _record_failure(e)
+        return None
+
+
+def save_archived_upload(content_hash, url, filename=None):
+    """Remember the archive URL of a file so no worker uploads it again."""
+    client = get_mongodb_client()
+    if not client:
+        return False
+
+    try:
+        client["legal_documents"]["archives"].update_one(
+            {"_id": content_hash},
+            {"$setOnInsert": {"url": url, "filename": filename, "created_at": datetime.utcnow()}},
+            upsert=True
+        )
+        return True
+
+    except Exception as e:
+        logger.error(f"❌ Error saving archived upload: {e}")
+        _record_failure(e)
+        return False
+
+
+def attach_archive_url(user_session, document_id, url):
+    """
+    Set archive_url on a session's history records for a document.
+    Returns the number of matching records (0 if the write-behind insert has
+    not happened yet), or None if MongoDB is unavailable.
+    """
+    client = get_mongodb_client()
+    if not client:
+        return None
+
+    try:
+        result = client["legal_documents"]["history"].update_many(
+            {"user_session": user_session, "document_id": document_id},
+            {"$set": {"archive_url": url}}
+        )
+        return result.matched_count
+
+    except Exception as e:
+        logger.error(f"❌ Error attaching archive URL: {e}")
+        _record_failure(e)
+        return None
+
+
 # ==========================================================
 # 🧪 Manual Test (Optional)
 # ==========================================================
@@ -121,6 +854,7 @@ if __name__ == "__main__":
         filename="sample.txt"
     )
 
+    history_writer.flush()
     if test_id:
         print(f"✅ Test insert successful. Document ID: {test_id}")
     else:
@@ -0,0 +1,159 @@
+import atexit
+import hashlib
+import io
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from .metrics import time_stage
+from .result_cache import ResultCache
+
+logger = logging.getLogger(__name__)
+
+TEXT_EXTENSIONS = (".txt",)
+BINARY_EXTENSIONS = (".pdf", ".docx")
+SUPPORTED_EXTENSIONS = TEXT_EXTENSIONS + BINARY_EXTENSIONS
+
+
+class UnsupportedDocument(ValueError):
+    """Raised for file types that cannot be converted to text."""
+
+
+def document_kind(filename):
+    """Return "pdf", "docx" or "txt" for a supported filename, otherwise None."""
+    ext = os.path.splitext((filename or "").lower())[1]
+    return ext[1:] if ext in SUPPORTED_EXTENSIONS else None
+
+
+# ==========================================================
+# 📄 Page-by-page Extractors (run inside the process pool)
+# ==========================================================
+
+def _iter_pdf_pages(data):
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise UnsupportedDocument("PDF support requires the 'pypdf' package.")
+
+    reader = PdfReader(io.BytesIO(data))
+    if reader.is_encrypted:
+        raise UnsupportedDocument("Encrypted PDFs are not supported.")
+    for page in reader.pages:
+        yield page.extract_text() or ""
+
+
+def _iter_docx_blocks(data):
+    try:
+        import docx
+    except ImportError:
+        raise UnsupportedDocument("DOCX support requires the 'python-docx' package.")
+
+    document = docx.Document(io.BytesIO(data))
+    for paragraph in document.paragraphs:
+        yield paragraph.text
+    for table in document.tables:
+        for row in table.rows:
+            yield " | ".join(cell.text for cell in row.cells)
+
+
+def _extract_worker(kind, data, max_chars):
+    """
+    Extract text from a PDF or DOCX. Pages (paragraphs for DOCX) are parsed
+    one at a time and parsing stops once max_chars have been collected, so
+    very long files only cost as many pages as the simplifier will use.
+    """
+    blocks = _iter_pdf_pages(data) if kind == "pdf" else _iter_docx_blocks(data)
+    parts = []
+    total = 0
+    for block in blocks:
+        block = block.strip()
+        if not block:
+            continue
+        parts.append(block)
+        total += len(block)
+        if total >= max_chars:
+            break
+    separator = "\n\n" if kind == "pdf" else "\n"
+    return separator.join(parts)[:max_chars]
+
+
+# ==========================================================
+# ⚙️ Process-pool Extraction with a File-hash Cache
+# ==========================================================
+
+class DocumentProcessor:
+    """
+    Converts uploaded PDF and DOCX files to text. Parsing is CPU-bound, so it
+    runs in a small process pool instead of on the request threads, and the
+    extracted text is cached by the SHA-256 of the file bytes.
+    """
+
+    def __init__(self, max_workers=2, max_chars=500000, cache_entries=128, cache_bytes=64 * 1024 * 1024):
+        self.max_workers = max_workers
+        self.max_chars = max_chars
+        self.cache = ResultCache(
+            max_entries=cache_entries, max_bytes=cache_bytes, persistent=False, name="extraction"
+        )
+        self._pool = None
+        self._pool_pid = None
+        self._lock = threading.Lock()
+
+    def extract_text(self, data, filename):
+        """Return the text of an uploaded document given its raw bytes."""
+        kind = document_kind(filename)
+        if kind is None:
+            raise UnsupportedDocument(
+                f"Unsupported file type '{filename}'. Use one of: {', '.join(SUPPORTED_EXTENSIONS)}"
+            )
+
+        key = f"{kind}:{hashlib.sha256(data).hexdigest()}"
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        with time_stage("extract"):
+            text = self._get_pool().submit(_extract_worker, kind, data, self.max_chars).result()
+        logger.debug(f"📄 Extracted {len(text)} characters from {filename}")
+        self.cache.set(key, text)
+        return text
+
+    def shutdown(self):
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+    def _get_pool(self):
+        # Created on first use in each worker process, so a pool is never inherited across a fork.
+        if self._pool is not None and self._pool_pid == os.getpid():
+            return self._pool
+        with self._lock:
+            if self._pool is None or self._pool_pid != os.getpid():
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=_pool_context())
+                self._pool_pid = os.getpid()
+            return self._pool
+
+
+def _pool_context():
+    """
+    Extraction workers start from a fork server rather than a fork of this
+    process: by the time the pool is created it runs request threads, the
+    history writer and archive workers, and a fork could copy one of their
+    held locks into the child. Windows has no fork server, so it spawns.
+    """
+    if "forkserver" not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("spawn")
+    context = multiprocessing.get_context("forkserver")
+    # Imported once in the (single-threaded) server, so each worker forks with it loaded
+    context.set_forkserver_preload([__name__])
+    return context
+
+
+document_processor = DocumentProcessor(
+    max_workers=int(os.getenv('EXTRACT_WORKERS', 2)),
+    max_chars=int(os.getenv('EXTRACT_MAX_CHARS', 500000)),
+    cache_entries=int(os.getenv('EXTRACT_CACHE_ENTRIES', 128)),
+)
+atexit.register(document_processor.shutdown)
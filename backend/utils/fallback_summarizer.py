@@ -0,0 +1,192 @@
+import re
+
+from .chunker import split_into_segments
+from .lazy_import import lazy_module
+
+# Only needed when Gemini is unavailable, so it is not imported at startup
+np = lazy_module("numpy")
+
+# ==========================================================
+# 📖 Plain-English Legal Glossary (one-pass matcher)
+# ==========================================================
+
+LEGAL_GLOSSARY = {
+    "aforementioned": "mentioned above",
+    "aforesaid": "mentioned above",
+    "commence": "start",
+    "commencement": "start",
+    "deemed": "treated as",
+    "force majeure": "events outside anyone's control",
+    "forthwith": "immediately",
+    "hereby": "by this document",
+    "herein": "in this document",
+    "hereinafter": "from now on",
+    "hereof": "of this document",
+    "heretofore": "until now",
+    "hereto": "to this document",
+    "hereunder": "under this document",
+    "in accordance with": "following",
+    "in lieu of": "instead of",
+    "in the event that": "if",
+    "in witness whereof": "as proof of this",
+    "indemnify": "cover the losses of",
+    "inter alia": "among other things",
+    "lessee": "tenant",
+    "lessor": "landlord",
+    "mutatis mutandis": "with the necessary changes",
+    "notwithstanding": "despite",
+    "null and void": "invalid",
+    "prior to": "before",
+    "provided that": "as long as",
+    "pursuant to": "under",
+    "remit": "pay",
+    "shall": "will",
+    "subsequent to": "after",
+    "terminate": "end",
+    "termination": "ending",
+    "thereafter": "after that",
+    "thereby": "by that",
+    "therein": "in it",
+    "thereof": "of it",
+    "thereto": "to it",
+    "thereunder": "under it",
+    "whereas": "since",
+    "whereby": "by which",
+    "with respect to": "about",
+    "witnesseth": "",
+}
+
+# Longest phrases first so "hereinafter" wins over "herein" and
+# "in witness whereof" over shorter overlaps.
+_GLOSSARY_PATTERN = re.compile(
+    r"\b(?:" + "|".join(
+        re.escape(term).replace(r"\ ", r"\s+")
+        for term in sorted(LEGAL_GLOSSARY, key=len, reverse=True)
+    ) + r")\b",
+    re.IGNORECASE,
+)
+_SPACES = re.compile(r"[ \t]{2,}")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _replace_term(match):
+    found = match.group(0)
+    plain = LEGAL_GLOSSARY[_WHITESPACE.sub(" ", found.lower())]
+    if plain and found[0].isupper():
+        plain = plain[0].upper() + plain[1:]
+    return plain
+
+
+def plain_english(text):
+    """Replace legalese with plain-English equivalents in a single regex pass."""
+    return _SPACES.sub(" ", _GLOSSARY_PATTERN.sub(_replace_term, text))
+
+
+# ==========================================================
+# 🧮 Extractive TF-IDF Summary
+# ==========================================================
+
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?;:])\s+(?=[\"'(\[]?[A-Z0-9])|\n\s*\n")
+_WORD = re.compile(r"[a-z][a-z'-]+")
+STOP_WORDS = frozenset("""
+    a an and any are as at be been by for from has have if in into is it its may
+    no not of on or other such than that the their then there these this those
+    to under upon was were which who will with within without all each
+""".split())
+
+
+_HEADING = re.compile(r"\A\s*([^\n]{1,80}?)[ \t]*\n(?=\s*\S)")
+
+
+def split_heading(segment):
+    """Separate a clause title line ("2. Termination") from the clause body."""
+    match = _HEADING.match(segment)
+    if not match or match.group(1).endswith((".", ";", ",")):
+        return None, segment
+    return match.group(1).strip().rstrip(":"), segment[match.end():]
+
+
+def split_sentences(text):
+    return [s.strip() for s in SENTENCE_BOUNDARY.split(text) if s and len(s.strip()) > 1]
+
+
+def score_sentences(sentences):
+    """
+    Score each sentence by the cosine similarity of its TF-IDF vector to the
+    document centroid. The term matrix is kept as flat (sentence, term)
+    arrays, so the scoring is a handful of NumPy reductions.
+    """
+    vocabulary = {}
+    sentence_ids = []
+    term_ids = []
+    for i, sentence in enumerate(sentences):
+        for word in _WORD.findall(sentence.lower()):
+            if word not in STOP_WORDS:
+                sentence_ids.append(i)
+                term_ids.append(vocabulary.setdefault(word, len(vocabulary)))
+
+    n = len(sentences)
+    if not term_ids:
+        return np.zeros(n)
+
+    # Collapse repeated words into (sentence, term, count) triples
+    pairs, counts = np.unique(
+        np.asarray(sentence_ids, dtype=np.int64) * len(vocabulary) + np.asarray(term_ids, dtype=np.int64),
+        return_counts=True,
+    )
+    rows, cols = np.divmod(pairs, len(vocabulary))
+
+    df = np.bincount(cols, minlength=len(vocabulary))
+    idf = np.log((1 + n) / (1 + df)) + 1.0
+    weights = (1.0 + np.log(counts)) * idf[cols]
+
+    centroid = np.bincount(cols, weights=weights, minlength=len(vocabulary)) / n
+    dots = np.bincount(rows, weights=weights * centroid[cols], minlength=n)
+    norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=n))
+    return np.divide(dots, norms, out=np.zeros(n), where=norms > 0)
+
+
+def extractive_summary(text, sentences_per_clause=2, max_chars=4000):
+    """
+    Pick the highest-scoring sentences of every clause, keep them in document
+    order and rewrite them in plain English. Returns a list of clause summaries.
+    """
+    titles = []
+    clauses = []
+    for segment in split_into_segments(text):
+        title, body = split_heading(segment)
+        body_sentences = split_sentences(body)
+        if body_sentences:
+            titles.append(title)
+            clauses.append(body_sentences)
+    sentences = [s for clause in clauses for s in clause]
+    if not sentences:
+        return []
+
+    scores = score_sentences(sentences)
+    summary = []
+    used = 0
+    offset = 0
+    for title, clause in zip(titles, clauses):
+        clause_scores = scores[offset:offset + len(clause)]
+        keep = np.sort(np.argsort(-clause_scores, kind="stable")[:sentences_per_clause])
+        offset += len(clause)
+
+        picked = plain_english(" ".join(_WHITESPACE.sub(" ", clause[i]) for i in keep))
+        if title:
+            picked = f"{title}: {picked}"
+        if used + len(picked) > max_chars:
+            if not summary:
+                summary.append(picked[:max_chars])
+            break
+        summary.append(picked)
+        used += len(picked)
+    return summary
+
+
+def summarize(text, sentences_per_clause=2, max_chars=4000):
+    """Local stand-in for the Gemini summary: clause-by-clause key sentences in plain English."""
+    points = extractive_summary(text, sentences_per_clause, max_chars)
+    if not points:
+        return plain_english(_WHITESPACE.sub(" ", text).strip())[:max_chars]
+    return "\n".join(f"- {point}" for point in points)
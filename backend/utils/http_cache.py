@@ -0,0 +1,116 @@
+import gzip
+import hashlib
+
+from werkzeug.http import remove_entity_headers
+from werkzeug.wrappers import Response
+
+try:
+    import brotli
+except ImportError:    # optional: without it responses are gzip-compressed only
+    brotli = None
+
+# ==========================================================
+# 🗜️ Response Compression and Conditional Requests
+# ==========================================================
+
+COMPRESSIBLE_MIMETYPES = frozenset({"application/json", "text/plain", "text/html", "text/csv"})
+
+
+def content_etag(data):
+    """Strong entity tag for a response body: its SHA-256, shortened to 128 bits."""
+    return hashlib.sha256(data).hexdigest()[:32]
+
+
+def key_etag(*parts):
+    """
+    Strong entity tag from stored identifiers that change whenever the body
+    would (record id, document id, status...), so it is known before the body
+    is built and a revalidation can skip loading it.
+    """
+    return content_etag(":".join(str(part) for part in parts).encode("utf-8"))
+
+
+def set_validators(response, cache_control, etag=None):
+    """
+    Give a response a strong ETag (etag, or one computed from its body) and
+    the given Cache-Control. finalize_response() turns it into a 304 when the
+    client already holds the same bytes.
+    """
+    response.set_etag(etag or content_etag(response.get_data()))
+    response.headers["Cache-Control"] = cache_control
+    return response
+
+
+def not_modified(request, etag, cache_control):
+    """
+    A 304 if the request's If-None-Match already matches etag as
+    finalize_response() sends it (with the negotiated encoding as a suffix, or
+    bare for a body too small to compress), else None. Lets a handler with a
+    key_etag() answer a revalidation before building the body.
+    """
+    if request.method not in ("GET", "HEAD"):
+        return None
+    encoding = negotiate_encoding(request)
+    for tag in (etag, f"{etag}-{encoding}") if encoding else (etag,):
+        if request.if_none_match.contains_weak(tag):
+            response = Response(status=304)
+            response.set_etag(tag)
+            response.headers["Cache-Control"] = cache_control
+            return response
+    return None
+
+
+def negotiate_encoding(request):
+    """"br" or "gzip" if the client accepts it (brotli preferred when installed), else None."""
+    accepted = request.accept_encodings
+    if brotli is not None and accepted.quality("br") > 0:
+        return "br"
+    if accepted.quality("gzip") > 0:
+        return "gzip"
+    return None
+
+
+def _compressible(response, min_bytes):
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or "Content-Encoding" in response.headers or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return False
+    length = response.content_length
+    return (length if length is not None else len(response.get_data())) >= min_bytes
+
+
+def finalize_response(response, request, min_bytes=1024, gzip_level=6, brotli_quality=5):
+    """
+    Answer conditional GETs and compress the body, in that order, so a 304
+    costs neither the compression nor the bytes.
+
+    A compressed body is a different representation, so its strong ETag gets
+    the encoding as a suffix ("<hash>-gzip"); an If-None-Match carrying it
+    matches only when the client would get the same encoding again.
+    """
+    encoding = None
+    if _compressible(response, min_bytes):
+        response.vary.add("Accept-Encoding")
+        encoding = negotiate_encoding(request)
+
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        if encoding:
+            etag = f"{etag}-{encoding}"
+            response.set_etag(etag)
+        if (response.status_code == 200 and request.method in ("GET", "HEAD")
+                and request.if_none_match.contains_weak(etag)):
+            response.status_code = 304
+            response.set_data(b"")
+            remove_entity_headers(response.headers)
+            return response
+
+    if encoding:
+        data = response.get_data()
+        if encoding == "br":
+            body = brotli.compress(data, quality=brotli_quality)
+        else:
+            # mtime=0 keeps the output, and so the tagged representation, byte-identical
+            body = gzip.compress(data, compresslevel=gzip_level, mtime=0)
+        response.set_data(body)
+        response.headers["Content-Encoding"] = encoding
+    return response
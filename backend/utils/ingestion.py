@@ -0,0 +1,209 @@
+import codecs
+import io
+import logging
+import os
+import zipfile
+from tempfile import SpooledTemporaryFile
+
+from flask import Request
+
+from .document_processor import (document_processor, document_kind, UnsupportedDocument, BINARY_EXTENSIONS,
+                                 SUPPORTED_EXTENSIONS)
+
+logger = logging.getLogger(__name__)
+
+READ_CHUNK_SIZE = 64 * 1024
+
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+
+class DocumentTooLarge(ValueError):
+    """Raised when an upload or archive member exceeds the configured size limit."""
+
+
+# ==========================================================
+# 📦 Spool Uploads to Disk
+# ==========================================================
+
+class UploadRequest(Request):
+    """
+    Request class whose multipart file parts are buffered in memory only up
+    to spool_threshold bytes and written to a temporary file beyond that.
+    """
+
+    spool_threshold = 1024 * 1024
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return SpooledTemporaryFile(max_size=self.spool_threshold, mode="rb+")
+
+
+# ==========================================================
+# 📥 Incremental Upload Decoding
+# ==========================================================
+
+def detect_encoding(sample):
+    """
+    Guess the text encoding from the first chunk of an upload: a BOM wins,
+    then UTF-8 if the sample is valid, then charset-normalizer when it is
+    installed, and finally cp1252, which can decode any byte.
+    """
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+
+    try:
+        # Incremental decoder, so a multi-byte character cut at the end of the sample is not an error
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+
+    try:
+        from charset_normalizer import from_bytes
+    except ImportError:
+        return "cp1252"
+    best = from_bytes(sample).best()
+    return best.encoding if best else "cp1252"
+
+
+def decode_stream(stream, max_bytes=None, encoding=None, chunk_size=READ_CHUNK_SIZE):
+    """
+    Decode a binary stream chunk by chunk instead of reading it whole.
+    The encoding is detected from the first chunk unless given.
+    Raises DocumentTooLarge as soon as more than max_bytes have been read.
+    """
+    decoder = None
+    parts = []
+    total = 0
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        total += len(chunk)
+        if max_bytes is not None and total > max_bytes:
+            raise DocumentTooLarge(f"Document exceeds the {max_bytes} byte limit.")
+        if decoder is None:
+            decoder = codecs.getincrementaldecoder(encoding or detect_encoding(chunk))(errors="ignore")
+        parts.append(decoder.decode(chunk))
+    if decoder is not None:
+        parts.append(decoder.decode(b"", final=True))
+    return "".join(parts)
+
+
+def read_limited(stream, max_bytes=None, chunk_size=READ_CHUNK_SIZE):
+    """Read raw bytes in chunks, failing as soon as max_bytes is exceeded."""
+    buffer = io.BytesIO()
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        if max_bytes is not None and buffer.tell() + len(chunk) > max_bytes:
+            raise DocumentTooLarge(f"Document exceeds the {max_bytes} byte limit.")
+        buffer.write(chunk)
+    return buffer.getvalue()
+
+
+def read_document(stream, filename, max_bytes=None):
+    """
+    Text of one document: PDF and DOCX go through the document processor,
+    anything else is decoded incrementally as text.
+    """
+    if filename and filename.lower().endswith(BINARY_EXTENSIONS):
+        return document_processor.extract_text(read_limited(stream, max_bytes), filename)
+    return decode_stream(stream, max_bytes)
+
+
+def ensure_supported(filename):
+    """Raise UnsupportedDocument unless the file is .txt, .pdf or .docx (the same rule for every upload path)."""
+    if document_kind(filename) is None:
+        raise UnsupportedDocument(
+            f"Unsupported file type '{filename}'. Use one of: {', '.join(SUPPORTED_EXTENSIONS)}"
+        )
+
+
+def read_upload(file_storage, max_bytes):
+    """Read one uploaded file from its (possibly disk-spooled) stream. Raises UnsupportedDocument for other types."""
+    try:
+        ensure_supported(file_storage.filename)
+        return read_document(file_storage.stream, file_storage.filename, max_bytes)
+    finally:
+        file_storage.close()
+
+
+# ==========================================================
+# 🗃️ Batch Uploads (many files or one zip archive)
+# ==========================================================
+
+def is_zip_upload(file_storage):
+    name = (file_storage.filename or "").lower()
+    return name.endswith(".zip") or file_storage.mimetype in ("application/zip", "application/x-zip-compressed")
+
+
+def iter_batch_documents(file_storages, max_documents, max_document_bytes):
+    """
+    Yield (filename, text, error) for every document in a batch upload.
+    Zip archives are expanded member by member; each document is decoded
+    from its own stream, so only one document is held in memory at a time.
+    error is None on success, otherwise a message and text is None.
+    """
+    count = 0
+    for file_storage in file_storages:
+        if is_zip_upload(file_storage):
+            members = _iter_zip_members(file_storage, max_document_bytes)
+        else:
+            members = [(file_storage.filename, lambda fs=file_storage: read_upload(fs, max_document_bytes))]
+
+        for filename, read_text in members:
+            if count >= max_documents:
+                yield filename, None, f"Batch limit of {max_documents} documents reached; document skipped."
+                continue
+            count += 1
+            try:
+                text = read_text()
+            except Exception as e:
+                yield filename, None, str(e)
+                continue
+            if not text.strip():
+                yield filename, None, "Document text is empty"
+                continue
+            yield filename, text, None
+
+
+def _iter_zip_members(file_storage, max_document_bytes):
+    try:
+        archive = zipfile.ZipFile(file_storage.stream)
+    except zipfile.BadZipFile as e:
+        yield file_storage.filename, _raise(ValueError(f"Invalid zip archive: {e}"))
+        return
+
+    with archive:
+        for info in archive.infolist():
+            name = info.filename
+            if info.is_dir() or os.path.basename(name).startswith(".") or name.startswith("__MACOSX/"):
+                continue
+            try:
+                ensure_supported(name)
+            except UnsupportedDocument as e:
+                yield name, _raise(e)
+                continue
+            if info.file_size > max_document_bytes:
+                yield name, _raise(DocumentTooLarge(f"Document exceeds the {max_document_bytes} byte limit."))
+                continue
+
+            def read_member(info=info):
+                with archive.open(info) as member:
+                    return read_document(member, info.filename, max_document_bytes)
+
+            yield name, read_member
+
+
+def _raise(error):
+    def fail():
+        raise error
+    return fail
@@ -0,0 +1,98 @@
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# ==========================================================
+# 🗂️ Background Simplification Jobs
+# ==========================================================
+
+
+class JobQueueFull(Exception):
+    """Raised when the number of queued and running jobs reaches its limit."""
+
+
+class JobManager:
+    """
+    Runs jobs on a bounded worker pool and keeps their status and result
+    in memory until they expire.
+
+    handler is called with the job payload (a dict) on a worker thread and
+    its return value becomes the job result.
+    """
+
+    def __init__(self, handler, max_workers=2, max_pending=50, ttl_seconds=3600):
+        self.handler = handler
+        self.max_pending = max_pending
+        self.ttl_seconds = ttl_seconds
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="simplify-job")
+        self._jobs = {}
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def submit(self, payload):
+        """Queue a job and return its id. Raises JobQueueFull when saturated."""
+        self._expire_finished()
+        with self._lock:
+            if self._active >= self.max_pending:
+                raise JobQueueFull(f"Job queue is full ({self.max_pending} pending jobs).")
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "status": "queued",
+                "created_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "result": None,
+                "error": None,
+            }
+            self._active += 1
+
+        self._executor.submit(self._run, job_id, payload)
+        return job_id
+
+    def get(self, job_id):
+        """Return a snapshot of the job, or None if it is unknown or expired."""
+        self._expire_finished()
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def stats(self):
+        """Queue depth and job counts by status."""
+        with self._lock:
+            counts = {}
+            for job in self._jobs.values():
+                counts[job["status"]] = counts.get(job["status"], 0) + 1
+            return {"active": self._active, "max_pending": self.max_pending, "jobs": counts}
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, job_id, payload):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(status="running", started_at=time.time())
+
+        try:
+            outcome = {"status": "completed", "result": self.handler(payload)}
+        except Exception as e:
+            logger.exception(f"❌ Job {job_id} failed: {e}")
+            outcome = {"status": "failed", "error": str(e)}
+
+        with self._lock:
+            self._active -= 1
+            if job_id in self._jobs:
+                self._jobs[job_id].update(outcome, finished_at=time.time())
+
+    def _expire_finished(self):
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            expired = [job_id for job_id, job in self._jobs.items()
+                       if job["finished_at"] is not None and job["finished_at"] < cutoff]
+            for job_id in expired:
+                del self._jobs[job_id]
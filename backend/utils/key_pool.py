@@ -0,0 +1,256 @@
+import asyncio
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# ==========================================================
+# 🔑 Gemini API Key Pool Scheduler
+# ==========================================================
+
+
+class KeySlot:
+    """Scheduling state for one API key: token buckets, cooldown and counters."""
+
+    def __init__(self, index, api_key, model_factory, requests_per_minute, tokens_per_minute):
+        self.index = index
+        self.api_key = api_key
+        self._model_factory = model_factory
+        self._models = {}
+        self._model_lock = threading.Lock()
+
+        self.rpm_capacity = float(requests_per_minute)
+        self.tpm_capacity = float(tokens_per_minute)
+        self.rpm_tokens = self.rpm_capacity
+        self.tpm_tokens = self.tpm_capacity
+        self.last_refill = time.monotonic()
+
+        self.cooldown_until = 0.0
+        self.consecutive_rate_limits = 0
+
+        self.in_flight = 0
+        self.requests = 0
+        self.tokens_used = 0
+        self.rate_limits = 0
+        self.errors = 0
+
+    def model_for(self, model_name):
+        """The key's client for a model, built on first use so the SDK is not imported at startup."""
+        model = self._models.get(model_name)
+        if model is None:
+            with self._model_lock:
+                model = self._models.get(model_name)
+                if model is None:
+                    model = self._models[model_name] = self._model_factory(self.api_key, model_name)
+        return model
+
+    @property
+    def label(self):
+        return f"#{self.index + 1}"
+
+    def refill(self, now):
+        elapsed = now - self.last_refill
+        if elapsed > 0:
+            self.rpm_tokens = min(self.rpm_capacity, self.rpm_tokens + elapsed * self.rpm_capacity / 60.0)
+            self.tpm_tokens = min(self.tpm_capacity, self.tpm_tokens + elapsed * self.tpm_capacity / 60.0)
+            self.last_refill = now
+
+    def headroom(self):
+        """Fraction of the tighter of the two budgets that is still available."""
+        return min(self.rpm_tokens / self.rpm_capacity, self.tpm_tokens / self.tpm_capacity)
+
+    def can_serve(self, now, estimated_tokens):
+        if now < self.cooldown_until or self.rpm_tokens < 1:
+            return False
+        # A prompt larger than the whole per-minute budget is allowed once the bucket is full.
+        return self.tpm_tokens >= min(estimated_tokens, self.tpm_capacity)
+
+
+class KeyPool:
+    """
+    Thread-safe scheduler over the configured API keys.
+
+    Each key has a request and a token bucket that refill continuously over a
+    minute. acquire() hands out the key with the most remaining capacity;
+    keys that hit ResourceExhausted cool down with exponential backoff and
+    rejoin the pool automatically when the cooldown expires.
+    """
+
+    def __init__(self, api_keys, model_factory, requests_per_minute=5, tokens_per_minute=250000,
+                 base_cooldown=5.0, max_cooldown=300.0, max_wait=5.0):
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.max_wait = max_wait
+        self._slots = [
+            KeySlot(i, key, model_factory, requests_per_minute, tokens_per_minute)
+            for i, key in enumerate(api_keys)
+        ]
+        self._cond = threading.Condition()
+
+    def __len__(self):
+        return len(self._slots)
+
+    def warm_up(self, model_names):
+        """Build every key's clients for these models now instead of on their first request."""
+        for slot in self._slots:
+            for model_name in model_names:
+                slot.model_for(model_name)
+
+    def acquire(self, estimated_tokens=0, max_wait=None, exclude=()):
+        """
+        Reserve capacity on the best available key and return its KeySlot.
+        Waits up to max_wait seconds for a key to free up; returns None if
+        every key is still exhausted or cooling down after that.
+        """
+        max_wait = self.max_wait if max_wait is None else max_wait
+        deadline = time.monotonic() + max_wait
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                candidates = []
+                for slot in self._slots:
+                    slot.refill(now)
+                    if slot.index not in exclude and slot.can_serve(now, estimated_tokens):
+                        candidates.append(slot)
+
+                if candidates:
+                    slot = max(candidates, key=lambda s: (s.headroom(), -s.in_flight))
+                    slot.rpm_tokens -= 1
+                    slot.tpm_tokens -= estimated_tokens
+                    slot.in_flight += 1
+                    slot.requests += 1
+                    return slot
+
+                remaining = deadline - now
+                if remaining <= 0:
+                    return None
+                self._cond.wait(min(remaining, self._next_ready_in(now, estimated_tokens, exclude)))
+
+    async def acquire_async(self, estimated_tokens=0, max_wait=None, exclude=()):
+        """
+        Coroutine version of acquire() for the asyncio server. Instead of
+        blocking on the condition it sleeps on the event loop until a key is
+        expected to be ready, so waiting requests hold no thread.
+        """
+        max_wait = self.max_wait if max_wait is None else max_wait
+        deadline = time.monotonic() + max_wait
+        while True:
+            slot = self.acquire(estimated_tokens, max_wait=0, exclude=exclude)
+            if slot is not None:
+                return slot
+            now = time.monotonic()
+            remaining = deadline - now
+            if remaining <= 0:
+                return None
+            with self._cond:
+                wait = self._next_ready_in(now, estimated_tokens, exclude)
+            await asyncio.sleep(min(remaining, wait))
+
+    def report_success(self, slot, estimated_tokens=0, used_tokens=None):
+        """Release a key after a successful call, correcting the token estimate."""
+        with self._cond:
+            slot.in_flight -= 1
+            slot.consecutive_rate_limits = 0
+            if used_tokens is not None:
+                slot.tpm_tokens -= used_tokens - estimated_tokens
+                slot.tokens_used += used_tokens
+            else:
+                slot.tokens_used += estimated_tokens
+            self._cond.notify_all()
+
+    def report_rate_limited(self, slot):
+        """Put a key into exponential cooldown after ResourceExhausted."""
+        with self._cond:
+            slot.in_flight -= 1
+            slot.rate_limits += 1
+            slot.consecutive_rate_limits += 1
+            cooldown = min(self.max_cooldown, self.base_cooldown * 2 ** (slot.consecutive_rate_limits - 1))
+            slot.cooldown_until = time.monotonic() + cooldown
+            slot.rpm_tokens = 0
+            logger.warning(f"⚠️ API Key {slot.label} is rate-limited. Cooling down for {cooldown:.0f}s.")
+            self._cond.notify_all()
+
+    def release(self, slot):
+        """Release a key whose call was cancelled (client gone or a hedged call lost)."""
+        with self._cond:
+            slot.in_flight -= 1
+            self._cond.notify_all()
+
+    def report_error(self, slot):
+        """Release a key after a non-quota error; the key stays in the pool."""
+        with self._cond:
+            slot.in_flight -= 1
+            slot.errors += 1
+            self._cond.notify_all()
+
+    def available_capacity(self):
+        """Requests that could be started right now across all keys that are not cooling down."""
+        with self._cond:
+            now = time.monotonic()
+            total = 0.0
+            for slot in self._slots:
+                slot.refill(now)
+                if now >= slot.cooldown_until:
+                    total += slot.rpm_tokens
+            return total
+
+    def capacity(self):
+        """
+        Live capacity of the pool: the sustained request rate (per second) of
+        keys not cooling down, the requests that could start right now, and
+        seconds until the next cooling key rejoins (0 if none is cooling).
+        """
+        with self._cond:
+            now = time.monotonic()
+            rate = 0.0
+            available = 0.0
+            cooldowns = []
+            for slot in self._slots:
+                slot.refill(now)
+                if now >= slot.cooldown_until:
+                    rate += slot.rpm_capacity / 60.0
+                    available += slot.rpm_tokens
+                else:
+                    cooldowns.append(slot.cooldown_until - now)
+            return {
+                "requests_per_second": rate,
+                "available": available,
+                "cooldown_remaining": min(cooldowns) if cooldowns else 0.0,
+            }
+
+    def utilization(self):
+        """Per-key budgets, usage and cooldown state (keys are masked)."""
+        with self._cond:
+            now = time.monotonic()
+            stats = []
+            for slot in self._slots:
+                slot.refill(now)
+                stats.append({
+                    "key": f"{slot.label} (…{slot.api_key[-4:]})",
+                    "requests": slot.requests,
+                    "tokens_used": slot.tokens_used,
+                    "rate_limits": slot.rate_limits,
+                    "errors": slot.errors,
+                    "in_flight": slot.in_flight,
+                    "rpm_remaining": round(slot.rpm_tokens, 2),
+                    "tpm_remaining": round(slot.tpm_tokens),
+                    "utilization": round(1 - slot.headroom(), 4),
+                    "cooldown_remaining": round(max(0.0, slot.cooldown_until - now), 1),
+                })
+            return stats
+
+    def _next_ready_in(self, now, estimated_tokens, exclude):
+        """Seconds until some key is expected to be able to serve the request."""
+        waits = []
+        for slot in self._slots:
+            if slot.index in exclude:
+                continue
+            wait = max(0.0, slot.cooldown_until - now)
+            if slot.rpm_tokens < 1:
+                wait = max(wait, (1 - slot.rpm_tokens) * 60.0 / slot.rpm_capacity)
+            needed = min(estimated_tokens, slot.tpm_capacity) - slot.tpm_tokens
+            if needed > 0:
+                wait = max(wait, needed * 60.0 / slot.tpm_capacity)
+            waits.append(wait)
+        return max(0.05, min(waits)) if waits else 0.05
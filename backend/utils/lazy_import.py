@@ -0,0 +1,35 @@
+import importlib
+
+# ==========================================================
+# 💤 Lazy Module Imports
+# ==========================================================
+
+# google.generativeai, pymongo, cloudinary and numpy together take most of a
+# second to import. Modules bind them through lazy_module() so importing the
+# app stays fast; the real import happens on first attribute access, usually
+# in the background startup checks before the first request needs it.
+
+
+class LazyModule:
+    """Stands in for a module and imports it on first attribute access."""
+
+    def __init__(self, name):
+        self._name = name
+        self._module = None
+
+    def load(self):
+        """Import the module now (Python's import lock makes this thread-safe)."""
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self.load(), attr)
+
+    def __repr__(self):
+        state = "loaded" if self._module is not None else "not loaded"
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_module(name):
+    return LazyModule(name)
@@ -0,0 +1,189 @@
+import re
+
+# ==========================================================
+# 🏷️ Fast Local Legal Entity Extraction
+# ==========================================================
+
+# Every pattern is compiled once at import and starts with a cheap
+# lookahead on its first character, so extraction is a handful of linear
+# scans that take a few milliseconds on a 60 KB contract.
+
+_QUOTE_OPEN = "[\"“]"
+_QUOTE_CLOSE = "[\"”]"
+
+# (the "Agreement"), (hereinafter referred to as the "Indemnitor"), (collectively, "Losses")
+DEFINED_TERM = re.compile(
+    r"\(\s*(?:[^()\"“”]{0,80}?[,;]\s*)?"
+    r"(?:(?:hereinafter|herein|hereafter)\s*(?:referred\s+to\s+as|called)?\s*)?"
+    r"(?:as\s+)?(?:the\s+|a\s+|an\s+)?"
+    + _QUOTE_OPEN + r"([A-Z][\w&'/\- ]{0,60}?)" + _QUOTE_CLOSE +
+    r"[^()]{0,40}?\)",
+    re.IGNORECASE,
+)
+
+# Organizations are found by their legal suffix; the name is then read
+# backwards over capitalized words, which is much cheaper than anchoring a
+# regex at every capitalized word in the document.
+ORGANIZATION_SUFFIX = re.compile(
+    r"(?<=\s)(?=[ICLGPN])(?:Inc\.|INC\.|Incorporated|LLC|L\.L\.C\.|Ltd\.?|LTD\.?|Limited|LIMITED|Corporation|CORPORATION"
+    r"|Corp\.|CORP\.|Company|COMPANY|LLP|L\.P\.|GmbH|PLC|N\.A\.)(?![\w])"
+)
+_NAME_WORD = re.compile(r"[A-Z][\w&'.\-]*$")
+_TOKEN = re.compile(r"\S+")
+_NAME_STOP_WORDS = frozenset(
+    "a an and as at between by for from in into made of or provided the this to with".split()
+)
+
+
+def find_organizations(text):
+    """Return organization names ending in a legal suffix (Inc., LLC, ...), in document order."""
+    names = []
+    for match in ORGANIZATION_SUFFIX.finditer(text):
+        window_start = max(0, match.start() - 120)
+        words = list(_TOKEN.finditer(text, window_start, match.start()))[-7:]
+        name_start = None
+        for i, word in enumerate(reversed(words)):
+            token = word.group(0)
+            if i == 0:
+                token = token.rstrip(",")    # "ACME SOLUTIONS, INC."
+            if not _NAME_WORD.match(token) or token.lower() in _NAME_STOP_WORDS:
+                break
+            # "Wales." ends a sentence, "Co." is part of the name
+            if i > 0 and token.endswith(".") and len(token) > 4:
+                break
+            name_start = word.start()
+        if name_start is not None:
+            names.append(text[name_start:match.end()])
+    return names
+
+
+_MONTH = r"(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|June?|July?|Aug(?:ust)?|Sept?(?:ember)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)\.?"
+DATE = re.compile(
+    r"(?=[JFMASOND\d])(?<![\w/-])(?:"
+    + _MONTH + r"\s+\d{1,2}(?:st|nd|rd|th)?,?\s+\d{4}"                         # January 15, 2023
+    r"|\d{1,2}(?:st|nd|rd|th)?\s+(?:day\s+of\s+)?" + _MONTH + r",?\s+\d{4}"    # 15th day of October, 2023
+    r"|\d{4}-\d{2}-\d{2}"                                                       # 2023-10-15
+    r"|\d{1,2}/\d{1,2}/\d{2,4}"                                                 # 10/15/2023
+    r")",
+)
+
+MONEY = re.compile(
+    r"(?=[$€£₹UEGIR\d])(?:[$€£₹]\s?\d[\d,]*(?:\.\d+)?(?:\s?(?:million|billion|thousand))?"
+    r"|\b(?:USD|EUR|GBP|INR|Rs\.?)\s?\d[\d,]*(?:\.\d+)?"
+    r"|(?<![\w.,])\d[\d,]*(?:\.\d+)?\s?(?:[Dd]ollars|[Ee]uros|[Pp]ounds|[Rr]upees)\b)",
+)
+
+GOVERNING_LAW = re.compile(
+    r"govern(?:ed|s)\s+by(?:\s+and\s+(?:construed|interpreted)\s+in\s+accordance\s+with)?\s+"
+    r"the\s+laws?\s+of\s+(?:the\s+)?((?:State|Commonwealth|Province|Republic)\s+of\s+)?([A-Z]\w*(?:\s+(?:and\s+)?[A-Z]\w*){0,3})",
+)
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def _unique(values):
+    seen = set()
+    result = []
+    for value in values:
+        key = value.lower()
+        if key not in seen:
+            seen.add(key)
+            result.append(value)
+    return result
+
+
+def _clean(value):
+    return _WHITESPACE.sub(" ", value).strip(" ,;")
+
+
+def extract_entities(text):
+    """
+    Pull parties, defined terms, dates, monetary amounts and governing law
+    out of a contract. Returns a JSON-serializable dict of lists.
+    """
+    text = text or ""
+    defined_terms = []
+    parties = []
+
+    assigned = set()
+    previous_end = 0
+    for match in DEFINED_TERM.finditer(text):
+        term = _clean(match.group(1))
+        defined_terms.append(term)
+
+        # A party is the closest organization named between the previous
+        # definition and this one, e.g. 'ACME, INC., a Delaware corporation (the "Seller")'.
+        preceding = text[max(previous_end, match.start() - 400):match.start()]
+        previous_end = match.end()
+        organizations = [_clean(o) for o in find_organizations(preceding)]
+        if organizations and organizations[-1].lower() not in assigned:
+            assigned.add(organizations[-1].lower())
+            parties.append({"name": organizations[-1], "role": term})
+
+    if not parties:
+        parties = [{"name": _clean(name), "role": None} for name in _unique(find_organizations(text[:3000]))]
+
+    governing_law = [
+        _clean((state or "") + place) for state, place in GOVERNING_LAW.findall(text)
+    ]
+
+    return {
+        "parties": parties,
+        "defined_terms": _unique(defined_terms),
+        "dates": _unique(_clean(d) for d in DATE.findall(text)),
+        "amounts": _unique(_clean(a) for a in MONEY.findall(text)),
+        "governing_law": _unique(governing_law),
+    }
+
+
+# ==========================================================
+# ✂️ Prompt Compression with Entity References
+# ==========================================================
+
+_VERBOSE_DEFINITION = re.compile(
+    r"\(\s*(?:hereinafter|herein|hereafter)\s*(?:referred\s+to\s+as|called)?\s*(?:the\s+)?"
+    + _QUOTE_OPEN + r"([^\"”]{1,60})" + _QUOTE_CLOSE + r"\s*\)",
+    re.IGNORECASE,
+)
+
+
+def compress_with_references(text, entities):
+    """
+    Shorten boilerplate before the text is sent to Gemini:
+    "(hereinafter referred to as the "X")" becomes "("X")", and every later
+    mention of a party's full legal name becomes its defined role.
+    """
+    compressed = _VERBOSE_DEFINITION.sub(lambda m: f'("{m.group(1)}")', text)
+
+    for party in entities.get("parties", []):
+        name, role = party["name"], party["role"]
+        if not role or len(name) <= len(role):
+            continue
+        pattern = re.compile(r"\s+".join(re.escape(word) for word in name.split()), re.IGNORECASE)
+        first = pattern.search(compressed)
+        if first:
+            # Keep the defining mention, reference the role afterwards
+            head, tail = compressed[:first.end()], compressed[first.end():]
+            compressed = head + pattern.sub(role, tail)
+    return compressed
+
+
+_FIELD_LABELS = (
+    ("defined_terms", "Defined terms"),
+    ("dates", "Dates"),
+    ("amounts", "Amounts"),
+    ("governing_law", "Governing law"),
+)
+
+
+def format_entities(entities, fields=("parties",) + tuple(key for key, _ in _FIELD_LABELS)):
+    """Compact one-line-per-field listing of the requested entity fields."""
+    lines = []
+    if "parties" in fields and entities.get("parties"):
+        lines.append("Parties: " + "; ".join(
+            f'{p["name"]} ("{p["role"]}")' if p["role"] else p["name"] for p in entities["parties"]
+        ))
+    for key, label in _FIELD_LABELS:
+        if key in fields and entities.get(key):
+            lines.append(f"{label}: " + ", ".join(entities[key][:30]))
+    return "\n".join(lines)
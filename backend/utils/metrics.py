@@ -0,0 +1,263 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+# ==========================================================
+# 📈 Minimal Prometheus-format Metrics
+# ==========================================================
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = ('{}="{}"'.format(k, str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+               for k, v in pairs)
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        super().__init__(name, documentation, labelnames)
+        self._values = {}
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        if not items and not self.labelnames:
+            items = [((), 0)]
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(v)}" for key, v in items]
+
+
+class Gauge(_Metric):
+    """Gauge whose value is read from a callback at scrape time."""
+    kind = "gauge"
+
+    def __init__(self, name, documentation, callback):
+        super().__init__(name, documentation)
+        self.callback = callback
+
+    def _samples(self):
+        try:
+            value = self.callback()
+        except Exception:
+            return []
+        return [f"{self.name} {_format_value(value)}"] if value is not None else []
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}   # key -> [bucket_counts, sum, count]
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted((key, ([*s[0]], s[1], s[2])) for key, s in self._series.items())
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', _format_value(bound)))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', '+Inf'))} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics)
+        return "\n".join(m.render() for m in metrics) + "\n"
+
+
+REGISTRY = Registry()
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def counter(name, documentation, labelnames=()):
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def histogram(name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+def gauge(name, documentation, callback):
+    return REGISTRY.register(Gauge(name, documentation, callback))
+
+
+# ==========================================================
+# 📏 Application Metrics
+# ==========================================================
+
+# stage: upload_decode, extract, ner, prompt_build, gemini_call, fallback, mongodb_save
+STAGE_LATENCY = histogram(
+    "simplifier_stage_duration_seconds",
+    "Latency of individual request stages.",
+    ("stage",),
+)
+HTTP_REQUEST_LATENCY = histogram(
+    "simplifier_http_request_duration_seconds",
+    "End-to-end HTTP request latency by route.",
+    ("endpoint", "method", "status"),
+)
+KEY_ROTATIONS = counter(
+    "simplifier_key_rotations_total",
+    "Gemini calls retried on another API key after a rate-limit error.",
+)
+BLOCKED_RESPONSES = counter(
+    "simplifier_blocked_responses_total",
+    "Gemini responses without content (blocked by safety or finish reason).",
+)
+FALLBACKS = counter(
+    "simplifier_fallbacks_total",
+    "Requests served by the local fallback simplifier.",
+)
+CACHE_REQUESTS = counter(
+    "simplifier_cache_requests_total",
+    "Cache lookups by cache and outcome.",
+    ("cache", "outcome"),
+)
+SINGLE_FLIGHT_CALLS = counter(
+    "simplifier_single_flight_calls_total",
+    "Coalesced simplifications by role: leader (ran the pipeline) or follower (shared its result).",
+    ("role",),
+)
+CLAUSE_REQUESTS = counter(
+    "simplifier_clause_requests_total",
+    "Clauses in incremental mode, by whether the stored summary was reused.",
+    ("outcome",),
+)
+
+GEMINI_TOKENS = counter(
+    "simplifier_gemini_tokens_total",
+    "Gemini tokens by direction (input or output).",
+    ("direction",),
+)
+GEMINI_CALLS = counter(
+    "simplifier_gemini_calls_total",
+    "Successful Gemini calls by model tier.",
+    ("model",),
+)
+GEMINI_HEDGES = counter(
+    "simplifier_gemini_hedges_total",
+    "Hedged Gemini calls: sent, and whether the primary or the hedge answered first.",
+    ("outcome",),
+)
+REQUEST_TOKENS = histogram(
+    "simplifier_request_tokens",
+    "Gemini tokens used per simplification request, by direction.",
+    ("direction",),
+    buckets=(100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000, 250000),
+)
+
+ARCHIVE_UPLOADS = counter(
+    "simplifier_archive_uploads_total",
+    "Original uploads sent to the archive, by outcome (uploaded, deduplicated, failed, dropped).",
+    ("outcome",),
+)
+
+
+ADMISSION_REJECTIONS = counter(
+    "simplifier_admission_rejections_total",
+    "Simplify requests rejected with 429 by admission control, by reason (queue_full or timeout).",
+    ("reason",),
+)
+ADMISSION_QUEUE_WAIT = histogram(
+    "simplifier_admission_queue_wait_seconds",
+    "Time admitted requests spent waiting in the admission queue.",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+CIRCUIT_TRANSITIONS = counter(
+    "simplifier_circuit_transitions_total",
+    "Circuit breaker state changes, by breaker and the state entered (open, half_open, closed).",
+    ("breaker", "state"),
+)
+CIRCUIT_REJECTIONS = counter(
+    "simplifier_circuit_rejections_total",
+    "Calls refused without being attempted because the breaker's circuit was open.",
+    ("breaker",),
+)
+
+
+def time_stage(stage):
+    """Context manager that records the duration of a pipeline stage."""
+    return STAGE_LATENCY.time(stage=stage)
@@ -0,0 +1,135 @@
+import logging
+import math
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+# ==========================================================
+# 🏎️ Model Tiers, Latency Tracking and Hedged Routing
+# ==========================================================
+
+
+class ModelTier:
+    """One Gemini model. max_chars routes prompts up to that size to it first."""
+
+    def __init__(self, name, max_chars=None):
+        self.name = name
+        self.max_chars = max_chars
+
+    def __repr__(self):
+        return f"ModelTier({self.name!r}, max_chars={self.max_chars})"
+
+
+def parse_model_tiers(spec, default_model):
+    """
+    Parse "model[:max_chars],..." ordered from the primary (most capable) to
+    the fastest tier, e.g. "gemini-2.5-pro,gemini-2.5-flash,gemini-2.5-flash-lite:4000".
+    Malformed entries are ignored; an empty spec means just default_model.
+    """
+    tiers = []
+    for item in (spec or "").split(","):
+        name, _, max_chars = item.strip().partition(":")
+        if not name or any(tier.name == name for tier in tiers):
+            continue
+        if max_chars and not max_chars.strip().isdigit():
+            logger.warning(f"⚠️ Ignoring malformed model tier '{item.strip()}'")
+            continue
+        tiers.append(ModelTier(name, int(max_chars) if max_chars else None))
+    return tiers or [ModelTier(default_model)]
+
+
+class LatencyTracker:
+    """Recent call latencies of one model, for percentile estimates."""
+
+    def __init__(self, window=200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def percentile(self, p):
+        """The p-th percentile (0-100) of the recent samples, or None without any."""
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, math.ceil(p / 100 * len(samples)) - 1)]
+
+
+class ModelRouter:
+    """
+    Picks the model tier for a prompt and decides when to hedge.
+
+    A prompt goes to the fastest tier whose max_chars it fits, otherwise to
+    the primary. If that model has not answered by the hedge_percentile of
+    its observed latency, the caller sends the same prompt to the next faster
+    tier and keeps whichever answer arrives first. The hedge is sent early
+    enough for the faster tier's median latency to fit within the deadline;
+    until min_samples calls have been seen the deadline alone decides.
+    """
+
+    def __init__(self, tiers, hedge_percentile=95.0, deadline=30.0, min_samples=20, hedging=False):
+        self.tiers = list(tiers)
+        self.hedge_percentile = hedge_percentile
+        self.deadline = deadline
+        self.min_samples = min_samples
+        self.hedging = hedging and len(self.tiers) > 1
+        self.latency = {tier.name: LatencyTracker() for tier in self.tiers}
+
+    @property
+    def primary(self):
+        return self.tiers[0].name
+
+    def route(self, prompt_chars):
+        """(model, hedge_model) for a prompt; hedge_model is None without hedging or a faster tier."""
+        index = 0
+        sized = [(tier.max_chars, i) for i, tier in enumerate(self.tiers)
+                 if tier.max_chars is not None and prompt_chars <= tier.max_chars]
+        if sized:
+            index = min(sized)[1]
+        model = self.tiers[index].name
+        return model, self.next_tier(model) if self.hedging else None
+
+    def next_tier(self, model):
+        """The next faster tier after model (for hedges and failover), or None for the last one."""
+        names = [tier.name for tier in self.tiers]
+        index = names.index(model) + 1 if model in names else len(names)
+        return names[index] if index < len(names) else None
+
+    def hedge_delay(self, model, hedge_model):
+        """Seconds to wait for model before sending the hedged request."""
+        delay = self.deadline
+        tracker = self.latency[model]
+        if len(tracker) >= self.min_samples:
+            delay = min(delay, tracker.percentile(self.hedge_percentile))
+        hedge_tracker = self.latency[hedge_model]
+        if len(hedge_tracker) >= self.min_samples:
+            delay = min(delay, self.deadline - hedge_tracker.percentile(50))
+        return max(0.0, delay)
+
+    def observe(self, model, seconds):
+        tracker = self.latency.get(model)
+        if tracker is not None:
+            tracker.observe(seconds)
+
+    def stats(self):
+        """Per-tier routing limits and observed latency percentiles (seconds)."""
+        return [
+            {
+                "model": tier.name,
+                "max_chars": tier.max_chars,
+                "samples": len(self.latency[tier.name]),
+                "p50": self._rounded(self.latency[tier.name].percentile(50)),
+                "p95": self._rounded(self.latency[tier.name].percentile(95)),
+            }
+            for tier in self.tiers
+        ]
+
+    def _rounded(self, value):
+        return round(value, 3) if value is not None else None
@@ -0,0 +1,188 @@
+import hashlib
+import re
+import threading
+
+# ==========================================================
+# 🔢 Token Estimation and Accounting
+# ==========================================================
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about 4 characters per token) used for budgeting."""
+    return len(text) // 4 + 1
+
+
+class TokenUsage:
+    """
+    Input/output tokens and Gemini calls (per model tier) for one request;
+    safe to share across worker threads. model is the tier of the latest call.
+    """
+
+    def __init__(self):
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.calls = 0
+        self.models = {}
+        self.model = None
+        self._lock = threading.Lock()
+
+    def add(self, input_tokens, output_tokens, model=None):
+        with self._lock:
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+            self.calls += 1
+            if model is not None:
+                self.models[model] = self.models.get(model, 0) + 1
+                self.model = model
+
+    def merge(self, other):
+        """Add the totals of another TokenUsage, e.g. the call that won a hedge."""
+        with other._lock:
+            input_tokens, output_tokens, calls = other.input_tokens, other.output_tokens, other.calls
+            models, model = dict(other.models), other.model
+        with self._lock:
+            self.input_tokens += input_tokens
+            self.output_tokens += output_tokens
+            self.calls += calls
+            for name, count in models.items():
+                self.models[name] = self.models.get(name, 0) + count
+            if model is not None:
+                self.model = model
+
+    def as_dict(self):
+        with self._lock:
+            return {"input_tokens": self.input_tokens, "output_tokens": self.output_tokens, "calls": self.calls,
+                    "models": dict(self.models)}
+
+
+def parse_token_budgets(spec, default):
+    """Parse "model=tokens,model=tokens" into a dict; malformed entries are ignored."""
+    budgets = {}
+    for item in (spec or "").split(","):
+        model, _, tokens = item.partition("=")
+        if model.strip() and tokens.strip().isdigit():
+            budgets[model.strip()] = int(tokens)
+    budgets.setdefault("default", default)
+    return budgets
+
+
+# ==========================================================
+# 🧹 Document Compaction
+# ==========================================================
+
+_INLINE_SPACE = re.compile(r"[ \t\f\v\u00a0]+")
+_TRAILING_SPACE = re.compile(r"[ \t]+\n")
+_BLANK_LINES = re.compile(r"\n\s*\n")
+_WORDS_ONLY = re.compile(r"\W+")
+
+# Signature blocks, execution pages and page furniture carry nothing to simplify.
+_BOILERPLATE_LINE = re.compile(
+    r"^\s*(?:"
+    r"_{3,}.*"                                                   # ______________
+    r"|(?:By|Name|Title|Date|Signature|Signed|Witness|Print Name|Its)\s*:\s*(?:_+.*)?"
+    r"|\[?\s*(?:signature page follows|remainder of (?:this )?page intentionally left blank|this page intentionally left blank)\s*\]?\.?"
+    r"|page\s+\d+(?:\s+of\s+\d+)?"
+    r"|-\s*\d+\s*-"
+    r")\s*$",
+    re.IGNORECASE,
+)
+_SIGNATURE_OPENER = re.compile(r"^\s*IN\s+WITNESS\s+WHEREOF\b", re.IGNORECASE)
+
+
+def normalize_whitespace(text):
+    """Collapse runs of spaces/tabs, trim line ends and squeeze blank lines to one."""
+    text = _INLINE_SPACE.sub(" ", text)
+    text = _TRAILING_SPACE.sub("\n", text)
+    return _BLANK_LINES.sub("\n\n", text).strip()
+
+
+def strip_boilerplate(paragraphs):
+    """Drop signature blocks and page furniture; returns (kept, removed_count)."""
+    kept = []
+    removed = 0
+    for paragraph in paragraphs:
+        if _SIGNATURE_OPENER.match(paragraph):
+            removed += 1
+            continue
+        lines = [line for line in paragraph.split("\n") if not _BOILERPLATE_LINE.match(line)]
+        if not lines:
+            removed += 1
+            continue
+        kept.append("\n".join(lines))
+    return kept, removed
+
+
+def dedupe_paragraphs(paragraphs, min_chars=40):
+    """Drop repeated paragraphs (ignoring case and punctuation); short headings are always kept."""
+    seen = set()
+    kept = []
+    removed = 0
+    for paragraph in paragraphs:
+        if len(paragraph) >= min_chars:
+            digest = hashlib.blake2b(_WORDS_ONLY.sub(" ", paragraph.lower()).encode("utf-8"), digest_size=16).digest()
+            if digest in seen:
+                removed += 1
+                continue
+            seen.add(digest)
+        kept.append(paragraph)
+    return kept, removed
+
+
+def fit_to_budget(paragraphs, max_tokens):
+    """
+    Keep whole paragraphs from the start and end of the document until the
+    token budget is used up, with a marker where the middle was omitted.
+    Returns (paragraphs, omitted_count).
+    """
+    costs = [estimate_tokens(p) for p in paragraphs]
+    if sum(costs) <= max_tokens:
+        return paragraphs, 0
+
+    head, tail = [], []
+    used = 0
+    i, j = 0, len(paragraphs) - 1
+    # Alternate between the head and the tail so both ends survive
+    while i <= j:
+        if len(head) <= len(tail):
+            if used + costs[i] > max_tokens:
+                break
+            head.append(paragraphs[i])
+            used += costs[i]
+            i += 1
+        else:
+            if used + costs[j] > max_tokens:
+                break
+            tail.append(paragraphs[j])
+            used += costs[j]
+            j -= 1
+
+    omitted = len(paragraphs) - len(head) - len(tail)
+    if not head and not tail:
+        # The first and last paragraphs alone exceed the budget: cut characters from both ends
+        text = "\n\n".join(paragraphs)
+        half = max_tokens * 2
+        return [text[:half], "...[DOCUMENT TRUNCATED]...", text[-half:]], omitted
+    return head + [f"...[{omitted} PARAGRAPH(S) OMITTED TO FIT THE INPUT BUDGET]..."] + tail[::-1], omitted
+
+
+def compact_document(text, max_tokens=None):
+    """
+    Prompt-ready version of a document: whitespace normalized, boilerplate
+    and duplicate paragraphs removed, and fitted to max_tokens if given.
+    Returns (text, stats).
+    """
+    original_tokens = estimate_tokens(text)
+    paragraphs = normalize_whitespace(text).split("\n\n")
+    paragraphs, boilerplate = strip_boilerplate(paragraphs)
+    paragraphs, duplicates = dedupe_paragraphs(paragraphs)
+    omitted = 0
+    if max_tokens is not None:
+        paragraphs, omitted = fit_to_budget(paragraphs, max_tokens)
+    compacted = "\n\n".join(paragraphs)
+    return compacted, {
+        "original_tokens": original_tokens,
+        "prompt_tokens": estimate_tokens(compacted),
+        "boilerplate_removed": boilerplate,
+        "duplicates_removed": duplicates,
+        "paragraphs_omitted": omitted,
+    }
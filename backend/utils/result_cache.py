@@ -0,0 +1,126 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from .database import get_cached_result, save_cached_result
+from .metrics import CACHE_REQUESTS
+
+# ==========================================================
+# 🗝️ Content-addressed Cache Keys
+# ==========================================================
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text):
+    """Collapse whitespace so trivially reformatted uploads map to the same key."""
+    return _WHITESPACE.sub(" ", text or "").strip()
+
+
+def content_hash(text):
+    """SHA-256 hex digest of the normalized document text."""
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def make_cache_key(text, model_name, prompt_version, mode="auto"):
+    """Key a simplification result on the document, the model and the prompt that produced it."""
+    return f"{content_hash(text)}:{model_name}:{prompt_version}:{mode}"
+
+
+# ==========================================================
+# ⚡ Two-tier Result Cache (in-process LRU + MongoDB)
+# ==========================================================
+
+class ResultCache:
+    """
+    Bounded in-process LRU with TTL and size-based eviction, backed by a
+    persistent collection in MongoDB. Persistent hits are promoted into
+    the in-memory tier.
+    """
+
+    def __init__(self, max_entries=512, max_bytes=32 * 1024 * 1024, ttl_seconds=7 * 24 * 3600, persistent=True,
+                 name="result"):
+        self.name = name
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.persistent = persistent
+
+        self._entries = OrderedDict()   # key -> (expires_at_monotonic, value, size)
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    self.memory_hits += 1
+                    CACHE_REQUESTS.inc(cache=self.name, outcome="memory_hit")
+                    return entry[1]
+                self._remove(key)
+
+        if self.persistent:
+            value = get_cached_result(key)
+            if value is not None:
+                self._store(key, value)
+                with self._lock:
+                    self.persistent_hits += 1
+                CACHE_REQUESTS.inc(cache=self.name, outcome="persistent_hit")
+                return value
+
+        with self._lock:
+            self.misses += 1
+        CACHE_REQUESTS.inc(cache=self.name, outcome="miss")
+        return None
+
+    def set(self, key, value):
+        """Store value in memory and, if enabled, in the persistent tier."""
+        self._store(key, value)
+        if self.persistent:
+            save_cached_result(key, value, datetime.utcnow() + timedelta(seconds=self.ttl_seconds))
+
+    def stats(self):
+        """Hit/miss counters and current occupancy of the in-memory tier."""
+        with self._lock:
+            hits = self.memory_hits + self.persistent_hits
+            lookups = hits + self.misses
+            return {
+                "hits": hits,
+                "memory_hits": self.memory_hits,
+                "persistent_hits": self.persistent_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+    def _store(self, key, value):
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl_seconds, value, size)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
@@ -0,0 +1,103 @@
+import asyncio
+import threading
+
+from .metrics import SINGLE_FLIGHT_CALLS
+
+# ==========================================================
+# 🛬 Single-flight Request Coalescing
+# ==========================================================
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent calls that share a key: the first caller runs
+    the function, later callers with the same key wait for it and receive
+    the same result or exception.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._async_calls = {}   # key -> asyncio.Future, used only from the event loop
+        self._lock = threading.Lock()
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key, fn):
+        """Run fn() once per in-flight key. Returns (result, shared)."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.executed += 1
+                leader = True
+        SINGLE_FLIGHT_CALLS.inc(role="leader" if leader else "follower")
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    async def do_async(self, key, coro_fn):
+        """
+        Coroutine version of do() for callers on one event loop: coro_fn() is
+        awaited once per in-flight key. Returns (result, shared).
+        """
+        call = self._async_calls.get(key)
+        if call is not None:
+            with self._lock:
+                self.coalesced += 1
+            SINGLE_FLIGHT_CALLS.inc(role="follower")
+            # shield: a follower that disconnects must not cancel the shared call
+            return await asyncio.shield(call), True
+
+        call = asyncio.get_running_loop().create_future()
+        self._async_calls[key] = call
+        with self._lock:
+            self.executed += 1
+        SINGLE_FLIGHT_CALLS.inc(role="leader")
+        try:
+            result = await coro_fn()
+        except BaseException as e:
+            call.set_exception(e if isinstance(e, Exception) else RuntimeError("Coalesced call was cancelled."))
+            call.exception()   # mark retrieved; followers still receive the error
+            raise
+        finally:
+            del self._async_calls[key]
+        call.set_result(result)
+        return result, False
+
+    def stats(self):
+        """Executed vs coalesced call counts and the coalescing rate."""
+        with self._lock:
+            total = self.executed + self.coalesced
+            return {
+                "executed": self.executed,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls) + len(self._async_calls),
+                "coalescing_rate": round(self.coalesced / total, 4) if total else 0.0,
+            }
@@ -0,0 +1,78 @@
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# ==========================================================
+# 🚦 Background Startup Checks
+# ==========================================================
+
+
+class StartupChecks:
+    """
+    Runs slow startup work (connecting to MongoDB, importing the Gemini SDK)
+    on background threads, so the server starts accepting requests at once.
+    Each check runs on its own thread, so a slow database does not delay the
+    others. Results are reported by /api/health.
+    """
+
+    def __init__(self):
+        self._checks = []
+        self._results = {}
+        self._lock = threading.Lock()
+        self._remaining = 0
+        self._done = threading.Event()
+        self.started_at = None
+        self.duration = None
+
+    def add(self, name, fn):
+        """Register a check. fn raises on failure; a returned string is reported as its detail."""
+        self._checks.append((name, fn))
+        self._results[name] = {"status": "pending"}
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self._remaining = len(self._checks)
+        if not self._checks:
+            self._finish()
+        for name, fn in self._checks:
+            threading.Thread(target=self._run, args=(name, fn), name=f"startup-{name}", daemon=True).start()
+
+    def wait(self, timeout=None):
+        """Block until every check has finished; returns False on timeout."""
+        return self._done.wait(timeout)
+
+    def report(self):
+        with self._lock:
+            return {
+                "complete": self._done.is_set(),
+                "duration_ms": round(self.duration * 1000, 1) if self.duration is not None else None,
+                "checks": {name: dict(result) for name, result in self._results.items()},
+            }
+
+    def _run(self, name, fn):
+        began = time.perf_counter()
+        result = {}
+        try:
+            detail = fn()
+            result["status"] = "ok"
+            if detail:
+                result["detail"] = detail
+        except Exception as e:
+            logger.warning(f"⚠️ Startup check '{name}' failed: {e}")
+            result = {"status": "error", "detail": str(e)}
+        result["duration_ms"] = round((time.perf_counter() - began) * 1000, 1)
+
+        with self._lock:
+            self._results[name] = result
+            self._remaining -= 1
+            finished = self._remaining == 0
+        if finished:
+            self._finish()
+
+    def _finish(self):
+        self.duration = time.perf_counter() - self.started_at
+        self._done.set()
+        logger.info(f"🚦 Startup checks finished in {self.duration * 1000:.0f} ms: "
+                    + ", ".join(f"{name}={result['status']}" for name, result in self.report()["checks"].items()))
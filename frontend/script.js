@@ -52,11 +52,11 @@ document.addEventListener('DOMContentLoaded', () => {
         uploadBox.classList.remove('dragover');
 
         const file = e.dataTransfer.files && e.dataTransfer.files[0];
-        if (file && file.name && file.name.toLowerCase().endsWith('.txt')) {
+        if (file && isSupportedFile(file)) {
             uploadedFile = file;
             readFile(file);
         } else {
-            showError('Please upload a .txt file');
+            showError('Please upload a .txt, .pdf or .docx file');
         }
     });
 
@@ -73,7 +73,23 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     });
 
+    const SUPPORTED_EXTENSIONS = ['.txt', '.pdf', '.docx'];
+
+    function isSupportedFile(file) {
+        const name = (file.name || '').toLowerCase();
+        return SUPPORTED_EXTENSIONS.some(ext => name.endsWith(ext));
+    }
+
     function readFile(file) {
+        // PDF and DOCX are extracted on the server; only plain text can be previewed here
+        if (!file.name.toLowerCase().endsWith('.txt')) {
+            textInput.value = '';
+            textInput.placeholder = `📄 ${file.name} selected. Click Simplify to process it.`;
+            simplifyBtn.disabled = false;
+            simplifyBtn.style.pointerEvents = 'auto';
+            return;
+        }
+
         const reader = new FileReader();
         reader.onload = (e) => {
             textInput.value = e.target.result || '';
@@ -145,7 +161,8 @@ document.addEventListener('DOMContentLoaded', () => {
 
             let response;
             try {
-                response = await fetch(`${BACKEND_BASE}/api/simplify`, {
+                // Streaming endpoint: the simplified text is rendered as Gemini generates it
+                response = await fetch(`${BACKEND_BASE}/api/simplify/stream`, {
                     method: 'POST',
                     headers,
                     body,
@@ -169,6 +186,11 @@ document.addEventListener('DOMContentLoaded', () => {
                 return;
             }
 
+            if (contentType.includes('text/event-stream') && response.body) {
+                await readSimplifyStream(response);
+                return;
+            }
+
             let data = null;
             if (contentType.includes('application/json')) {
                 data = await response.json().catch(() => null);
@@ -203,11 +225,70 @@ document.addEventListener('DOMContentLoaded', () => {
         }
     }
 
-    function displayResult(text) {
+    // Parse the Server-Sent Events sent by /api/simplify/stream and render text as it arrives
+    async function readSimplifyStream(response) {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let firstChunk = true;
+        currentResult = '';
+
+        const handleEvent = (event, data) => {
+            if (event === 'chunk') {
+                currentResult += data.text || '';
+                if (firstChunk) hideLoading();
+                displayResult(currentResult, firstChunk);
+                firstChunk = false;
+            } else if (event === 'reset') {
+                // A key was rate-limited mid-stream; the backend restarts on another key
+                currentResult = '';
+                displayResult(currentResult, false);
+            } else if (event === 'fallback') {
+                currentResult = data.text || '';
+                hideLoading();
+                displayResult(currentResult, firstChunk);
+                firstChunk = false;
+            } else if (event === 'error') {
+                showError(data.error || 'Failed to simplify document');
+            }
+        };
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            let boundary;
+            while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+                const rawEvent = buffer.slice(0, boundary);
+                buffer = buffer.slice(boundary + 2);
+
+                let event = 'message';
+                let dataLines = [];
+                rawEvent.split('\n').forEach((line) => {
+                    if (line.startsWith('event:')) event = line.slice(6).trim();
+                    else if (line.startsWith('data:')) dataLines.push(line.slice(5).trim());
+                });
+                let data = {};
+                try {
+                    data = JSON.parse(dataLines.join('\n') || '{}');
+                } catch (err) {
+                    console.error('Invalid stream event', rawEvent, err);
+                }
+                handleEvent(event, data);
+            }
+        }
+
+        if (!currentResult) {
+            showError('Empty or invalid response from backend');
+        }
+    }
+
+    function displayResult(text, scroll = true) {
         const formattedText = (text || '').replace(/\n/g, '<br>').replace(/\*\*(.*?)\*\*/g, '<strong>$1</strong>');
         resultContent.innerHTML = formattedText;
         resultsSection.style.display = 'block';
-        resultsSection.scrollIntoView({ behavior: 'smooth' });
+        if (scroll) resultsSection.scrollIntoView({ behavior: 'smooth' });
     }
 
     function copyToClipboard() {